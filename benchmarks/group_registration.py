@@ -0,0 +1,106 @@
+"""Group registration vs. N single registrations under contention
+
+Needs a running MongoDB (MONGODB_URL); uses a throwaway database that is dropped at the end.
+
+    python -m benchmarks.group_registration --groups 20 --group-size 10 --capacity 100
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from config.settings import settings
+from repositories.user_repository import UserRepository
+from repositories.event_repository import EventRepository
+from repositories.registration_repository import RegistrationRepository
+from repositories.friendship_repository import FriendshipRepository
+from services.event_service import EventService
+from services.background_jobs import register_job_handlers
+
+BENCH_DB_NAME = "eventsync_benchmark"
+
+
+async def setup(db, groups: int, group_size: int, capacity: int):
+    """Create the users of every group and an event with the given capacity"""
+    result = await db["users"].insert_many([
+        {"name": f"Bench {i}", "email": f"bench{i}@example.com", "city": "Bench"}
+        for i in range(groups * group_size)
+    ])
+    user_ids = [str(inserted_id) for inserted_id in result.inserted_ids]
+    event_id = await EventRepository(db).create_event({
+        "title": "Benchmark",
+        "banner": "",
+        "date": "2030-01-01T10:00:00Z",
+        "time": "10:00",
+        "price": None,
+        "capacity": capacity,
+        "category": "Outros",
+        "description": "",
+        "location": "",
+        "organizer_id": user_ids[0],
+        "organizer_name": "Bench",
+        "organizer_rating": 5.0
+    })
+    return event_id, [user_ids[i:i + group_size] for i in range(0, len(user_ids), group_size)]
+
+
+async def run_singles(service: EventService, event_id: str, groups):
+    """Every user registers on their own, all at the same time"""
+    calls = [service.register_for_event(event_id, user_id) for group in groups for user_id in group]
+    return await asyncio.gather(*calls, return_exceptions=True)
+
+
+async def run_groups(service: EventService, event_id: str, groups):
+    """Every group registers in one call, all at the same time"""
+    calls = [service.register_group_for_event(event_id, group, group[0]) for group in groups]
+    return await asyncio.gather(*calls, return_exceptions=True)
+
+
+async def measure(name: str, runner, groups: int, group_size: int, capacity: int):
+    """Run one scenario on a fresh database and print its numbers"""
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await client.drop_database(BENCH_DB_NAME)
+    db = client[BENCH_DB_NAME]
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            event_id, user_groups = await setup(db, groups, group_size, capacity)
+            register_job_handlers(db)
+        service = EventService(UserRepository(db), EventRepository(db), RegistrationRepository(db), FriendshipRepository(db))
+
+        # The per-call debug output would dominate the timings
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            results = await runner(service, event_id, user_groups)
+            elapsed = time.perf_counter() - started
+
+        event = await db["events"].find_one({"_id": ObjectId(event_id)})
+        seated = event.get("registered_count", 0)
+        registrations = await db["registrations"].count_documents({"evento_id": event_id})
+        failures = sum(1 for result in results if isinstance(result, Exception))
+
+        print(
+            f"{name:<8} calls={len(results):<5} failed={failures:<5} seated={seated:<5} "
+            f"registrations={registrations:<5} overbooked={max(seated - capacity, 0):<4} "
+            f"time={elapsed * 1000:8.1f} ms  calls/s={len(results) / elapsed:8.1f}"
+        )
+    finally:
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=20)
+    parser.add_argument("--group-size", type=int, default=10)
+    parser.add_argument("--capacity", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"{args.groups} groups x {args.group_size} users competing for {args.capacity} seats")
+    await measure("singles", run_singles, args.groups, args.group_size, args.capacity)
+    await measure("groups", run_groups, args.groups, args.group_size, args.capacity)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+"""Seat reservation throughput vs. number of seat shards
+
+Needs a running MongoDB (MONGODB_URL); uses a throwaway database that is dropped at the end.
+Shard count 0 is the plain counter on the event document.
+
+    python -m benchmarks.seat_shards --reservations 5000 --concurrency 200 --shards 0 1 4 16 64
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from config.settings import settings
+from repositories.event_repository import EventRepository
+
+BENCH_DB_NAME = "eventsync_benchmark"
+
+
+async def measure(shard_count: int, reservations: int, capacity: int, concurrency: int):
+    """Run reservations concurrent seat reservations against one event and print the numbers"""
+    client = AsyncIOMotorClient(settings.MONGODB_URL)
+    await client.drop_database(BENCH_DB_NAME)
+    db = client[BENCH_DB_NAME]
+    try:
+        event_repo = EventRepository(db)
+        event_id = await event_repo.create_event({
+            "title": "Benchmark",
+            "date": "2030-01-01T10:00:00Z",
+            "time": "10:00",
+            "capacity": capacity,
+            "category": "Outros",
+            "organizer_id": "bench",
+            "seat_shards": shard_count
+        })
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def reserve(user_id: str) -> bool:
+            async with semaphore:
+                return await event_repo.reserve_seat(event_id, user_id, sharded=bool(shard_count))
+
+        # The per-call debug output would dominate the timings
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            results = await asyncio.gather(*(reserve(f"user{i}") for i in range(reservations)))
+            elapsed = time.perf_counter() - started
+            if shard_count:
+                taken = (await event_repo.seat_shards.get_totals(event_id))["taken"]
+            else:
+                taken = (await event_repo.get_event_by_id(event_id, {"registered_count": 1}))["registered_count"]
+
+        print(
+            f"shards={shard_count:<4} reserved={sum(results):<6} taken={taken:<6} "
+            f"overbooked={max(taken - capacity, 0):<4} time={elapsed * 1000:9.1f} ms  "
+            f"reservations/s={reservations / elapsed:8.1f}"
+        )
+    finally:
+        await client.drop_database(BENCH_DB_NAME)
+        client.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reservations", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=None, help="defaults to the number of reservations")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--shards", type=int, nargs="+", default=[0, 1, 4, 16, 64])
+    args = parser.parse_args()
+
+    capacity = args.capacity or args.reservations
+    print(f"{args.reservations} reservations, {args.concurrency} at a time, for {capacity} seats")
+    for shard_count in args.shards:
+        await measure(shard_count, args.reservations, capacity, args.concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
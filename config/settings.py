@@ -18,6 +18,76 @@ class Settings(BaseSettings):
     DEBUG: bool = True
     PORT: int = 3001
     
+    # Event Configuration
+    EVENT_BATCH_MAX_IDS: int = 100
+    SYNC_PAGE_SIZE: int = 500
+    SYNC_SETTLE_SECONDS: int = 5
+    SEAT_PUSH_MIN_INTERVAL_SECONDS: float = 1.0
+    
+    # Registration Configuration
+    REGISTRATION_BULK_MAX_IDS: int = 500
+    GROUP_REGISTRATION_MAX_SIZE: int = 50
+    CHECK_IN_MAX_TICKETS: int = 500
+    TICKET_SECRET_KEY: str = ""  # Falls back to SECRET_KEY
+    
+    # Payment Expiry Configuration
+    PAYMENT_SWEEP_ENABLED: bool = True
+    PAYMENT_TIMEOUT_MINUTES: int = 60
+    PAYMENT_SWEEP_INTERVAL_SECONDS: int = 60
+    PAYMENT_SWEEP_BATCH_SIZE: int = 500
+    
+    # Seat Sharding Configuration (events at least this big split their seat counter)
+    SEAT_SHARDING_MIN_CAPACITY: int = 5000
+    SEAT_SHARD_COUNT: int = 16
+    SEAT_SHARD_SYNC_SECONDS: float = 1.0
+    
+    # Seat Reconciliation Configuration
+    SEAT_RECONCILE_ENABLED: bool = True
+    SEAT_RECONCILE_INTERVAL_SECONDS: int = 3600
+    SEAT_RECONCILE_BATCH_SIZE: int = 500
+    SEAT_RECONCILE_SETTLE_SECONDS: int = 60
+    
+    # Archival Configuration
+    ARCHIVE_ENABLED: bool = True
+    ARCHIVE_RETENTION_DAYS: int = 180
+    ARCHIVE_INTERVAL_SECONDS: int = 86400
+    ARCHIVE_BATCH_SIZE: int = 500
+    
+    # Friend Feed Configuration
+    FRIEND_FEED_SIZE: int = 50
+    FRIEND_FEED_CACHE_TTL_SECONDS: int = 120
+    FRIEND_FEED_CACHE_SIZE: int = 10000
+    
+    # Friendship Configuration
+    FRIEND_ACCEPT_MAX_IDS: int = 100
+    
+    # Friend Suggestion Configuration
+    FRIEND_SUGGESTIONS_ENABLED: bool = True
+    FRIEND_SUGGESTION_INTERVAL_SECONDS: int = 3600
+    FRIEND_SUGGESTION_ACTIVE_DAYS: int = 30
+    FRIEND_SUGGESTION_LIMIT: int = 20
+    FRIEND_SUGGESTION_MAX_FRIENDS: int = 500
+    FRIEND_SUGGESTION_MAX_EDGES: int = 20000
+    FRIEND_SUGGESTION_MAX_CANDIDATES: int = 200
+    
+    # Notification Configuration
+    NOTIFICATION_CHUNK_SIZE: int = 1000
+    
+    # Background Job Configuration
+    JOB_QUEUE_CONCURRENCY: int = 4
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_RETRY_BASE_SECONDS: float = 2.0
+    JOB_POLL_SECONDS: float = 5.0
+    JOB_LOCK_TIMEOUT_SECONDS: int = 300
+    JOB_DRAIN_TIMEOUT_SECONDS: float = 10.0
+    
+    # Cache Configuration
+    FACET_CACHE_TTL_SECONDS: int = 300
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_LEASE_SECONDS: int = 60  # An unfinished claim older than this is taken over by a retry
+    CHANGE_STREAMS_ENABLED: bool = True
+    
     # CORS Configuration
     ALLOWED_ORIGINS: str = "http://localhost:3000"
     
@@ -6,6 +6,24 @@ import uvicorn
 
 from config.database import database
 from config.settings import settings
+from migrations.indexes import ensure_indexes
+from repositories.archive_repository import ArchiveRepository
+from repositories.event_repository import EventRepository
+from repositories.friend_suggestion_repository import FriendSuggestionRepository
+from repositories.friendship_repository import FriendshipRepository
+from repositories.job_repository import JobRepository
+from repositories.lock_repository import LockRepository
+from repositories.registration_repository import RegistrationRepository
+from repositories.user_repository import UserRepository
+from services.archive_service import ArchiveService, last_archive_metrics
+from services.background_jobs import register_job_handlers
+from services.friend_suggestion_service import FriendSuggestionService, last_suggestion_metrics
+from services.payment_expiry_service import PaymentExpiryService, last_sweep_metrics
+from services.seat_reconciliation_service import SeatReconciliationService, last_reconcile_metrics
+from utils.change_stream_listener import ChangeStreamListener
+from utils.job_queue import job_queue
+from utils.scheduler import PeriodicJob
+from utils.single_flight import single_flight_stats
 from middlewares.rate_limit import limiter
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.errors import RateLimitExceeded
@@ -22,8 +40,63 @@ async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown events"""
     # Startup
     await database.connect_db()
+    db = database.get_db()
+    await ensure_indexes(db)
+    register_job_handlers(db)
+    job_queue.start(JobRepository(db))
+    change_listener = None
+    if settings.CHANGE_STREAMS_ENABLED:
+        change_listener = ChangeStreamListener(db)
+        change_listener.start()
+    
+    jobs = []
+    if settings.PAYMENT_SWEEP_ENABLED:
+        payment_expiry_service = PaymentExpiryService(EventRepository(db), RegistrationRepository(db))
+        jobs.append(PeriodicJob(
+            "payment_expiry",
+            settings.PAYMENT_SWEEP_INTERVAL_SECONDS,
+            lambda: payment_expiry_service.expire_unpaid_registrations(
+                settings.PAYMENT_TIMEOUT_MINUTES, settings.PAYMENT_SWEEP_BATCH_SIZE
+            ),
+            LockRepository(db)
+        ))
+    if settings.SEAT_RECONCILE_ENABLED:
+        seat_reconciliation_service = SeatReconciliationService(EventRepository(db), RegistrationRepository(db))
+        jobs.append(PeriodicJob(
+            "seat_reconciliation",
+            settings.SEAT_RECONCILE_INTERVAL_SECONDS,
+            lambda: seat_reconciliation_service.reconcile_seat_counters(
+                settings.SEAT_RECONCILE_SETTLE_SECONDS, settings.SEAT_RECONCILE_BATCH_SIZE
+            ),
+            LockRepository(db)
+        ))
+    if settings.ARCHIVE_ENABLED:
+        archive_service = ArchiveService(ArchiveRepository(db))
+        jobs.append(PeriodicJob(
+            "archive",
+            settings.ARCHIVE_INTERVAL_SECONDS,
+            lambda: archive_service.archive_old_data(settings.ARCHIVE_RETENTION_DAYS, settings.ARCHIVE_BATCH_SIZE),
+            LockRepository(db)
+        ))
+    if settings.FRIEND_SUGGESTIONS_ENABLED:
+        friend_suggestion_service = FriendSuggestionService(
+            UserRepository(db), RegistrationRepository(db), FriendshipRepository(db), FriendSuggestionRepository(db)
+        )
+        jobs.append(PeriodicJob(
+            "friend_suggestions",
+            settings.FRIEND_SUGGESTION_INTERVAL_SECONDS,
+            lambda: friend_suggestion_service.precompute_for_active_users(settings.FRIEND_SUGGESTION_ACTIVE_DAYS),
+            LockRepository(db)
+        ))
+    for job in jobs:
+        job.start()
     yield
     # Shutdown
+    for job in jobs:
+        await job.stop()
+    await job_queue.stop()
+    if change_listener:
+        await change_listener.stop()
     await database.close_db()
 
 
@@ -82,6 +155,19 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """In-process metrics of this worker"""
+    return {
+        "single_flight": single_flight_stats(),
+        "job_queue": job_queue.stats(),
+        "payment_expiry": last_sweep_metrics,
+        "seat_reconciliation": last_reconcile_metrics,
+        "archive": last_archive_metrics,
+        "friend_suggestions": last_suggestion_metrics
+    }
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
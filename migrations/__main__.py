@@ -0,0 +1,31 @@
+import asyncio
+
+from config.database import database
+from migrations import event_starts_at, event_search_keys, event_sync_version, registration_active_unique, event_registered_count
+from migrations.indexes import ensure_indexes
+
+# Migrations run in order; each one must be safe to run more than once
+MIGRATIONS = [
+    event_starts_at,
+    event_search_keys,
+    event_sync_version,
+    registration_active_unique,
+    event_registered_count,
+]
+
+
+async def main():
+    """Create indexes and apply data migrations"""
+    await database.connect_db()
+    try:
+        db = database.get_db()
+        await ensure_indexes(db)
+        for migration in MIGRATIONS:
+            print(f"🔄 Running migration: {migration.__name__}")
+            await migration.run(db)
+    finally:
+        await database.close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,15 @@
+from repositories.event_repository import EventRepository
+from repositories.registration_repository import RegistrationRepository
+from services.seat_reconciliation_service import SeatReconciliationService
+from utils.debug import debug_print
+
+
+async def run(db):
+    """Replace the participants array of existing events with a counter of their registrations"""
+    debug_print("event_registered_count.py", "run", "variables")
+    
+    service = SeatReconciliationService(EventRepository(db), RegistrationRepository(db))
+    metrics = await service.reconcile_seat_counters(settle_seconds=0, batch_size=500)
+    
+    debug_print("event_registered_count.py", "run", "returning", repaired=metrics["repaired"])
+    return metrics["repaired"]
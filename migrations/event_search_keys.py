@@ -0,0 +1,12 @@
+from repositories.event_repository import EventRepository
+from utils.debug import debug_print
+
+
+async def run(db):
+    """Backfill the normalized autocomplete keys on existing events"""
+    debug_print("event_search_keys.py", "run", "variables")
+    
+    updated = await EventRepository(db).backfill_search_keys()
+    
+    debug_print("event_search_keys.py", "run", "returning", updated=updated)
+    return updated
@@ -0,0 +1,12 @@
+from repositories.event_repository import EventRepository
+from utils.debug import debug_print
+
+
+async def run(db):
+    """Backfill the parsed starts_at datetime on existing events"""
+    debug_print("event_starts_at.py", "run", "variables")
+    
+    updated = await EventRepository(db).backfill_starts_at()
+    
+    debug_print("event_starts_at.py", "run", "returning", updated=updated)
+    return updated
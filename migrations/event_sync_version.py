@@ -0,0 +1,12 @@
+from repositories.event_repository import EventRepository
+from utils.debug import debug_print
+
+
+async def run(db):
+    """Stamp the delta-sync updated_at on existing events"""
+    debug_print("event_sync_version.py", "run", "variables")
+    
+    updated = await EventRepository(db).backfill_updated_at()
+    
+    debug_print("event_sync_version.py", "run", "returning", updated=updated)
+    return updated
@@ -0,0 +1,27 @@
+from repositories.archive_repository import ArchiveRepository
+from repositories.event_repository import EventRepository
+from repositories.friend_suggestion_repository import FriendSuggestionRepository
+from repositories.friendship_repository import FriendshipRepository
+from repositories.idempotency_repository import IdempotencyRepository
+from repositories.job_repository import JobRepository
+from repositories.notification_repository import NotificationRepository
+from repositories.registration_repository import RegistrationRepository
+from repositories.seat_shard_repository import SeatShardRepository
+from repositories.waitlist_repository import WaitlistRepository
+from utils.debug import debug_print
+
+
+async def ensure_indexes(db):
+    """Create the indexes of every collection (idempotent)"""
+    debug_print("indexes.py", "ensure_indexes", "variables")
+    
+    await ArchiveRepository(db).ensure_indexes()
+    await EventRepository(db).ensure_indexes()
+    await FriendSuggestionRepository(db).ensure_indexes()
+    await FriendshipRepository(db).ensure_indexes()
+    await IdempotencyRepository(db).ensure_indexes()
+    await JobRepository(db).ensure_indexes()
+    await NotificationRepository(db).ensure_indexes()
+    await RegistrationRepository(db).ensure_indexes()
+    await SeatShardRepository(db).ensure_indexes()
+    await WaitlistRepository(db).ensure_indexes()
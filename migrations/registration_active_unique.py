@@ -0,0 +1,15 @@
+from repositories.registration_repository import RegistrationRepository
+from utils.debug import debug_print
+
+
+async def run(db):
+    """Cancel duplicate active registrations, then enforce one active registration per user and event"""
+    debug_print("registration_active_unique.py", "run", "variables")
+    
+    registration_repo = RegistrationRepository(db)
+    # The seats the duplicates held are given back by the event_registered_count recount
+    cancelled = await registration_repo.cancel_duplicate_active_registrations()
+    await registration_repo.ensure_active_unique_index()
+    
+    debug_print("registration_active_unique.py", "run", "returning", cancelled=cancelled)
+    return cancelled
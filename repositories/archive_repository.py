@@ -0,0 +1,98 @@
+from typing import List
+from datetime import datetime
+from pymongo import ASCENDING, ReplaceOne, UpdateOne
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from schemas.registration_schema import RegistrationStatus
+from utils.cache import invalidate_collection
+from utils.debug import debug_print
+
+# Closed registrations that no longer hold a seat
+RELEASED_STATUSES = [RegistrationStatus.CANCELADA, RegistrationStatus.RECUSADA]
+
+
+class ArchiveRepository:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.events = db["events"]
+        self.registrations = db["registrations"]
+        self.seat_shards = db["seat_shards"]
+        self.waitlist = db["waitlist"]
+        self.event_tombstones = db["event_tombstones"]
+        self.events_archive = db["events_archive"]
+        self.registrations_archive = db["registrations_archive"]
+    
+    async def ensure_indexes(self):
+        """Create the indexes used to read history from the archive"""
+        debug_print("archive_repository.py", "ensure_indexes", "variables")
+        
+        await self.registrations_archive.create_index([("usuario_id", ASCENDING)], name="usuario_id_1")
+        await self.registrations_archive.create_index([("evento_id", ASCENDING)], name="evento_id_1")
+    
+    async def _move(self, source, target, documents: List[dict]) -> List:
+        """Copy documents to an archive collection, then delete them from the hot one; returns their _ids"""
+        if not documents:
+            return []
+        
+        # Upserts make a batch interrupted between the copy and the delete safe to run again
+        archived_at = datetime.utcnow()
+        await target.bulk_write(
+            [ReplaceOne({"_id": doc["_id"]}, {**doc, "archived_at": archived_at}, upsert=True) for doc in documents],
+            ordered=False
+        )
+        ids = [doc["_id"] for doc in documents]
+        await source.delete_many({"_id": {"$in": ids}})
+        return ids
+    
+    async def archive_finished_events(self, ended_before: datetime, limit: int) -> int:
+        """Move a batch of events that started before the cutoff, with all their registrations, to the archive"""
+        debug_print("archive_repository.py", "archive_finished_events", "variables", ended_before=ended_before, limit=limit)
+        
+        events = await self.events.find({"starts_at": {"$lt": ended_before}}).limit(limit).to_list(length=limit)
+        event_ids = [str(event["_id"]) for event in events]
+        
+        # Registrations go first, so a registration is never left pointing at a missing hot event
+        if event_ids:
+            cursor = self.registrations.find({"evento_id": {"$in": event_ids}})
+            batch = []
+            async for registration in cursor:
+                batch.append(registration)
+                if len(batch) >= limit:
+                    await self._move(self.registrations, self.registrations_archive, batch)
+                    batch = []
+            await self._move(self.registrations, self.registrations_archive, batch)
+            await self.seat_shards.delete_many({"evento_id": {"$in": event_ids}})
+            await self.waitlist.delete_many({"evento_id": {"$in": event_ids}})
+        
+        # Delta sync reports the tombstones as deletions, so offline clients drop the archived events
+        if events:
+            await self.event_tombstones.bulk_write(
+                [
+                    UpdateOne(
+                        {"_id": event["_id"]},
+                        {"$set": {"deleted_at": datetime.utcnow()}, "$currentDate": {"updated_at": True}},
+                        upsert=True
+                    )
+                    for event in events
+                ],
+                ordered=False
+            )
+        
+        moved = len(await self._move(self.events, self.events_archive, events))
+        if moved:
+            invalidate_collection("events")
+        
+        debug_print("archive_repository.py", "archive_finished_events", "returning", moved=moved)
+        return moved
+    
+    async def archive_closed_registrations(self, registered_before: datetime, limit: int) -> int:
+        """Move a batch of cancelled and refused registrations made before the cutoff to the archive"""
+        debug_print("archive_repository.py", "archive_closed_registrations", "variables", registered_before=registered_before, limit=limit)
+        
+        # These hold no seat, so they leave whatever the state of their event; finalizada ones
+        # still count as seats, tickets and participants and move with their event instead
+        registrations = await self.registrations.find(
+            {"status": {"$in": RELEASED_STATUSES}, "timestamp_inscricao": {"$lt": registered_before}}
+        ).limit(limit).to_list(length=limit)
+        moved = len(await self._move(self.registrations, self.registrations_archive, registrations))
+        
+        debug_print("archive_repository.py", "archive_closed_registrations", "returning", moved=moved)
+        return moved
@@ -1,34 +1,166 @@
-from typing import Optional, List
+import re
+import time
+from enum import Enum
+from typing import Optional, List, Dict
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, UpdateOne, ReturnDocument
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from config.settings import settings
+from repositories.seat_shard_repository import SeatShardRepository
 from schemas.event_schema import EventStatus
+from utils.cache import TTLCache
+from utils.job_queue import job_queue
+from utils.seat_broadcaster import seat_broadcaster
+from utils.dates import parse_event_datetime
+from utils.text import build_search_keys
 from utils.debug import debug_print
 
 
+# Stamped by the server on every event write; delta sync pages through (updated_at, _id)
+SYNC_STAMP = {"updated_at": True}
+
+# Job enqueued when seats free up on an event with a waitlist (handled in services/background_jobs)
+PROMOTE_WAITLIST = "event.promote_waitlist"
+
+# Fields needed to render an event in a list
+EVENT_LIST_PROJECTION = {
+    "title": 1,
+    "banner": 1,
+    "date": 1,
+    "starts_at": 1,
+    "price": 1,
+    "capacity": 1,
+    "organizer_id": 1,
+    "organizer_name": 1,
+    "organizer_rating": 1,
+    "category": 1,
+    "status": 1,
+    "registered_count": 1
+}
+
+# Mongo fields backing each field of the Event/EventDetail responses
+EVENT_FIELD_PROJECTIONS = {
+    "id": {},
+    "title": {"title": 1},
+    "banner": {"banner": 1},
+    "date": {"date": 1},
+    "time": {"time": 1},
+    "starts_at": {"starts_at": 1},
+    "price": {"price": 1},
+    "remaining_seats": {"capacity": 1, "registered_count": 1},
+    "capacity": {"capacity": 1},
+    "organizer": {"organizer_id": 1, "organizer_name": 1, "organizer_rating": 1},
+    "category": {"category": 1},
+    "description": {"description": 1},
+    "location": {"location": 1},
+    "rules": {"rules": 1},
+    "status": {"status": 1},
+    # Participants come from the registrations collection
+    "participants": {}
+}
+
+
+def build_event_projection(fields: List[str]) -> dict:
+    """Translate response field names into a Mongo projection"""
+    projection = {}
+    for field in fields:
+        projection.update(EVENT_FIELD_PROJECTIONS[field])
+    # An empty projection would return the whole document
+    return projection or {"_id": 1}
+
+
+# Category/status counts, adjusted in place on writes so the facet bar is served from memory
+_facet_cache = TTLCache(
+    "event_facets",
+    ttl_seconds=settings.FACET_CACHE_TTL_SECONDS,
+    max_size=1,
+    collections=("events",),
+    fields=("category", "status")
+)
+
+
+def _adjust_facet(facet: str, old_value: Optional[str], new_value: Optional[str]):
+    """Move one event from old_value to new_value in the cached facet counts"""
+    counts = _facet_cache.get("facets")
+    if counts is None or old_value == new_value:
+        return
+    
+    # Enum members hash differently from their string values, so key by the plain value
+    old_value = old_value.value if isinstance(old_value, Enum) else old_value
+    new_value = new_value.value if isinstance(new_value, Enum) else new_value
+    values = counts[facet]
+    if old_value is not None:
+        values[old_value] = max(values.get(old_value, 0) - 1, 0)
+    if new_value is not None:
+        values[new_value] = values.get(new_value, 0) + 1
+
+
+# When this worker last copied the shard totals of each sharded event onto the event document
+_shard_synced_at: Dict[str, float] = {}
+
+
 class EventRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.collection = db["events"]
+        self.tombstones = db["event_tombstones"]
+        self.waitlist = db["waitlist"]
+        self.seat_shards = SeatShardRepository(db)
+    
+    async def ensure_indexes(self):
+        """Create the indexes used by the event queries"""
+        debug_print("event_repository.py", "ensure_indexes", "variables")
+        
+        await self.collection.create_index([("starts_at", ASCENDING)], name="starts_at_1")
+        await self.collection.create_index([("organizer_id", ASCENDING)], name="organizer_id_1")
+        await self.collection.create_index(
+            [("title", TEXT), ("description", TEXT), ("location", TEXT), ("category", TEXT)],
+            weights={"title": 10, "category": 5, "location": 3, "description": 1},
+            default_language="portuguese",
+            name="events_text"
+        )
+        await self.collection.create_index([("search_keys", ASCENDING)], name="search_keys_1")
+        # Delta sync pages through (updated_at, _id); its prefix also serves the reconciliation scan
+        await self.collection.create_index([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at_1__id_1")
+        await self.tombstones.create_index([("updated_at", ASCENDING), ("_id", ASCENDING)], name="updated_at_1__id_1")
     
     async def create_event(self, event_data: dict) -> str:
         """Create a new event and return the event ID"""
         debug_print("event_repository.py", "create_event", "variables", event_data=event_data)
         
         event_data["created_at"] = datetime.utcnow()
-        event_data["registered_users"] = []
+        event_data["starts_at"] = parse_event_datetime(event_data.get("date"), event_data.get("time"))
+        event_data["search_keys"] = build_search_keys(event_data.get("title"), event_data.get("location"))
+        event_data["registered_count"] = 0
         event_data["status"] = EventStatus.OPEN
         
-        result = await self.collection.insert_one(event_data)
-        event_id = str(result.inserted_id)
+        # Big events take their seats from sharded counters instead of the event document
+        if "seat_shards" not in event_data and event_data.get("capacity", 0) >= settings.SEAT_SHARDING_MIN_CAPACITY:
+            event_data["seat_shards"] = settings.SEAT_SHARD_COUNT
+        
+        # Inserted through an upsert so updated_at comes from the server clock, like every other event write
+        object_id = ObjectId()
+        await self.collection.update_one(
+            {"_id": object_id},
+            {"$setOnInsert": event_data, "$currentDate": SYNC_STAMP},
+            upsert=True
+        )
+        event_id = str(object_id)
+        
+        if event_data.get("seat_shards"):
+            await self.seat_shards.create_shards(event_id, event_data["capacity"], event_data["seat_shards"])
+        
+        _adjust_facet("categories", None, event_data.get("category"))
+        _adjust_facet("statuses", None, event_data["status"])
         
         debug_print("event_repository.py", "create_event", "returning", event_id=event_id)
         return event_id
     
-    async def get_all_events(self) -> List[dict]:
+    async def get_all_events(self, projection: Optional[dict] = None) -> List[dict]:
         """Get all events"""
-        debug_print("event_repository.py", "get_all_events", "variables")
+        debug_print("event_repository.py", "get_all_events", "variables", projection=projection)
         
-        cursor = self.collection.find({})
+        cursor = self.collection.find({}, projection or EVENT_LIST_PROJECTION)
         events = []
         async for event in cursor:
             event["id"] = str(event["_id"])
@@ -37,12 +169,75 @@ class EventRepository:
         debug_print("event_repository.py", "get_all_events", "returning", events_count=len(events))
         return events
     
-    async def get_event_by_id(self, event_id: str) -> Optional[dict]:
+    async def get_events_by_date_range(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        descending: bool = False,
+        projection: Optional[dict] = None
+    ) -> List[dict]:
+        """Get events starting within [start, end), sorted by start date"""
+        debug_print("event_repository.py", "get_events_by_date_range", "variables", start=start, end=end, descending=descending)
+        
+        date_filter = {}
+        if start is not None:
+            date_filter["$gte"] = start
+        if end is not None:
+            date_filter["$lt"] = end
+        
+        # An empty range still restricts to events with a parsed date so the index is used
+        query = {"starts_at": date_filter or {"$type": "date"}}
+        cursor = self.collection.find(query, projection or EVENT_LIST_PROJECTION).sort("starts_at", DESCENDING if descending else ASCENDING)
+        events = []
+        async for event in cursor:
+            event["id"] = str(event["_id"])
+            events.append(event)
+        
+        debug_print("event_repository.py", "get_events_by_date_range", "returning", events_count=len(events))
+        return events
+    
+    async def search_events(self, query: str, skip: int = 0, limit: int = 20) -> List[dict]:
+        """Full-text search over events, best matches first"""
+        debug_print("event_repository.py", "search_events", "variables", query=query, skip=skip, limit=limit)
+        
+        projection = {**EVENT_LIST_PROJECTION, "score": {"$meta": "textScore"}}
+        cursor = (
+            self.collection.find({"$text": {"$search": query}}, projection)
+            .sort([("score", {"$meta": "textScore"})])
+            .skip(skip)
+            .limit(limit)
+        )
+        events = []
+        async for event in cursor:
+            event["id"] = str(event["_id"])
+            events.append(event)
+        
+        debug_print("event_repository.py", "search_events", "returning", events_count=len(events))
+        return events
+    
+    async def suggest_events(self, normalized_prefix: str, limit: int = 8) -> List[dict]:
+        """Get events whose title or location has a word starting with the normalized prefix"""
+        debug_print("event_repository.py", "suggest_events", "variables", normalized_prefix=normalized_prefix, limit=limit)
+        
+        # An anchored, case-sensitive regex is answered as a range scan on the search_keys index
+        cursor = self.collection.find(
+            {"search_keys": {"$regex": f"^{re.escape(normalized_prefix)}"}},
+            {"title": 1, "location": 1}
+        ).limit(limit)
+        events = []
+        async for event in cursor:
+            event["id"] = str(event["_id"])
+            events.append(event)
+        
+        debug_print("event_repository.py", "suggest_events", "returning", events_count=len(events))
+        return events
+    
+    async def get_event_by_id(self, event_id: str, projection: Optional[dict] = None) -> Optional[dict]:
         """Get event by ID"""
-        debug_print("event_repository.py", "get_event_by_id", "variables", event_id=event_id)
+        debug_print("event_repository.py", "get_event_by_id", "variables", event_id=event_id, projection=projection)
         
         try:
-            event = await self.collection.find_one({"_id": ObjectId(event_id)})
+            event = await self.collection.find_one({"_id": ObjectId(event_id)}, projection)
             if event:
                 event["id"] = str(event["_id"])
             debug_print("event_repository.py", "get_event_by_id", "returning", event=event)
@@ -51,9 +246,9 @@ class EventRepository:
             debug_print("event_repository.py", "get_event_by_id", "returning", event=None)
             return None
     
-    async def get_events_by_ids(self, event_ids: List[str]) -> List[dict]:
+    async def get_events_by_ids(self, event_ids: List[str], projection: Optional[dict] = None) -> List[dict]:
         """Get multiple events by their IDs"""
-        debug_print("event_repository.py", "get_events_by_ids", "variables", event_ids=event_ids)
+        debug_print("event_repository.py", "get_events_by_ids", "variables", event_ids=event_ids, projection=projection)
         
         object_ids = []
         for eid in event_ids:
@@ -62,7 +257,7 @@ class EventRepository:
             except:
                 continue
         
-        cursor = self.collection.find({"_id": {"$in": object_ids}})
+        cursor = self.collection.find({"_id": {"$in": object_ids}}, projection)
         events = []
         async for event in cursor:
             event["id"] = str(event["_id"])
@@ -75,7 +270,7 @@ class EventRepository:
         """Get all events organized by a specific user"""
         debug_print("event_repository.py", "get_events_by_organizer", "variables", organizer_id=organizer_id)
         
-        cursor = self.collection.find({"organizer_id": organizer_id})
+        cursor = self.collection.find({"organizer_id": organizer_id}, EVENT_LIST_PROJECTION)
         events = []
         async for event in cursor:
             event["id"] = str(event["_id"])
@@ -84,24 +279,155 @@ class EventRepository:
         debug_print("event_repository.py", "get_events_by_organizer", "returning", events_count=len(events))
         return events
     
+    async def _refresh_seat_status(self, event_ids: List[str]):
+        """Mark events full or open again from their seat counters, push the new counts and
+        hand free seats of events with a waitlist to the promotion job"""
+        events = await self.get_events_by_ids(event_ids, {"capacity": 1, "status": 1, "registered_count": 1})
+        with_free_seats = [event["id"] for event in events if event["capacity"] > event.get("registered_count", 0)]
+        waitlisted = set(await self.waitlist.distinct("evento_id", {"evento_id": {"$in": with_free_seats}})) if with_free_seats else set()
+        promotions = []
+        for event in events:
+            remaining = event["capacity"] - event.get("registered_count", 0)
+            status = event["status"]
+            if remaining <= 0:
+                await self.update_event_status(event["id"], EventStatus.FULL)
+                status = EventStatus.FULL
+            elif event["id"] in waitlisted:
+                # A full event with people waiting stays full until the waitlist took the free seats
+                promotions.append({"event_id": event["id"], "seats": remaining})
+            elif status == EventStatus.FULL:
+                await self.update_event_status(event["id"], EventStatus.OPEN)
+                status = EventStatus.OPEN
+            seat_broadcaster.publish(event["id"], remaining, status)
+        
+        for payload in promotions:
+            await job_queue.enqueue(PROMOTE_WAITLIST, payload)
+    
+    async def refresh_seat_status(self, event_id: str):
+        """Recompute an event's full/open status from its seat counter"""
+        debug_print("event_repository.py", "refresh_seat_status", "variables", event_id=event_id)
+        
+        await self._refresh_seat_status([event_id])
+    
+    async def reserve_seat(self, event_id: str, user_id: str, refresh_status: bool = True, sharded: Optional[bool] = None) -> bool:
+        """Atomically take a seat for a user; False if the event is full or closed
+
+        With refresh_status=False the caller recomputes the event status itself (e.g. in a background job).
+        Callers that already read the event pass sharded (bool(event["seat_shards"])) to skip the
+        lookup that otherwise follows a failed reservation
+        """
+        debug_print("event_repository.py", "reserve_seat", "variables", event_id=event_id, user_id=user_id, refresh_status=refresh_status, sharded=sharded)
+        
+        try:
+            if sharded:
+                success = await self._reserve_sharded(event_id, 1)
+                debug_print("event_repository.py", "reserve_seat", "returning", success=success)
+                return success
+            
+            # Capacity is checked in the same update that takes the seat, so concurrent
+            # reservations can never overbook the event; duplicates are checked against
+            # the registrations by the caller
+            result = await self.collection.update_one(
+                {
+                    "_id": ObjectId(event_id),
+                    "status": {"$ne": EventStatus.CLOSED},
+                    "seat_shards": None,
+                    "$expr": {"$lt": ["$registered_count", "$capacity"]}
+                },
+                {"$inc": {"registered_count": 1}, "$currentDate": SYNC_STAMP}
+            )
+            success = result.modified_count > 0
+            if success and refresh_status:
+                await self._refresh_seat_status([event_id])
+            elif not success and sharded is None:
+                success = await self._reserve_sharded(event_id, 1)
+            debug_print("event_repository.py", "reserve_seat", "returning", success=success)
+            return success
+        except:
+            debug_print("event_repository.py", "reserve_seat", "returning", success=False)
+            return False
+    
+    async def reserve_seats(self, event_id: str, user_ids: List[str], sharded: Optional[bool] = None) -> bool:
+        """Atomically take a seat for every user, or for none of them"""
+        debug_print("event_repository.py", "reserve_seats", "variables", event_id=event_id, user_ids=user_ids, sharded=sharded)
+        
+        try:
+            if sharded:
+                success = await self._reserve_sharded(event_id, len(user_ids))
+                debug_print("event_repository.py", "reserve_seats", "returning", success=success)
+                return success
+            
+            result = await self.collection.update_one(
+                {
+                    "_id": ObjectId(event_id),
+                    "status": {"$ne": EventStatus.CLOSED},
+                    "seat_shards": None,
+                    "$expr": {"$lte": [{"$add": ["$registered_count", len(user_ids)]}, "$capacity"]}
+                },
+                {"$inc": {"registered_count": len(user_ids)}, "$currentDate": SYNC_STAMP}
+            )
+            success = result.modified_count > 0
+            if success:
+                await self._refresh_seat_status([event_id])
+            elif sharded is None:
+                success = await self._reserve_sharded(event_id, len(user_ids))
+            debug_print("event_repository.py", "reserve_seats", "returning", success=success)
+            return success
+        except:
+            debug_print("event_repository.py", "reserve_seats", "returning", success=False)
+            return False
+    
+    async def _reserve_sharded(self, event_id: str, count: int) -> bool:
+        """Take seats from the shard counters of a sharded event; False for unsharded or closed events"""
+        event = await self.get_event_by_id(event_id, {"seat_shards": 1, "status": 1})
+        if not event or not event.get("seat_shards") or event["status"] == EventStatus.CLOSED:
+            return False
+        
+        success = await self.seat_shards.reserve(event_id, event["seat_shards"], count)
+        # A failed reservation means the event looks full: publish that right away
+        await self._sync_shard_totals(event_id, force=not success)
+        return success
+    
+    async def _release_sharded(self, event_id: str, count: int) -> int:
+        """Give seats back to the shard counters of a sharded event"""
+        event = await self.get_event_by_id(event_id, {"seat_shards": 1})
+        if not event or not event.get("seat_shards"):
+            return 0
+        
+        released = await self.seat_shards.release(event_id, count)
+        await self._sync_shard_totals(event_id, force=True)
+        return released
+    
+    async def _sync_shard_totals(self, event_id: str, force: bool = False):
+        """Copy the summed shard counters onto the event document, at most every SEAT_SHARD_SYNC_SECONDS"""
+        now = time.monotonic()
+        if not force and now - _shard_synced_at.get(event_id, 0) < settings.SEAT_SHARD_SYNC_SECONDS:
+            return
+        _shard_synced_at[event_id] = now
+        
+        totals = await self.seat_shards.get_totals(event_id)
+        await self.collection.update_one(
+            {"_id": ObjectId(event_id), "registered_count": {"$ne": totals["taken"]}},
+            {"$set": {"registered_count": totals["taken"]}, "$currentDate": SYNC_STAMP}
+        )
+        await self._refresh_seat_status([event_id])
+    
     async def add_participant(self, event_id: str, user_id: str) -> bool:
         """Add a participant to an event"""
         debug_print("event_repository.py", "add_participant", "variables", event_id=event_id, user_id=user_id)
         
         try:
             result = await self.collection.update_one(
-                {"_id": ObjectId(event_id)},
-                {"$addToSet": {"registered_users": user_id}}
+                {"_id": ObjectId(event_id), "seat_shards": None},
+                {"$inc": {"registered_count": 1}, "$currentDate": SYNC_STAMP}
             )
             
-            # Update status if event is full
-            event = await self.get_event_by_id(event_id)
-            if event:
-                remaining = event["capacity"] - len(event.get("registered_users", []))
-                if remaining <= 0:
-                    await self.update_event_status(event_id, EventStatus.FULL)
-            
             success = result.modified_count > 0
+            if success:
+                # Update status if event is full
+                await self._refresh_seat_status([event_id])
+            else:
+                success = await self._reserve_sharded(event_id, 1)
             debug_print("event_repository.py", "add_participant", "returning", success=success)
             return success
         except:
@@ -114,45 +440,129 @@ class EventRepository:
         
         try:
             result = await self.collection.update_one(
-                {"_id": ObjectId(event_id)},
-                {"$pull": {"registered_users": user_id}}
+                {"_id": ObjectId(event_id), "seat_shards": None, "registered_count": {"$gt": 0}},
+                {"$inc": {"registered_count": -1}, "$currentDate": SYNC_STAMP}
             )
             
-            # Update status if event is no longer full
-            event = await self.get_event_by_id(event_id)
-            if event and event["status"] == EventStatus.FULL:
-                await self.update_event_status(event_id, EventStatus.OPEN)
-            
             success = result.modified_count > 0
+            if success:
+                # Update status if event is no longer full
+                await self._refresh_seat_status([event_id])
+            else:
+                success = await self._release_sharded(event_id, 1) > 0
             debug_print("event_repository.py", "remove_participant", "returning", success=success)
             return success
         except:
             debug_print("event_repository.py", "remove_participant", "returning", success=False)
             return False
     
+    async def release_seats(self, seats_by_event: Dict[str, List[str]]) -> int:
+        """Remove many participants from many events in one bulk write"""
+        debug_print("event_repository.py", "release_seats", "variables", events_count=len(seats_by_event))
+        
+        if not seats_by_event:
+            debug_print("event_repository.py", "release_seats", "returning", released_events=0)
+            return 0
+        
+        sharded = {
+            event["id"] for event in await self.get_events_by_ids(list(seats_by_event), {"seat_shards": 1})
+            if event.get("seat_shards")
+        }
+        for event_id in sharded:
+            await self._release_sharded(event_id, len(seats_by_event[event_id]))
+        
+        operations = [
+            UpdateOne(
+                {"_id": ObjectId(event_id), "registered_count": {"$gte": len(user_ids)}},
+                {"$inc": {"registered_count": -len(user_ids)}, "$currentDate": SYNC_STAMP}
+            )
+            for event_id, user_ids in seats_by_event.items()
+            if event_id not in sharded
+        ]
+        modified = len(sharded)
+        if operations:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            modified += result.modified_count
+        
+        # Reopen events that had been full and push the new seat counts
+        await self._refresh_seat_status([event_id for event_id in seats_by_event if event_id not in sharded])
+        
+        debug_print("event_repository.py", "release_seats", "returning", released_events=modified)
+        return modified
+    
     async def update_event_status(self, event_id: str, status: EventStatus) -> bool:
         """Update event status"""
         debug_print("event_repository.py", "update_event_status", "variables", event_id=event_id, status=status)
         
         try:
-            result = await self.collection.update_one(
-                {"_id": ObjectId(event_id)},
-                {"$set": {"status": status}}
+            previous = await self.collection.find_one_and_update(
+                {"_id": ObjectId(event_id), "status": {"$ne": status}},
+                {"$set": {"status": status}, "$currentDate": SYNC_STAMP},
+                projection={"status": 1, "capacity": 1, "registered_count": 1},
+                return_document=ReturnDocument.BEFORE
             )
-            success = result.modified_count > 0
+            success = previous is not None
+            if success:
+                _adjust_facet("statuses", previous.get("status"), status)
+                seat_broadcaster.publish(event_id, previous["capacity"] - previous.get("registered_count", 0), status)
             debug_print("event_repository.py", "update_event_status", "returning", success=success)
             return success
         except:
             debug_print("event_repository.py", "update_event_status", "returning", success=False)
             return False
     
+    async def get_changes_since(self, since_updated_at: Optional[datetime] = None, since_id: Optional[str] = None, limit: int = 500) -> List[dict]:
+        """Get events written after the given (updated_at, _id) position, oldest change first"""
+        debug_print("event_repository.py", "get_changes_since", "variables", since_updated_at=since_updated_at, since_id=since_id, limit=limit)
+        
+        projection = {**EVENT_LIST_PROJECTION, "updated_at": 1, "deleted_at": 1}
+        query = {}
+        if since_updated_at is not None:
+            query = {"$or": [
+                {"updated_at": {"$gt": since_updated_at}},
+                {"updated_at": since_updated_at, "_id": {"$gt": ObjectId(since_id)}}
+            ]}
+        order = [("updated_at", ASCENDING), ("_id", ASCENDING)]
+        events = await self.collection.find(query, projection).sort(order).limit(limit).to_list(length=limit)
+        # Archived events live on as tombstones carrying deleted_at
+        events += await self.tombstones.find(query).sort(order).limit(limit).to_list(length=limit)
+        events = sorted(events, key=lambda event: (event.get("updated_at") or datetime.min, event["_id"]))[:limit]
+        for event in events:
+            event["id"] = str(event["_id"])
+        
+        debug_print("event_repository.py", "get_changes_since", "returning", events_count=len(events))
+        return events
+    
+    async def get_facet_counts(self) -> dict:
+        """Get event counts per category and per status"""
+        debug_print("event_repository.py", "get_facet_counts", "variables")
+        
+        counts = _facet_cache.get("facets")
+        if counts is None:
+            pipeline = [
+                {"$facet": {
+                    "categories": [{"$group": {"_id": "$category", "count": {"$sum": 1}}}],
+                    "statuses": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+                }}
+            ]
+            result = await self.collection.aggregate(pipeline).to_list(length=1)
+            facets = result[0] if result else {"categories": [], "statuses": []}
+            counts = {
+                facet: {group["_id"]: group["count"] for group in groups if group["_id"] is not None}
+                for facet, groups in facets.items()
+            }
+            _facet_cache.set("facets", counts)
+        
+        debug_print("event_repository.py", "get_facet_counts", "returning", counts=counts)
+        return counts
+    
     async def get_remaining_seats(self, event_id: str) -> int:
         """Get remaining seats for an event"""
         debug_print("event_repository.py", "get_remaining_seats", "variables", event_id=event_id)
         
-        event = await self.get_event_by_id(event_id)
+        event = await self.get_event_by_id(event_id, {"capacity": 1, "registered_count": 1})
         if event:
-            remaining = event["capacity"] - len(event.get("registered_users", []))
+            remaining = event["capacity"] - event.get("registered_count", 0)
             debug_print("event_repository.py", "get_remaining_seats", "returning", remaining=remaining)
             return remaining
         
@@ -171,13 +581,127 @@ class EventRepository:
                 debug_print("event_repository.py", "update_event", "returning", success=False, reason="No data to update")
                 return False
             
-            result = await self.collection.update_one(
+            # Read the previous values atomically to keep the facet counts exact
+            previous = await self.collection.find_one_and_update(
                 {"_id": ObjectId(event_id)},
-                {"$set": update_data}
+                {"$set": update_data, "$currentDate": SYNC_STAMP},
+                projection={**{field: 1 for field in update_data}, "status": 1, "registered_count": 1, "seat_shards": 1},
+                return_document=ReturnDocument.BEFORE
             )
-            success = result.modified_count > 0
+            success = previous is not None and any(previous.get(k) != v for k, v in update_data.items())
+            if success and "category" in update_data:
+                _adjust_facet("categories", previous.get("category"), update_data["category"])
+            if success and "capacity" in update_data and previous.get("seat_shards"):
+                await self.seat_shards.adjust_capacity(event_id, update_data["capacity"] - previous["capacity"])
+                await self._sync_shard_totals(event_id, force=True)
+            elif success and "capacity" in update_data:
+                # Marks the event full or reopens it for the new capacity, and pushes the seat count
+                await self._refresh_seat_status([event_id])
             debug_print("event_repository.py", "update_event", "returning", success=success)
             return success
         except:
             debug_print("event_repository.py", "update_event", "returning", success=False)
             return False
+    
+    async def backfill_starts_at(self, batch_size: int = 500) -> int:
+        """Set starts_at on events created before the field existed"""
+        debug_print("event_repository.py", "backfill_starts_at", "variables", batch_size=batch_size)
+        
+        updated = 0
+        operations = []
+        cursor = self.collection.find({"starts_at": None}, {"date": 1, "time": 1})
+        async for event in cursor:
+            starts_at = parse_event_datetime(event.get("date"), event.get("time"))
+            if starts_at is None:
+                continue
+            operations.append(UpdateOne({"_id": event["_id"]}, {"$set": {"starts_at": starts_at}}))
+            if len(operations) >= batch_size:
+                result = await self.collection.bulk_write(operations, ordered=False)
+                updated += result.modified_count
+                operations = []
+        
+        if operations:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+        
+        debug_print("event_repository.py", "backfill_starts_at", "returning", updated=updated)
+        return updated
+    
+    async def backfill_search_keys(self, batch_size: int = 500) -> int:
+        """Set search_keys on events created before the field existed"""
+        debug_print("event_repository.py", "backfill_search_keys", "variables", batch_size=batch_size)
+        
+        updated = 0
+        operations = []
+        cursor = self.collection.find({"search_keys": None}, {"title": 1, "location": 1})
+        async for event in cursor:
+            search_keys = build_search_keys(event.get("title"), event.get("location"))
+            operations.append(UpdateOne({"_id": event["_id"]}, {"$set": {"search_keys": search_keys}}))
+            if len(operations) >= batch_size:
+                result = await self.collection.bulk_write(operations, ordered=False)
+                updated += result.modified_count
+                operations = []
+        
+        if operations:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+        
+        debug_print("event_repository.py", "backfill_search_keys", "returning", updated=updated)
+        return updated
+    
+    async def backfill_updated_at(self) -> int:
+        """Stamp updated_at on events created before delta sync existed"""
+        debug_print("event_repository.py", "backfill_updated_at", "variables")
+        
+        result = await self.collection.update_many({"updated_at": None}, {"$currentDate": SYNC_STAMP})
+        
+        debug_print("event_repository.py", "backfill_updated_at", "returning", updated=result.modified_count)
+        return result.modified_count
+    
+    async def get_seat_counters(self, updated_before: datetime, after_id: Optional[str] = None, limit: int = 500) -> List[dict]:
+        """Get a page of event seat counters not written since the given time, in _id order"""
+        debug_print("event_repository.py", "get_seat_counters", "variables", updated_before=updated_before, after_id=after_id, limit=limit)
+        
+        # Sharded events count their seats in the shard counters instead
+        query = {"updated_at": {"$lt": updated_before}, "seat_shards": None}
+        if after_id is not None:
+            query["_id"] = {"$gt": ObjectId(after_id)}
+        cursor = (
+            self.collection.find(query, {"registered_count": 1, "updated_at": 1, "has_participants_array": {"$isArray": "$registered_users"}})
+            .sort("_id", ASCENDING)
+            .limit(limit)
+        )
+        events = []
+        async for event in cursor:
+            event["id"] = str(event["_id"])
+            events.append(event)
+        
+        debug_print("event_repository.py", "get_seat_counters", "returning", events_count=len(events))
+        return events
+    
+    async def repair_seat_counters(self, repairs: List[dict]) -> int:
+        """Overwrite seat counters in one bulk write, skipping events written since they were read"""
+        debug_print("event_repository.py", "repair_seat_counters", "variables", repairs_count=len(repairs))
+        
+        if not repairs:
+            debug_print("event_repository.py", "repair_seat_counters", "returning", repaired=0)
+            return 0
+        
+        # Matching on the updated_at that was read keeps a concurrent reservation from being undone
+        operations = [
+            UpdateOne(
+                {"_id": ObjectId(repair["id"]), "updated_at": repair["updated_at"]},
+                {
+                    "$set": {"registered_count": repair["registered_count"]},
+                    "$currentDate": SYNC_STAMP,
+                    "$unset": {"registered_users": ""}
+                }
+            )
+            for repair in repairs
+        ]
+        result = await self.collection.bulk_write(operations, ordered=False)
+        
+        await self._refresh_seat_status([repair["id"] for repair in repairs])
+        
+        debug_print("event_repository.py", "repair_seat_counters", "returning", repaired=result.modified_count)
+        return result.modified_count
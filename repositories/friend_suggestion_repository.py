@@ -0,0 +1,53 @@
+from typing import Optional, List
+from datetime import datetime
+from pymongo import ASCENDING
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.debug import debug_print
+
+
+class FriendSuggestionRepository:
+    """Precomputed friend suggestions, one document per user"""
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db["friend_suggestions"]
+    
+    async def ensure_indexes(self):
+        """Create the index used to find users who asked for suggestions recently"""
+        debug_print("friend_suggestion_repository.py", "ensure_indexes", "variables")
+        
+        await self.collection.create_index([("requested_at", ASCENDING)], name="requested_at_1")
+    
+    async def get_suggestions(self, user_id: str) -> Optional[dict]:
+        """Get a user's suggestion document"""
+        debug_print("friend_suggestion_repository.py", "get_suggestions", "variables", user_id=user_id)
+        
+        document = await self.collection.find_one({"_id": user_id})
+        
+        debug_print("friend_suggestion_repository.py", "get_suggestions", "returning", found=document is not None)
+        return document
+    
+    async def save_suggestions(self, user_id: str, suggestions: List[dict], requested: bool = False):
+        """Replace a user's suggestions; requested marks that the user asked for them"""
+        debug_print("friend_suggestion_repository.py", "save_suggestions", "variables", user_id=user_id, suggestions_count=len(suggestions), requested=requested)
+        
+        now = datetime.utcnow()
+        update = {"$set": {"suggestions": suggestions, "computed_at": now}}
+        if requested:
+            update["$set"]["requested_at"] = now
+        await self.collection.update_one({"_id": user_id}, update, upsert=True)
+    
+    async def touch_requested(self, user_id: str):
+        """Mark that the user asked for their suggestions again, keeping them in the precomputation"""
+        debug_print("friend_suggestion_repository.py", "touch_requested", "variables", user_id=user_id)
+        
+        await self.collection.update_one({"_id": user_id}, {"$set": {"requested_at": datetime.utcnow()}})
+    
+    async def get_recently_requested_user_ids(self, since: datetime) -> List[str]:
+        """Get the IDs of the users who asked for suggestions since the given time"""
+        debug_print("friend_suggestion_repository.py", "get_recently_requested_user_ids", "variables", since=since)
+        
+        cursor = self.collection.find({"requested_at": {"$gte": since}}, {"_id": 1})
+        user_ids = [document["_id"] async for document in cursor]
+        
+        debug_print("friend_suggestion_repository.py", "get_recently_requested_user_ids", "returning", users_count=len(user_ids))
+        return user_ids
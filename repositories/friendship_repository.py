@@ -1,6 +1,7 @@
 from typing import Optional, List
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from utils.debug import debug_print
 
@@ -9,6 +10,19 @@ class FriendshipRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.collection = db["friendships"]
     
+    async def ensure_indexes(self):
+        """Create the indexes used to look friendships up from either side, newest first"""
+        debug_print("friendship_repository.py", "ensure_indexes", "variables")
+        
+        await self.collection.create_index(
+            [("solicitante_id", ASCENDING), ("status", ASCENDING), ("_id", DESCENDING)],
+            name="solicitante_id_1_status_1__id_-1"
+        )
+        await self.collection.create_index(
+            [("destinatario_id", ASCENDING), ("status", ASCENDING), ("_id", DESCENDING)],
+            name="destinatario_id_1_status_1__id_-1"
+        )
+    
     async def create_friendship_request(self, from_user_id: str, to_user_id: str) -> str:
         """Create a new friendship request"""
         debug_print("friendship_repository.py", "create_friendship_request", "variables", from_user_id=from_user_id, to_user_id=to_user_id)
@@ -91,9 +105,9 @@ class FriendshipRepository:
         debug_print("friendship_repository.py", "get_pending_requests_received", "returning", requests_count=len(requests))
         return requests
     
-    async def get_all_friends(self, user_id: str) -> List[str]:
-        """Get all friend IDs for a user (accepted friendships)"""
-        debug_print("friendship_repository.py", "get_all_friends", "variables", user_id=user_id)
+    async def get_all_friends(self, user_id: str, limit: Optional[int] = None) -> List[str]:
+        """Get all friend IDs for a user (accepted friendships), or the limit most recent ones"""
+        debug_print("friendship_repository.py", "get_all_friends", "variables", user_id=user_id, limit=limit)
         
         cursor = self.collection.find({
             "$or": [
@@ -101,6 +115,8 @@ class FriendshipRepository:
                 {"destinatario_id": user_id, "status": "accepted"}
             ]
         })
+        if limit is not None:
+            cursor = cursor.sort("_id", DESCENDING).limit(limit)
         
         friend_ids = []
         async for friendship in cursor:
@@ -112,3 +128,106 @@ class FriendshipRepository:
         
         debug_print("friendship_repository.py", "get_all_friends", "returning", friend_ids=friend_ids)
         return friend_ids
+    
+    async def get_connected_user_ids(self, user_id: str) -> List[str]:
+        """Get the IDs of every user with a friendship or pending request with the user, in either direction"""
+        debug_print("friendship_repository.py", "get_connected_user_ids", "variables", user_id=user_id)
+        
+        cursor = self.collection.find(
+            {"$or": [{"solicitante_id": user_id}, {"destinatario_id": user_id}]},
+            {"solicitante_id": 1, "destinatario_id": 1}
+        )
+        user_ids = []
+        async for friendship in cursor:
+            user_ids.append(friendship["destinatario_id"] if friendship["solicitante_id"] == user_id else friendship["solicitante_id"])
+        
+        debug_print("friendship_repository.py", "get_connected_user_ids", "returning", users_count=len(user_ids))
+        return user_ids
+    
+    async def get_friend_edges(self, user_ids: List[str], limit: int) -> List[tuple]:
+        """Get up to limit accepted friendships touching any of the users, most recent first, as (user, friend) pairs"""
+        debug_print("friendship_repository.py", "get_friend_edges", "variables", users_count=len(user_ids), limit=limit)
+        
+        cursor = self.collection.find(
+            {"$or": [
+                {"solicitante_id": {"$in": user_ids}, "status": "accepted"},
+                {"destinatario_id": {"$in": user_ids}, "status": "accepted"}
+            ]},
+            {"solicitante_id": 1, "destinatario_id": 1}
+        ).sort("_id", DESCENDING).limit(limit)
+        edges = [(friendship["solicitante_id"], friendship["destinatario_id"]) async for friendship in cursor]
+        
+        debug_print("friendship_repository.py", "get_friend_edges", "returning", edges_count=len(edges))
+        return edges
+    
+    async def get_friendships_page(self, user_id: str, before_id: Optional[str] = None, limit: int = 20) -> List[dict]:
+        """Get a user's accepted friendships, newest first, older than the given friendship ID"""
+        debug_print("friendship_repository.py", "get_friendships_page", "variables", user_id=user_id, before_id=before_id, limit=limit)
+        
+        older = {"_id": {"$lt": ObjectId(before_id)}} if before_id is not None else {}
+        cursor = self.collection.find({
+            "$or": [
+                {"solicitante_id": user_id, "status": "accepted", **older},
+                {"destinatario_id": user_id, "status": "accepted", **older}
+            ]
+        }).sort("_id", DESCENDING).limit(limit)
+        
+        friendships = []
+        async for friendship in cursor:
+            friendship["id"] = str(friendship["_id"])
+            friendship["friend_id"] = friendship["destinatario_id"] if friendship["solicitante_id"] == user_id else friendship["solicitante_id"]
+            friendships.append(friendship)
+        
+        debug_print("friendship_repository.py", "get_friendships_page", "returning", friendships_count=len(friendships))
+        return friendships
+    
+    async def get_pending_requests_page(self, user_id: str, before_id: Optional[str] = None, limit: int = 20) -> List[dict]:
+        """Get pending friendship requests received by a user, newest first, older than the given request ID"""
+        debug_print("friendship_repository.py", "get_pending_requests_page", "variables", user_id=user_id, before_id=before_id, limit=limit)
+        
+        query = {"destinatario_id": user_id, "status": "pending"}
+        if before_id is not None:
+            query["_id"] = {"$lt": ObjectId(before_id)}
+        cursor = self.collection.find(query).sort("_id", DESCENDING).limit(limit)
+        
+        requests = []
+        async for request in cursor:
+            request["id"] = str(request["_id"])
+            requests.append(request)
+        
+        debug_print("friendship_repository.py", "get_pending_requests_page", "returning", requests_count=len(requests))
+        return requests
+    
+    async def get_pending_request_ids(self, user_id: str, friendship_ids: List[str]) -> List[str]:
+        """Get which of the given friendship IDs are pending requests received by the user"""
+        debug_print("friendship_repository.py", "get_pending_request_ids", "variables", user_id=user_id, friendship_ids_count=len(friendship_ids))
+        
+        object_ids = [ObjectId(fid) for fid in friendship_ids if ObjectId.is_valid(fid)]
+        cursor = self.collection.find(
+            {"_id": {"$in": object_ids}, "destinatario_id": user_id, "status": "pending"},
+            {"_id": 1}
+        )
+        pending_ids = [str(request["_id"]) async for request in cursor]
+        
+        debug_print("friendship_repository.py", "get_pending_request_ids", "returning", pending_ids_count=len(pending_ids))
+        return pending_ids
+    
+    async def accept_friendship_requests(self, user_id: str, friendship_ids: List[str]) -> int:
+        """Accept many pending friendship requests received by the user in a single update"""
+        debug_print("friendship_repository.py", "accept_friendship_requests", "variables", user_id=user_id, friendship_ids_count=len(friendship_ids))
+        
+        if not friendship_ids:
+            debug_print("friendship_repository.py", "accept_friendship_requests", "returning", accepted_count=0)
+            return 0
+        
+        result = await self.collection.update_many(
+            {
+                "_id": {"$in": [ObjectId(fid) for fid in friendship_ids]},
+                "destinatario_id": user_id,
+                "status": "pending"
+            },
+            {"$set": {"status": "accepted"}}
+        )
+        
+        debug_print("friendship_repository.py", "accept_friendship_requests", "returning", accepted_count=result.modified_count)
+        return result.modified_count
@@ -0,0 +1,98 @@
+from typing import Optional
+from datetime import datetime
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from config.settings import settings
+from utils.debug import debug_print
+
+
+class IdempotencyRepository:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db["idempotency_keys"]
+    
+    async def ensure_indexes(self):
+        """Create the TTL index that expires stored responses"""
+        debug_print("idempotency_repository.py", "ensure_indexes", "variables")
+        
+        await self.collection.create_index(
+            [("created_at", ASCENDING)],
+            expireAfterSeconds=settings.IDEMPOTENCY_TTL_SECONDS,
+            name="created_at_ttl"
+        )
+    
+    async def reserve_key(self, key_id: str, fingerprint: Optional[str], claim_id: str) -> bool:
+        """Claim a key before running the request; False if it was already claimed"""
+        debug_print("idempotency_repository.py", "reserve_key", "variables", key_id=key_id, fingerprint=fingerprint, claim_id=claim_id)
+        
+        now = datetime.utcnow()
+        try:
+            await self.collection.insert_one({
+                "_id": key_id,
+                "fingerprint": fingerprint,
+                "status_code": None,
+                "body": None,
+                "claim_id": claim_id,
+                "claimed_at": now,
+                "created_at": now
+            })
+            success = True
+        except DuplicateKeyError:
+            success = False
+        
+        debug_print("idempotency_repository.py", "reserve_key", "returning", success=success)
+        return success
+    
+    async def take_over_key(self, key_id: str, fingerprint: Optional[str], claim_id: str, stale_before: datetime) -> bool:
+        """Claim a key whose unfinished claim is older than stale_before, e.g. left by a crashed worker"""
+        debug_print("idempotency_repository.py", "take_over_key", "variables", key_id=key_id, claim_id=claim_id, stale_before=stale_before)
+        
+        result = await self.collection.update_one(
+            {
+                "_id": key_id,
+                "fingerprint": fingerprint,
+                "status_code": None,
+                "$or": [
+                    {"claimed_at": {"$lt": stale_before}},
+                    # Claims made before leases existed
+                    {"claimed_at": None, "created_at": {"$lt": stale_before}}
+                ]
+            },
+            {"$set": {"claim_id": claim_id, "claimed_at": datetime.utcnow()}}
+        )
+        success = result.modified_count > 0
+        
+        debug_print("idempotency_repository.py", "take_over_key", "returning", success=success)
+        return success
+    
+    async def get_key(self, key_id: str) -> Optional[dict]:
+        """Get a claimed key and its stored response, if any"""
+        debug_print("idempotency_repository.py", "get_key", "variables", key_id=key_id)
+        
+        record = await self.collection.find_one({"_id": key_id})
+        
+        debug_print("idempotency_repository.py", "get_key", "returning", record=record)
+        return record
+    
+    async def save_response(self, key_id: str, claim_id: str, status_code: int, body: dict) -> bool:
+        """Store the response to replay for a key, unless another claim took it over"""
+        debug_print("idempotency_repository.py", "save_response", "variables", key_id=key_id, claim_id=claim_id, status_code=status_code)
+        
+        result = await self.collection.update_one(
+            {"_id": key_id, "claim_id": claim_id, "status_code": None},
+            {"$set": {"status_code": status_code, "body": body}}
+        )
+        success = result.modified_count > 0
+        
+        debug_print("idempotency_repository.py", "save_response", "returning", success=success)
+        return success
+    
+    async def release_key(self, key_id: str, claim_id: str) -> bool:
+        """Forget a key whose request failed, so a retry runs it again"""
+        debug_print("idempotency_repository.py", "release_key", "variables", key_id=key_id, claim_id=claim_id)
+        
+        result = await self.collection.delete_one({"_id": key_id, "claim_id": claim_id, "status_code": None})
+        success = result.deleted_count > 0
+        
+        debug_print("idempotency_repository.py", "release_key", "returning", success=success)
+        return success
@@ -0,0 +1,85 @@
+from typing import Optional
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.debug import debug_print
+
+
+class JobRepository:
+    """Durable outbox of background jobs"""
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db["job_outbox"]
+    
+    async def ensure_indexes(self):
+        """Create the indexes used to find due and stuck jobs"""
+        debug_print("job_repository.py", "ensure_indexes", "variables")
+        
+        await self.collection.create_index([("status", ASCENDING), ("run_after", ASCENDING)], name="status_1_run_after_1")
+    
+    async def insert_job(self, name: str, payload: dict) -> str:
+        """Store a new pending job and return its ID"""
+        debug_print("job_repository.py", "insert_job", "variables", name=name, payload=payload)
+        
+        now = datetime.utcnow()
+        result = await self.collection.insert_one({
+            "name": name,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "run_after": now,
+            "created_at": now
+        })
+        job_id = str(result.inserted_id)
+        
+        debug_print("job_repository.py", "insert_job", "returning", job_id=job_id)
+        return job_id
+    
+    async def claim_job(self, job_id: str, owner: str) -> Optional[dict]:
+        """Take a specific pending job; None if it is not pending anymore"""
+        debug_print("job_repository.py", "claim_job", "variables", job_id=job_id, owner=owner)
+        
+        job = await self.collection.find_one_and_update(
+            {"_id": ObjectId(job_id), "status": "pending"},
+            {"$set": {"status": "running", "owner": owner, "locked_at": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+        
+        debug_print("job_repository.py", "claim_job", "returning", claimed=job is not None)
+        return job
+    
+    async def claim_due_job(self, owner: str, lock_timeout_seconds: int) -> Optional[dict]:
+        """Take the oldest due job, including ones left running by a worker that died"""
+        debug_print("job_repository.py", "claim_due_job", "variables", owner=owner)
+        
+        now = datetime.utcnow()
+        job = await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "run_after": {"$lte": now}},
+                {"status": "running", "locked_at": {"$lte": now - timedelta(seconds=lock_timeout_seconds)}}
+            ]},
+            {"$set": {"status": "running", "owner": owner, "locked_at": now}},
+            sort=[("run_after", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+        
+        debug_print("job_repository.py", "claim_due_job", "returning", claimed=job is not None)
+        return job
+    
+    async def complete_job(self, job_id: ObjectId):
+        """Remove a job that ran successfully"""
+        debug_print("job_repository.py", "complete_job", "variables", job_id=job_id)
+        
+        await self.collection.delete_one({"_id": job_id})
+    
+    async def fail_job(self, job_id: ObjectId, error: str, retry_at: Optional[datetime]):
+        """Record a failed attempt; the job is retried at retry_at, or parked as failed when None"""
+        debug_print("job_repository.py", "fail_job", "variables", job_id=job_id, error=error, retry_at=retry_at)
+        
+        update = {"$inc": {"attempts": 1}, "$set": {"last_error": error}, "$unset": {"owner": "", "locked_at": ""}}
+        if retry_at is None:
+            update["$set"]["status"] = "failed"
+        else:
+            update["$set"].update({"status": "pending", "run_after": retry_at})
+        await self.collection.update_one({"_id": job_id}, update)
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.debug import debug_print
+
+
+class LockRepository:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db["locks"]
+    
+    async def acquire_lock(self, name: str, owner: str, ttl_seconds: int) -> bool:
+        """Take or renew a lease on a named lock; False if another owner holds it"""
+        debug_print("lock_repository.py", "acquire_lock", "variables", name=name, owner=owner, ttl_seconds=ttl_seconds)
+        
+        now = datetime.utcnow()
+        try:
+            # Matches when we already own the lock or its lease expired; otherwise the
+            # upsert collides with the existing document on _id
+            await self.collection.update_one(
+                {"_id": name, "$or": [{"owner": owner}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=ttl_seconds)}},
+                upsert=True
+            )
+            success = True
+        except DuplicateKeyError:
+            success = False
+        
+        debug_print("lock_repository.py", "acquire_lock", "returning", success=success)
+        return success
+    
+    async def release_lock(self, name: str, owner: str) -> bool:
+        """Give up a lock we own"""
+        debug_print("lock_repository.py", "release_lock", "variables", name=name, owner=owner)
+        
+        result = await self.collection.delete_one({"_id": name, "owner": owner})
+        success = result.deleted_count > 0
+        
+        debug_print("lock_repository.py", "release_lock", "returning", success=success)
+        return success
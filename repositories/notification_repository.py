@@ -0,0 +1,59 @@
+from typing import Optional, List
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.debug import debug_print
+
+
+class NotificationRepository:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db["notifications"]
+    
+    async def ensure_indexes(self):
+        """Create the indexes used to page a user's notifications and to deduplicate fan-outs"""
+        debug_print("notification_repository.py", "ensure_indexes", "variables")
+        
+        await self.collection.create_index([("usuario_id", ASCENDING), ("_id", DESCENDING)], name="usuario_id_1__id_-1")
+        await self.collection.create_index(
+            [("fanout_id", ASCENDING), ("usuario_id", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"fanout_id": {"$exists": True}},
+            name="fanout_id_1_usuario_id_1"
+        )
+    
+    async def insert_notifications(self, notifications: List[dict]) -> int:
+        """Insert a chunk of notifications, skipping ones a previous attempt already wrote"""
+        debug_print("notification_repository.py", "insert_notifications", "variables", notifications_count=len(notifications))
+        
+        if not notifications:
+            debug_print("notification_repository.py", "insert_notifications", "returning", inserted=0)
+            return 0
+        
+        try:
+            result = await self.collection.insert_many(notifications, ordered=False)
+            inserted = len(result.inserted_ids)
+        except BulkWriteError as error:
+            # Duplicate (fanout_id, usuario_id) pairs come from a retried fan-out
+            if any(write_error["code"] != 11000 for write_error in error.details["writeErrors"]):
+                raise
+            inserted = error.details["nInserted"]
+        
+        debug_print("notification_repository.py", "insert_notifications", "returning", inserted=inserted)
+        return inserted
+    
+    async def get_user_notifications(self, user_id: str, before_id: Optional[str] = None, limit: int = 20) -> List[dict]:
+        """Get a user's notifications, newest first, older than the given notification ID"""
+        debug_print("notification_repository.py", "get_user_notifications", "variables", user_id=user_id, before_id=before_id, limit=limit)
+        
+        query = {"usuario_id": user_id}
+        if before_id is not None:
+            query["_id"] = {"$lt": ObjectId(before_id)}
+        cursor = self.collection.find(query).sort("_id", DESCENDING).limit(limit)
+        notifications = []
+        async for notification in cursor:
+            notification["id"] = str(notification["_id"])
+            notifications.append(notification)
+        
+        debug_print("notification_repository.py", "get_user_notifications", "returning", notifications_count=len(notifications))
+        return notifications
@@ -1,33 +1,133 @@
-from typing import Optional, List
+import uuid
+from typing import Optional, List, AsyncIterator
 from datetime import datetime
 from bson import ObjectId
+from pymongo import ASCENDING, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from schemas.registration_schema import RegistrationStatus
 from utils.debug import debug_print
 
+# Registrations holding a seat
+ACTIVE_STATUSES = [RegistrationStatus.AGUARDANDO_PAGAMENTO, RegistrationStatus.APROVADA, RegistrationStatus.FINALIZADA]
+
 
 class RegistrationRepository:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.collection = db["registrations"]
+        self.archive = db["registrations_archive"]
+    
+    async def ensure_indexes(self):
+        """Create the indexes used by the registration queries"""
+        debug_print("registration_repository.py", "ensure_indexes", "variables")
+        
+        await self.collection.create_index([("usuario_id", ASCENDING)], name="usuario_id_1")
+        await self.collection.create_index([("evento_id", ASCENDING), ("usuario_id", ASCENDING)], name="evento_id_1_usuario_id_1")
+        await self.collection.create_index([("evento_id", ASCENDING), ("status", ASCENDING)], name="evento_id_1_status_1")
+        await self.collection.create_index([("timestamp_inscricao", ASCENDING)], name="timestamp_inscricao_1")
+        await self.collection.create_index([("status", ASCENDING), ("timestamp_inscricao", ASCENDING)], name="status_1_timestamp_inscricao_1")
+    
+    async def ensure_active_unique_index(self):
+        """Allow at most one active registration per user and event, so a double submit cannot take two seats
+
+        Building it fails while duplicates exist, so it is created by a migration after
+        cancel_duplicate_active_registrations ($in in a partial filter needs MongoDB 6.0+)
+        """
+        debug_print("registration_repository.py", "ensure_active_unique_index", "variables")
+        
+        await self.collection.create_index(
+            [("evento_id", ASCENDING), ("usuario_id", ASCENDING)],
+            name="evento_id_1_usuario_id_1_active",
+            unique=True,
+            partialFilterExpression={"status": {"$in": [status.value for status in ACTIVE_STATUSES]}}
+        )
+    
+    async def cancel_duplicate_active_registrations(self) -> int:
+        """Cancel all but one active registration per user and event; returns how many were cancelled
+
+        The one kept is the furthest along (finalizada, then aprovada), then the oldest.
+        """
+        debug_print("registration_repository.py", "cancel_duplicate_active_registrations", "variables")
+        
+        progress = [RegistrationStatus.FINALIZADA, RegistrationStatus.APROVADA, RegistrationStatus.AGUARDANDO_PAGAMENTO]
+        pipeline = [
+            {"$match": {"status": {"$in": ACTIVE_STATUSES}}},
+            {"$sort": {"timestamp_inscricao": 1, "_id": 1}},
+            {"$group": {
+                "_id": {"evento_id": "$evento_id", "usuario_id": "$usuario_id"},
+                "registrations": {"$push": {"_id": "$_id", "status": "$status"}}
+            }},
+            {"$match": {"registrations.1": {"$exists": True}}}
+        ]
+        duplicate_ids = []
+        async for group in self.collection.aggregate(pipeline, allowDiskUse=True):
+            # Stable sort: among the furthest along, the oldest comes first
+            registrations = sorted(group["registrations"], key=lambda reg: progress.index(reg["status"]))
+            duplicate_ids.extend(reg["_id"] for reg in registrations[1:])
+        
+        cancelled = 0
+        if duplicate_ids:
+            result = await self.collection.update_many(
+                {"_id": {"$in": duplicate_ids}, "status": {"$in": ACTIVE_STATUSES}},
+                {"$set": {"status": RegistrationStatus.CANCELADA}}
+            )
+            cancelled = result.modified_count
+        
+        debug_print("registration_repository.py", "cancel_duplicate_active_registrations", "returning", cancelled=cancelled)
+        return cancelled
     
-    async def create_registration(self, user_id: str, event_id: str, status: RegistrationStatus = RegistrationStatus.AGUARDANDO_PAGAMENTO) -> str:
-        """Create a new registration"""
+    async def create_registration(self, user_id: str, event_id: str, status: RegistrationStatus = RegistrationStatus.AGUARDANDO_PAGAMENTO) -> Optional[str]:
+        """Create a new registration; returns None if the user already has an active one for the event"""
         debug_print("registration_repository.py", "create_registration", "variables", user_id=user_id, event_id=event_id, status=status)
         
+        now = datetime.utcnow()
         registration_data = {
             "usuario_id": user_id,
             "evento_id": event_id,
             "status": status,
-            "timestamp_inscricao": datetime.utcnow(),
-            "timestamp_pagamento": None
+            "timestamp_inscricao": now,
+            "timestamp_pagamento": now if status == RegistrationStatus.APROVADA else None
         }
         
-        result = await self.collection.insert_one(registration_data)
-        registration_id = str(result.inserted_id)
+        try:
+            result = await self.collection.insert_one(registration_data)
+            registration_id = str(result.inserted_id)
+        except DuplicateKeyError:
+            registration_id = None
         
         debug_print("registration_repository.py", "create_registration", "returning", registration_id=registration_id)
         return registration_id
     
+    async def create_registrations(self, user_ids: List[str], event_id: str, status: RegistrationStatus, registered_by: str) -> Optional[List[str]]:
+        """Create one registration per user in a single insert, all or none; returns None if any user already has an active one"""
+        debug_print("registration_repository.py", "create_registrations", "variables", user_ids=user_ids, event_id=event_id, status=status, registered_by=registered_by)
+        
+        now = datetime.utcnow()
+        registrations = [
+            {
+                "usuario_id": user_id,
+                "evento_id": event_id,
+                "status": status,
+                "timestamp_inscricao": now,
+                "timestamp_pagamento": now if status == RegistrationStatus.APROVADA else None,
+                "registrado_por": registered_by
+            }
+            for user_id in user_ids
+        ]
+        
+        try:
+            result = await self.collection.insert_many(registrations)
+            registration_ids = [str(inserted_id) for inserted_id in result.inserted_ids]
+        except BulkWriteError as error:
+            # insert_many stamped the _ids on the documents; drop the ones inserted before the failure
+            await self.collection.delete_many({"_id": {"$in": [registration["_id"] for registration in registrations if "_id" in registration]}})
+            if any(write_error["code"] != 11000 for write_error in error.details.get("writeErrors", [])):
+                raise
+            registration_ids = None
+        
+        debug_print("registration_repository.py", "create_registrations", "returning", registration_ids=registration_ids)
+        return registration_ids
+    
     async def get_registration_by_id(self, registration_id: str) -> Optional[dict]:
         """Get registration by ID"""
         debug_print("registration_repository.py", "get_registration_by_id", "variables", registration_id=registration_id)
@@ -55,6 +155,65 @@ class RegistrationRepository:
         debug_print("registration_repository.py", "get_user_registrations", "returning", registrations_count=len(registrations))
         return registrations
     
+    async def get_user_registrations_with_events(
+        self,
+        user_id: str,
+        now: datetime,
+        upcoming: Optional[bool] = None,
+        skip: int = 0,
+        limit: int = 20,
+        include_archive: bool = False
+    ) -> List[dict]:
+        """Get a page of a user's registrations joined with their event, upcoming events first"""
+        debug_print("registration_repository.py", "get_user_registrations_with_events", "variables", user_id=user_id, now=now, upcoming=upcoming, skip=skip, limit=limit, include_archive=include_archive)
+        
+        def lookup_event(collection: str, field: str) -> dict:
+            # Each lookup is a single _id index hit
+            return {"$lookup": {
+                "from": collection,
+                "let": {"event_id": {"$convert": {"input": "$evento_id", "to": "objectId", "onError": None, "onNull": None}}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$event_id"]}}},
+                    {"$project": {"title": 1, "date": 1, "banner": 1, "starts_at": 1}}
+                ],
+                "as": field
+            }}
+        
+        pipeline = [{"$match": {"usuario_id": user_id}}, lookup_event("events", "event")]
+        if include_archive:
+            # Archived registrations may point at a hot event (closed ones) or an archived one
+            pipeline = [
+                {"$match": {"usuario_id": user_id}},
+                {"$unionWith": {"coll": "registrations_archive", "pipeline": [{"$match": {"usuario_id": user_id}}]}},
+                lookup_event("events", "event"),
+                lookup_event("events_archive", "archived_event"),
+                {"$addFields": {"event": {"$concatArrays": ["$event", "$archived_event"]}}}
+            ]
+        pipeline += [
+            {"$unwind": "$event"},
+            # Events without a parsed date count as past
+            {"$addFields": {"is_upcoming": {"$gte": ["$event.starts_at", now]}}}
+        ]
+        if upcoming is not None:
+            pipeline.append({"$match": {"is_upcoming": upcoming}})
+        pipeline += [
+            # Upcoming events soonest first, then past events most recent first
+            {"$addFields": {"sort_time": {"$multiply": [
+                {"$toLong": {"$ifNull": ["$event.starts_at", datetime(1970, 1, 1)]}},
+                {"$cond": ["$is_upcoming", 1, -1]}
+            ]}}},
+            {"$sort": {"is_upcoming": -1, "sort_time": 1, "_id": 1}},
+            {"$skip": skip},
+            {"$limit": limit}
+        ]
+        registrations = []
+        async for registration in self.collection.aggregate(pipeline):
+            registration["id"] = str(registration["_id"])
+            registrations.append(registration)
+        
+        debug_print("registration_repository.py", "get_user_registrations_with_events", "returning", registrations_count=len(registrations))
+        return registrations
+    
     async def get_registration_by_user_and_event(self, user_id: str, event_id: str) -> Optional[dict]:
         """Check if user is already registered for an event"""
         debug_print("registration_repository.py", "get_registration_by_user_and_event", "variables", user_id=user_id, event_id=event_id)
@@ -70,6 +229,23 @@ class RegistrationRepository:
         debug_print("registration_repository.py", "get_registration_by_user_and_event", "returning", registration=registration)
         return registration
     
+    async def get_active_registrations_for_users(self, user_ids: List[str], event_id: str) -> List[dict]:
+        """Get the active registrations of any of the users for an event"""
+        debug_print("registration_repository.py", "get_active_registrations_for_users", "variables", user_ids=user_ids, event_id=event_id)
+        
+        cursor = self.collection.find({
+            "evento_id": event_id,
+            "usuario_id": {"$in": user_ids},
+            "status": {"$nin": [RegistrationStatus.CANCELADA, RegistrationStatus.RECUSADA]}
+        })
+        registrations = []
+        async for registration in cursor:
+            registration["id"] = str(registration["_id"])
+            registrations.append(registration)
+        
+        debug_print("registration_repository.py", "get_active_registrations_for_users", "returning", registrations_count=len(registrations))
+        return registrations
+    
     async def cancel_registration(self, registration_id: str) -> bool:
         """Cancel a registration"""
         debug_print("registration_repository.py", "cancel_registration", "variables", registration_id=registration_id)
@@ -90,18 +266,34 @@ class RegistrationRepository:
             debug_print("registration_repository.py", "cancel_registration", "returning", success=False)
             return False
     
-    async def update_registration_status(self, registration_id: str, status: RegistrationStatus) -> bool:
-        """Update registration status"""
-        debug_print("registration_repository.py", "update_registration_status", "variables", registration_id=registration_id, status=status)
+    async def update_registration_status(
+        self,
+        registration_id: str,
+        status: RegistrationStatus,
+        paid_at: Optional[datetime] = None,
+        from_statuses: Optional[List[RegistrationStatus]] = None
+    ) -> Optional[bool]:
+        """Update registration status, stamping the payment time in the same write when given
+
+        With from_statuses, only a registration currently in one of them changes. Returns None
+        when the change would give the user a second active registration for the event.
+        """
+        debug_print("registration_repository.py", "update_registration_status", "variables", registration_id=registration_id, status=status, paid_at=paid_at, from_statuses=from_statuses)
         
+        update = {"status": status}
+        if paid_at is not None:
+            update["timestamp_pagamento"] = paid_at
         try:
-            result = await self.collection.update_one(
-                {"_id": ObjectId(registration_id)},
-                {"$set": {"status": status}}
-            )
+            query = {"_id": ObjectId(registration_id)}
+            if from_statuses is not None:
+                query["status"] = {"$in": from_statuses}
+            result = await self.collection.update_one(query, {"$set": update})
             success = result.modified_count > 0
             debug_print("registration_repository.py", "update_registration_status", "returning", success=success)
             return success
+        except DuplicateKeyError:
+            debug_print("registration_repository.py", "update_registration_status", "returning", success=None)
+            return None
         except:
             debug_print("registration_repository.py", "update_registration_status", "returning", success=False)
             return False
@@ -137,3 +329,271 @@ class RegistrationRepository:
         
         debug_print("registration_repository.py", "get_event_registrations", "returning", registrations_count=len(registrations))
         return registrations
+    
+    async def get_event_participant_ids(self, event_id: str) -> List[str]:
+        """Get the IDs of the users holding a seat at an event"""
+        debug_print("registration_repository.py", "get_event_participant_ids", "variables", event_id=event_id)
+        
+        cursor = self.collection.find(
+            {"evento_id": event_id, "status": {"$in": ACTIVE_STATUSES}},
+            {"usuario_id": 1, "_id": 0}
+        )
+        user_ids = [registration["usuario_id"] async for registration in cursor]
+        
+        debug_print("registration_repository.py", "get_event_participant_ids", "returning", participants_count=len(user_ids))
+        return user_ids
+    
+    async def iter_event_participant_ids(self, event_id: str, batch_size: int = 1000) -> AsyncIterator[List[str]]:
+        """Stream the IDs of the users holding a seat at an event, batch_size at a time"""
+        debug_print("registration_repository.py", "iter_event_participant_ids", "variables", event_id=event_id, batch_size=batch_size)
+        
+        cursor = self.collection.find(
+            {"evento_id": event_id, "status": {"$in": ACTIVE_STATUSES}},
+            {"usuario_id": 1, "_id": 0},
+            batch_size=batch_size
+        )
+        batch = []
+        async for registration in cursor:
+            batch.append(registration["usuario_id"])
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    async def get_events_attended_by(self, user_ids: List[str]) -> List[dict]:
+        """Group the seat-holding registrations of the given users by event"""
+        debug_print("registration_repository.py", "get_events_attended_by", "variables", users_count=len(user_ids))
+        
+        pipeline = [
+            {"$match": {"usuario_id": {"$in": user_ids}, "status": {"$in": ACTIVE_STATUSES}}},
+            {"$group": {"_id": "$evento_id", "user_ids": {"$addToSet": "$usuario_id"}}}
+        ]
+        groups = [
+            {"event_id": group["_id"], "user_ids": group["user_ids"]}
+            async for group in self.collection.aggregate(pipeline)
+        ]
+        
+        debug_print("registration_repository.py", "get_events_attended_by", "returning", events_count=len(groups))
+        return groups
+    
+    async def count_shared_events(self, user_ids: List[str], event_ids: List[str]) -> dict:
+        """Count, per user, the seat-holding registrations they have for any of the events"""
+        debug_print("registration_repository.py", "count_shared_events", "variables", users_count=len(user_ids), events_count=len(event_ids))
+        
+        pipeline = [
+            {"$match": {"usuario_id": {"$in": user_ids}, "evento_id": {"$in": event_ids}, "status": {"$in": ACTIVE_STATUSES}}},
+            {"$group": {"_id": "$usuario_id", "count": {"$sum": 1}}}
+        ]
+        counts = {group["_id"]: group["count"] async for group in self.collection.aggregate(pipeline)}
+        
+        debug_print("registration_repository.py", "count_shared_events", "returning", users_count=len(counts))
+        return counts
+    
+    async def get_recently_active_user_ids(self, since: datetime) -> List[str]:
+        """Get the IDs of the users who registered for something since the given time"""
+        debug_print("registration_repository.py", "get_recently_active_user_ids", "variables", since=since)
+        
+        user_ids = await self.collection.distinct("usuario_id", {"timestamp_inscricao": {"$gte": since}})
+        
+        debug_print("registration_repository.py", "get_recently_active_user_ids", "returning", users_count=len(user_ids))
+        return user_ids
+    
+    async def count_active_by_event(self, event_ids: List[str]) -> dict:
+        """Count the seat-holding registrations of each event, in one aggregation"""
+        debug_print("registration_repository.py", "count_active_by_event", "variables", events_count=len(event_ids))
+        
+        pipeline = [
+            {"$match": {"evento_id": {"$in": event_ids}, "status": {"$in": ACTIVE_STATUSES}}},
+            {"$group": {"_id": "$evento_id", "count": {"$sum": 1}}}
+        ]
+        counts = {group["_id"]: group["count"] async for group in self.collection.aggregate(pipeline)}
+        
+        debug_print("registration_repository.py", "count_active_by_event", "returning", counts=counts)
+        return counts
+    
+    async def get_registrations_by_ids(self, registration_ids: List[str]) -> List[dict]:
+        """Get multiple registrations by their IDs"""
+        debug_print("registration_repository.py", "get_registrations_by_ids", "variables", registrations_count=len(registration_ids))
+        
+        object_ids = []
+        for rid in registration_ids:
+            try:
+                object_ids.append(ObjectId(rid))
+            except:
+                continue
+        
+        cursor = self.collection.find({"_id": {"$in": object_ids}})
+        registrations = []
+        async for registration in cursor:
+            registration["id"] = str(registration["_id"])
+            registrations.append(registration)
+        
+        debug_print("registration_repository.py", "get_registrations_by_ids", "returning", registrations_count=len(registrations))
+        return registrations
+    
+    async def get_event_registration_ids_by_status(self, event_id: str, statuses: List[RegistrationStatus]) -> List[str]:
+        """Get the IDs of an event's registrations in any of the given statuses"""
+        debug_print("registration_repository.py", "get_event_registration_ids_by_status", "variables", event_id=event_id, statuses=statuses)
+        
+        cursor = self.collection.find({"evento_id": event_id, "status": {"$in": statuses}}, {"_id": 1})
+        registration_ids = [str(registration["_id"]) async for registration in cursor]
+        
+        debug_print("registration_repository.py", "get_event_registration_ids_by_status", "returning", registrations_count=len(registration_ids))
+        return registration_ids
+    
+    async def get_event_revoked_registration_ids(self, event_id: str) -> List[str]:
+        """Get the IDs of an event's registrations whose tickets no longer admit anyone, archived ones included"""
+        debug_print("registration_repository.py", "get_event_revoked_registration_ids", "variables", event_id=event_id)
+        
+        # Anything not approved or checked in is revoked, whatever status it went through;
+        # archived registrations of a live event are the cancelled and refused ones
+        valid_statuses = [RegistrationStatus.APROVADA, RegistrationStatus.FINALIZADA]
+        cursor = self.collection.find({"evento_id": event_id, "status": {"$nin": valid_statuses}}, {"_id": 1})
+        registration_ids = [str(registration["_id"]) async for registration in cursor]
+        cursor = self.archive.find({"evento_id": event_id}, {"_id": 1})
+        registration_ids += [str(registration["_id"]) async for registration in cursor]
+        
+        debug_print("registration_repository.py", "get_event_revoked_registration_ids", "returning", registrations_count=len(registration_ids))
+        return registration_ids
+    
+    async def check_in_registrations(self, registration_ids: List[str]) -> int:
+        """Mark approved registrations as finalizada in one bulk write"""
+        debug_print("registration_repository.py", "check_in_registrations", "variables", registrations_count=len(registration_ids))
+        
+        if not registration_ids:
+            debug_print("registration_repository.py", "check_in_registrations", "returning", modified=0)
+            return 0
+        
+        # The status filter makes a ticket scanned twice (or revoked meanwhile) a no-op
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": ObjectId(rid), "status": RegistrationStatus.APROVADA},
+                {"$set": {"status": RegistrationStatus.FINALIZADA, "timestamp_checkin": now}}
+            )
+            for rid in registration_ids
+        ]
+        result = await self.collection.bulk_write(operations, ordered=False)
+        
+        debug_print("registration_repository.py", "check_in_registrations", "returning", modified=result.modified_count)
+        return result.modified_count
+    
+    async def get_expired_pending_registrations(self, cutoff: datetime, limit: int) -> List[dict]:
+        """Get registrations still awaiting payment that were made before the cutoff"""
+        debug_print("registration_repository.py", "get_expired_pending_registrations", "variables", cutoff=cutoff, limit=limit)
+        
+        cursor = self.collection.find(
+            {
+                "status": RegistrationStatus.AGUARDANDO_PAGAMENTO,
+                "timestamp_inscricao": {"$lt": cutoff}
+            },
+            {"usuario_id": 1, "evento_id": 1}
+        ).sort("timestamp_inscricao", ASCENDING).limit(limit)
+        registrations = []
+        async for registration in cursor:
+            registration["id"] = str(registration["_id"])
+            registrations.append(registration)
+        
+        debug_print("registration_repository.py", "get_expired_pending_registrations", "returning", registrations_count=len(registrations))
+        return registrations
+    
+    async def expire_registrations(self, registration_ids: List[str], sweep_id: str) -> List[dict]:
+        """Cancel the given registrations that are still awaiting payment; returns the ones cancelled"""
+        debug_print("registration_repository.py", "expire_registrations", "variables", registrations_count=len(registration_ids), sweep_id=sweep_id)
+        
+        object_ids = [ObjectId(rid) for rid in registration_ids]
+        
+        # The status filter skips registrations paid since they were read; tagging the
+        # cancelled ones with the sweep ID tells exactly which seats to release
+        await self.collection.update_many(
+            {"_id": {"$in": object_ids}, "status": RegistrationStatus.AGUARDANDO_PAGAMENTO},
+            {"$set": {"status": RegistrationStatus.CANCELADA, "expired_by_sweep": sweep_id}}
+        )
+        
+        cursor = self.collection.find({"_id": {"$in": object_ids}, "expired_by_sweep": sweep_id}, {"usuario_id": 1, "evento_id": 1})
+        expired = []
+        async for registration in cursor:
+            registration["id"] = str(registration["_id"])
+            expired.append(registration)
+        
+        debug_print("registration_repository.py", "expire_registrations", "returning", expired_count=len(expired))
+        return expired
+    
+    async def get_registrations_with_events(self, registration_ids: List[str]) -> List[dict]:
+        """Get registrations joined with the organizer and price of their event, in one query"""
+        debug_print("registration_repository.py", "get_registrations_with_events", "variables", registrations_count=len(registration_ids))
+        
+        object_ids = []
+        for rid in registration_ids:
+            try:
+                object_ids.append(ObjectId(rid))
+            except:
+                continue
+        
+        pipeline = [
+            {"$match": {"_id": {"$in": object_ids}}},
+            {"$lookup": {
+                "from": "events",
+                "let": {"event_id": {"$convert": {"input": "$evento_id", "to": "objectId", "onError": None, "onNull": None}}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$event_id"]}}},
+                    {"$project": {"organizer_id": 1, "price": 1}}
+                ],
+                "as": "event"
+            }},
+            {"$unwind": {"path": "$event", "preserveNullAndEmptyArrays": True}}
+        ]
+        registrations = []
+        async for registration in self.collection.aggregate(pipeline):
+            registration["id"] = str(registration["_id"])
+            registrations.append(registration)
+        
+        debug_print("registration_repository.py", "get_registrations_with_events", "returning", registrations_count=len(registrations))
+        return registrations
+    
+    async def bulk_update_status(
+        self,
+        registration_ids: List[str],
+        status: RegistrationStatus,
+        paid_ids: List[str],
+        from_statuses: List[RegistrationStatus]
+    ) -> List[dict]:
+        """Set the status of the registrations currently in from_statuses in one bulk write, stamping the payment time on paid_ids
+
+        Returns the registrations that actually changed, as they were before the update
+        """
+        debug_print("registration_repository.py", "bulk_update_status", "variables", registrations_count=len(registration_ids), status=status, paid_count=len(paid_ids), from_statuses=from_statuses)
+        
+        paid = set(paid_ids)
+        paid_object_ids = [ObjectId(rid) for rid in registration_ids if rid in paid]
+        other_object_ids = [ObjectId(rid) for rid in registration_ids if rid not in paid]
+        
+        # Tag the rows this write changes, so they can be told apart from the ones it skipped
+        operation_id = uuid.uuid4().hex
+        operations = []
+        if paid_object_ids:
+            operations.append(UpdateMany(
+                {"_id": {"$in": paid_object_ids}, "status": {"$in": from_statuses}},
+                {"$set": {"status": status, "timestamp_pagamento": datetime.utcnow(), "updated_by_bulk": operation_id}}
+            ))
+        if other_object_ids:
+            operations.append(UpdateMany(
+                {"_id": {"$in": other_object_ids}, "status": {"$in": from_statuses}},
+                {"$set": {"status": status, "updated_by_bulk": operation_id}}
+            ))
+        
+        changed = []
+        if operations:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            if result.modified_count:
+                cursor = self.collection.find(
+                    {"_id": {"$in": paid_object_ids + other_object_ids}, "updated_by_bulk": operation_id},
+                    {"evento_id": 1, "usuario_id": 1}
+                )
+                async for registration in cursor:
+                    registration["id"] = str(registration["_id"])
+                    changed.append(registration)
+        
+        debug_print("registration_repository.py", "bulk_update_status", "returning", changed_count=len(changed))
+        return changed
@@ -0,0 +1,188 @@
+import random
+from typing import List
+from pymongo import ASCENDING, ReturnDocument
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.debug import debug_print
+
+
+class SeatShardRepository:
+    """Seat counters of an event split over several documents, so reservations don't all lock the same one"""
+    
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db["seat_shards"]
+    
+    async def ensure_indexes(self):
+        """Create the index used to read all shards of an event"""
+        debug_print("seat_shard_repository.py", "ensure_indexes", "variables")
+        
+        await self.collection.create_index([("evento_id", ASCENDING), ("shard", ASCENDING)], name="evento_id_1_shard_1")
+    
+    async def create_shards(self, event_id: str, capacity: int, shard_count: int):
+        """Split an event's capacity evenly over shard_count counters"""
+        debug_print("seat_shard_repository.py", "create_shards", "variables", event_id=event_id, capacity=capacity, shard_count=shard_count)
+        
+        base, extra = divmod(capacity, shard_count)
+        await self.collection.insert_many([
+            {
+                "_id": f"{event_id}:{shard}",
+                "evento_id": event_id,
+                "shard": shard,
+                "capacity": base + (1 if shard < extra else 0),
+                "taken": 0
+            }
+            for shard in range(shard_count)
+        ])
+    
+    async def get_shards(self, event_id: str) -> List[dict]:
+        """Get every shard of an event"""
+        debug_print("seat_shard_repository.py", "get_shards", "variables", event_id=event_id)
+        
+        shards = await self.collection.find({"evento_id": event_id}).sort("shard", ASCENDING).to_list(length=None)
+        
+        debug_print("seat_shard_repository.py", "get_shards", "returning", shards_count=len(shards))
+        return shards
+    
+    async def get_totals(self, event_id: str) -> dict:
+        """Get the summed capacity and taken seats of an event's shards"""
+        debug_print("seat_shard_repository.py", "get_totals", "variables", event_id=event_id)
+        
+        pipeline = [
+            {"$match": {"evento_id": event_id}},
+            {"$group": {"_id": None, "capacity": {"$sum": "$capacity"}, "taken": {"$sum": "$taken"}}}
+        ]
+        result = await self.collection.aggregate(pipeline).to_list(length=1)
+        totals = {"capacity": result[0]["capacity"], "taken": result[0]["taken"]} if result else {"capacity": 0, "taken": 0}
+        
+        debug_print("seat_shard_repository.py", "get_totals", "returning", totals=totals)
+        return totals
+    
+    async def _take(self, event_id: str, shard: int, count: int):
+        """Take count seats from one shard if it has them; returns the shard after the update"""
+        return await self.collection.find_one_and_update(
+            {"_id": f"{event_id}:{shard}", "$expr": {"$lte": [{"$add": ["$taken", count]}, "$capacity"]}},
+            {"$inc": {"taken": count}},
+            return_document=ReturnDocument.AFTER
+        )
+    
+    async def reserve(self, event_id: str, shard_count: int, count: int = 1) -> bool:
+        """Take count seats, all or none, trying the shards in random order"""
+        debug_print("seat_shard_repository.py", "reserve", "variables", event_id=event_id, shard_count=shard_count, count=count)
+        
+        order = random.sample(range(shard_count), shard_count)
+        emptied = False
+        success = False
+        for shard in order:
+            taken = await self._take(event_id, shard, count)
+            if taken:
+                emptied = taken["taken"] >= taken["capacity"]
+                success = True
+                break
+        
+        # No single shard has enough left: gather the seats from several, giving them back if short
+        if not success and count > 1:
+            held = {}
+            for shard in await self.get_shards(event_id):
+                wanted = min(count - sum(held.values()), shard["capacity"] - shard["taken"])
+                if wanted > 0 and await self._take(event_id, shard["shard"], wanted):
+                    held[shard["shard"]] = wanted
+                if sum(held.values()) == count:
+                    break
+            success = sum(held.values()) == count
+            emptied = success
+            if not success:
+                for shard, seats in held.items():
+                    await self.collection.update_one({"_id": f"{event_id}:{shard}"}, {"$inc": {"taken": -seats}})
+        
+        if emptied:
+            await self.rebalance(event_id)
+        
+        debug_print("seat_shard_repository.py", "reserve", "returning", success=success)
+        return success
+    
+    async def release(self, event_id: str, count: int = 1) -> int:
+        """Give back up to count seats, taking them from the fullest shards first"""
+        debug_print("seat_shard_repository.py", "release", "variables", event_id=event_id, count=count)
+        
+        released = 0
+        shards = sorted(await self.get_shards(event_id), key=lambda shard: shard["taken"], reverse=True)
+        for shard in shards:
+            seats = min(count - released, shard["taken"])
+            if seats <= 0:
+                continue
+            result = await self.collection.update_one(
+                {"_id": shard["_id"], "taken": {"$gte": seats}},
+                {"$inc": {"taken": -seats}}
+            )
+            if result.modified_count:
+                released += seats
+            if released == count:
+                break
+        
+        debug_print("seat_shard_repository.py", "release", "returning", released=released)
+        return released
+    
+    async def adjust_capacity(self, event_id: str, delta: int) -> int:
+        """Grow or shrink the total capacity; shrinking only removes free seats. Returns the applied delta"""
+        debug_print("seat_shard_repository.py", "adjust_capacity", "variables", event_id=event_id, delta=delta)
+        
+        applied = 0
+        shards = sorted(await self.get_shards(event_id), key=lambda shard: shard["capacity"] - shard["taken"])
+        if delta > 0 and shards:
+            # New seats go to the fullest shard, and rebalancing spreads them out
+            await self.collection.update_one({"_id": shards[0]["_id"]}, {"$inc": {"capacity": delta}})
+            applied = delta
+        elif delta < 0:
+            for shard in reversed(shards):
+                seats = min(applied - delta, shard["capacity"] - shard["taken"])
+                if seats <= 0:
+                    continue
+                result = await self.collection.update_one(
+                    {"_id": shard["_id"], "$expr": {"$gte": [{"$subtract": ["$capacity", "$taken"]}, seats]}},
+                    {"$inc": {"capacity": -seats}}
+                )
+                if result.modified_count:
+                    applied -= seats
+                if applied == delta:
+                    break
+        
+        await self.rebalance(event_id)
+        
+        debug_print("seat_shard_repository.py", "adjust_capacity", "returning", applied=applied)
+        return applied
+    
+    async def rebalance(self, event_id: str) -> int:
+        """Spread the free seats evenly over the shards again; returns how many seats moved"""
+        debug_print("seat_shard_repository.py", "rebalance", "variables", event_id=event_id)
+        
+        shards = await self.get_shards(event_id)
+        free = {shard["shard"]: shard["capacity"] - shard["taken"] for shard in shards}
+        base, extra = divmod(sum(free.values()), len(shards) or 1)
+        target = {shard: base + (1 if index < extra else 0) for index, shard in enumerate(sorted(free))}
+        
+        # Shrink the shards above their share first, so the total never exceeds the event capacity
+        # even if this stops halfway; a concurrent reservation makes a shrink fail instead of overbook
+        moved = 0
+        for shard, seats in free.items():
+            surplus = seats - target[shard]
+            if surplus <= 0:
+                continue
+            result = await self.collection.update_one(
+                {"_id": f"{event_id}:{shard}", "$expr": {"$gte": [{"$subtract": ["$capacity", "$taken"]}, surplus]}},
+                {"$inc": {"capacity": -surplus}}
+            )
+            if result.modified_count:
+                moved += surplus
+        
+        remaining = moved
+        for shard, seats in free.items():
+            deficit = min(target[shard] - seats, remaining)
+            if deficit <= 0:
+                continue
+            await self.collection.update_one({"_id": f"{event_id}:{shard}"}, {"$inc": {"capacity": deficit}})
+            remaining -= deficit
+        if remaining:
+            # Shrunk shards whose receivers were already served go back where they came from
+            await self.collection.update_one({"_id": f"{event_id}:{min(free)}"}, {"$inc": {"capacity": remaining}})
+        
+        debug_print("seat_shard_repository.py", "rebalance", "returning", moved=moved)
+        return moved
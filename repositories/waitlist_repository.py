@@ -0,0 +1,104 @@
+from typing import Optional
+from datetime import datetime
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.debug import debug_print
+
+
+class WaitlistRepository:
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db["waitlist"]
+        self.counters = db["counters"]
+    
+    async def ensure_indexes(self):
+        """Create the indexes that order each event's queue"""
+        debug_print("waitlist_repository.py", "ensure_indexes", "variables")
+        
+        await self.collection.create_index([("evento_id", ASCENDING), ("position", ASCENDING)], unique=True, name="evento_id_1_position_1")
+        await self.collection.create_index([("evento_id", ASCENDING), ("usuario_id", ASCENDING)], unique=True, name="evento_id_1_usuario_id_1")
+    
+    async def add_to_waitlist(self, event_id: str, user_id: str) -> dict:
+        """Append a user to an event's waitlist (or return their existing entry)"""
+        debug_print("waitlist_repository.py", "add_to_waitlist", "variables", event_id=event_id, user_id=user_id)
+        
+        counter = await self.counters.find_one_and_update(
+            {"_id": f"waitlist:{event_id}"},
+            {"$inc": {"value": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        entry = {
+            "evento_id": event_id,
+            "usuario_id": user_id,
+            "position": counter["value"],
+            "timestamp": datetime.utcnow()
+        }
+        
+        try:
+            result = await self.collection.insert_one(entry)
+            entry["id"] = str(result.inserted_id)
+        except DuplicateKeyError:
+            # Already queued: keep the original place in line
+            entry = await self.get_waitlist_entry(event_id, user_id)
+        
+        debug_print("waitlist_repository.py", "add_to_waitlist", "returning", entry=entry)
+        return entry
+    
+    async def get_waitlist_entry(self, event_id: str, user_id: str) -> Optional[dict]:
+        """Get a user's waitlist entry for an event"""
+        debug_print("waitlist_repository.py", "get_waitlist_entry", "variables", event_id=event_id, user_id=user_id)
+        
+        entry = await self.collection.find_one({"evento_id": event_id, "usuario_id": user_id})
+        if entry:
+            entry["id"] = str(entry["_id"])
+        
+        debug_print("waitlist_repository.py", "get_waitlist_entry", "returning", entry=entry)
+        return entry
+    
+    async def count_ahead(self, event_id: str, position: int) -> int:
+        """Count the entries queued before a position"""
+        debug_print("waitlist_repository.py", "count_ahead", "variables", event_id=event_id, position=position)
+        
+        count = await self.collection.count_documents({"evento_id": event_id, "position": {"$lt": position}})
+        
+        debug_print("waitlist_repository.py", "count_ahead", "returning", count=count)
+        return count
+    
+    async def pop_head(self, event_id: str) -> Optional[dict]:
+        """Atomically take the first entry of an event's waitlist"""
+        debug_print("waitlist_repository.py", "pop_head", "variables", event_id=event_id)
+        
+        entry = await self.collection.find_one_and_delete(
+            {"evento_id": event_id},
+            sort=[("position", ASCENDING)]
+        )
+        if entry:
+            entry["id"] = str(entry["_id"])
+        
+        debug_print("waitlist_repository.py", "pop_head", "returning", entry=entry)
+        return entry
+    
+    async def restore_entry(self, entry: dict) -> bool:
+        """Put back an entry taken by pop_head, at its original position"""
+        debug_print("waitlist_repository.py", "restore_entry", "variables", entry=entry)
+        
+        entry = {k: v for k, v in entry.items() if k != "id"}
+        try:
+            await self.collection.insert_one(entry)
+            success = True
+        except DuplicateKeyError:
+            success = False
+        
+        debug_print("waitlist_repository.py", "restore_entry", "returning", success=success)
+        return success
+    
+    async def remove_from_waitlist(self, event_id: str, user_id: str) -> bool:
+        """Remove a user from an event's waitlist"""
+        debug_print("waitlist_repository.py", "remove_from_waitlist", "variables", event_id=event_id, user_id=user_id)
+        
+        result = await self.collection.delete_one({"evento_id": event_id, "usuario_id": user_id})
+        success = result.deleted_count > 0
+        
+        debug_print("waitlist_repository.py", "remove_from_waitlist", "returning", success=success)
+        return success
@@ -1,15 +1,28 @@
-from fastapi import APIRouter, Depends, status
-from typing import List
+import asyncio
+from fastapi import APIRouter, Depends, Header, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from config.settings import settings
+from typing import List, Optional
+from datetime import datetime
 from config.database import get_database
 from repositories.user_repository import UserRepository
 from repositories.event_repository import EventRepository
 from repositories.registration_repository import RegistrationRepository
 from repositories.friendship_repository import FriendshipRepository
+from repositories.idempotency_repository import IdempotencyRepository
+from repositories.waitlist_repository import WaitlistRepository
 from services.event_service import EventService
-from schemas.event_schema import Event, EventDetail, EventCreate, EventUpdate, EventStatusUpdate
-from schemas.registration_schema import RegistrationResponse
+from services.idempotency_service import IdempotencyService
+from services.waitlist_service import WaitlistService
+from schemas.event_schema import Event, EventDetail, EventCreate, EventUpdate, EventStatusUpdate, EventPeriod, EventSearchResult, EventSuggestion, EventFacets, EventBatchResponse, EventChanges
+from schemas.registration_schema import RegistrationResponse, GroupRegistrationCreate, GroupRegistrationResponse
 from schemas.common_schema import MessageResponse
+from schemas.waitlist_schema import WaitlistPosition
 from middlewares.auth_middleware import get_current_user_id, get_current_user_optional
+from utils.exceptions import EventNotFoundException
+from utils.fields import parse_fields
+from utils.seat_broadcaster import seat_broadcaster
 
 router = APIRouter(prefix="/events", tags=["Events"])
 
@@ -23,29 +36,151 @@ def get_event_service(db=Depends(get_database)) -> EventService:
     return EventService(user_repo, event_repo, registration_repo, friendship_repo)
 
 
+def get_waitlist_service(db=Depends(get_database)) -> WaitlistService:
+    """Dependency to get WaitlistService instance"""
+    event_repo = EventRepository(db)
+    registration_repo = RegistrationRepository(db)
+    waitlist_repo = WaitlistRepository(db)
+    return WaitlistService(event_repo, registration_repo, waitlist_repo)
+
+
+def get_idempotency_service(db=Depends(get_database)) -> IdempotencyService:
+    """Dependency to get IdempotencyService instance"""
+    return IdempotencyService(IdempotencyRepository(db))
+
+
 @router.get("", response_model=List[Event], status_code=status.HTTP_200_OK)
 async def get_all_events(
+    period: Optional[EventPeriod] = Query(None),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    fields: Optional[str] = Query(None),
     event_service: EventService = Depends(get_event_service)
 ):
     """
     Get all events
     
+    - **period**: Optional filter, "upcoming" (soonest first) or "past" (most recent first)
+    - **date_from**: Optional start of the date window (inclusive)
+    - **date_to**: Optional end of the date window (exclusive)
+    - **fields**: Optional comma-separated subset of the event fields to return
+    
     Returns a list of all available events with basic information
     """
-    return await event_service.get_all_events()
+    requested_fields = parse_fields(fields, Event)
+    events = await event_service.get_all_events(period, date_from, date_to, requested_fields)
+    if requested_fields is not None:
+        return JSONResponse(content=jsonable_encoder(events))
+    return events
+
+
+@router.get("/search", response_model=List[EventSearchResult], status_code=status.HTTP_200_OK)
+async def search_events(
+    q: str = Query(..., min_length=2, max_length=100),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    event_service: EventService = Depends(get_event_service)
+):
+    """
+    Full-text search over event title, description, location and category
+    
+    - **q**: Search terms
+    - **skip**: Number of results to skip
+    - **limit**: Maximum number of results (1-100)
+    
+    Returns matching events ordered by relevance
+    """
+    return await event_service.search_events(q, skip, limit)
+
+
+@router.get("/suggest", response_model=List[EventSuggestion], status_code=status.HTTP_200_OK)
+async def suggest_events(
+    prefix: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(8, ge=1, le=20),
+    event_service: EventService = Depends(get_event_service)
+):
+    """
+    Autocomplete event titles and locations
+    
+    - **prefix**: Typed text; matching ignores case and accents
+    - **limit**: Maximum number of suggestions (1-20)
+    
+    Returns events with a title or location word starting with the prefix
+    """
+    return await event_service.suggest_events(prefix, limit)
+
+
+@router.get("/facets", response_model=EventFacets, status_code=status.HTTP_200_OK)
+async def get_event_facets(
+    event_service: EventService = Depends(get_event_service)
+):
+    """
+    Get event counts per category and per status
+    
+    Served from an in-memory cache that is adjusted on every event write
+    """
+    return await event_service.get_facets()
+
+
+@router.get("/batch", response_model=EventBatchResponse, status_code=status.HTTP_200_OK)
+async def get_events_batch(
+    ids: str = Query(..., min_length=1),
+    fields: Optional[str] = Query(None),
+    event_service: EventService = Depends(get_event_service)
+):
+    """
+    Get several events in a single request
+    
+    - **ids**: Comma-separated event IDs (duplicates are ignored)
+    - **fields**: Optional comma-separated subset of the event fields to return
+    
+    Returns the events in the requested order and the IDs that were not found
+    """
+    requested_fields = parse_fields(fields, Event)
+    event_ids = [event_id.strip() for event_id in ids.split(",") if event_id.strip()]
+    result = await event_service.get_events_batch(event_ids, requested_fields)
+    if requested_fields is not None:
+        return JSONResponse(content=jsonable_encoder(result))
+    return result
+
+
+@router.get("/changes", response_model=EventChanges, status_code=status.HTTP_200_OK)
+async def get_event_changes(
+    since: Optional[str] = Query(None),
+    event_service: EventService = Depends(get_event_service)
+):
+    """
+    Get events changed since the last sync
+    
+    - **since**: Token returned by the previous call (omit for a full sync)
+    
+    Returns changed events, deleted event IDs and the token for the next call;
+    keep calling while has_more is true
+    """
+    return await event_service.get_changes(since)
 
 
 @router.get("/userEvents", response_model=List[RegistrationResponse], status_code=status.HTTP_200_OK)
 async def get_user_events(
+    period: Optional[EventPeriod] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    history: bool = False,
     current_user_id: str = Depends(get_current_user_id),
     event_service: EventService = Depends(get_event_service)
 ):
     """
     Get user's event registrations (requires authentication)
     
-    Returns a list of all events the user is registered for
+    - **period**: Only upcoming events, or only past (archived) ones; both by default
+    - **skip**: Number of results to skip
+    - **limit**: Maximum number of results (1-100)
+    - **history**: Also include old events and closed registrations moved to the archive
+    
+    Returns a page of the events the user is registered for, upcoming events first (soonest
+    first) followed by past events (most recent first)
     """
-    return await event_service.get_user_events(current_user_id)
+    return await event_service.get_user_events(current_user_id, period, skip, limit, history)
 
 
 @router.get("/organizedEvents", response_model=List[Event], status_code=status.HTTP_200_OK)
@@ -64,6 +199,7 @@ async def get_organized_events(
 @router.get("/{event_id}", response_model=EventDetail, status_code=status.HTTP_200_OK)
 async def get_event_detail(
     event_id: str,
+    fields: Optional[str] = Query(None),
     current_user_id: str = Depends(get_current_user_optional),
     event_service: EventService = Depends(get_event_service)
 ):
@@ -71,28 +207,46 @@ async def get_event_detail(
     Get detailed information about a specific event
     
     - **event_id**: The ID of the event
+    - **fields**: Optional comma-separated subset of the detail fields to return
+      (participants are only loaded when requested)
     
     Returns complete event details including participants
     """
-    response = await event_service.get_event_detail(event_id, current_user_id)
+    requested_fields = parse_fields(fields, EventDetail)
+    response = await event_service.get_event_detail(event_id, current_user_id, requested_fields)
     print("Returning response from get_event_detail:", response)
+    if requested_fields is not None:
+        return JSONResponse(content=jsonable_encoder(response))
     return response
 
 
 @router.post("", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def create_event(
     event_data: EventCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user_id: str = Depends(get_current_user_id),
-    event_service: EventService = Depends(get_event_service)
+    event_service: EventService = Depends(get_event_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service)
 ):
     """
     Create a new event (requires authentication)
     
-    The logged-in user will be set as the organizer
+    The logged-in user will be set as the organizer. Send an Idempotency-Key
+    header to make retries return the original response instead of creating
+    a duplicate event
     """
     event_dict = event_data.model_dump()
-    result = await event_service.create_event(event_dict, current_user_id)
-    return MessageResponse(message=result["message"])
+    
+    async def handler():
+        result = await event_service.create_event(dict(event_dict), current_user_id)
+        return MessageResponse(message=result["message"]).model_dump()
+    
+    if idempotency_key is None:
+        return MessageResponse(**await handler())
+    status_code, body = await idempotency_service.run(
+        idempotency_key, current_user_id, "POST /events", handler, status.HTTP_201_CREATED, event_dict
+    )
+    return JSONResponse(status_code=status_code, content=body)
 
 
 @router.put("/{event_id}", response_model=MessageResponse, status_code=status.HTTP_200_OK)
@@ -136,15 +290,150 @@ async def update_event_status(
 @router.post("/{event_id}/register", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def register_for_event(
     event_id: str,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     current_user_id: str = Depends(get_current_user_id),
-    event_service: EventService = Depends(get_event_service)
+    event_service: EventService = Depends(get_event_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service)
 ):
     """
     Register for an event (requires authentication)
     
     - **event_id**: The ID of the event to register for
     
+    Send an Idempotency-Key header to make retries return the original response
+    
     Returns confirmation of registration
     """
-    result = await event_service.register_for_event(event_id, current_user_id)
+    async def handler():
+        result = await event_service.register_for_event(event_id, current_user_id)
+        return MessageResponse(message=result["message"]).model_dump()
+    
+    if idempotency_key is None:
+        return MessageResponse(**await handler())
+    status_code, body = await idempotency_service.run(
+        idempotency_key, current_user_id, f"POST /events/{event_id}/register", handler, status.HTTP_201_CREATED
+    )
+    return JSONResponse(status_code=status_code, content=body)
+
+
+@router.post("/{event_id}/register/group", response_model=GroupRegistrationResponse, status_code=status.HTTP_201_CREATED)
+async def register_group_for_event(
+    event_id: str,
+    group: GroupRegistrationCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    current_user_id: str = Depends(get_current_user_id),
+    event_service: EventService = Depends(get_event_service),
+    idempotency_service: IdempotencyService = Depends(get_idempotency_service)
+):
+    """
+    Register several users for an event at once (requires authentication)
+    
+    - **event_id**: The ID of the event to register for
+    - **userIds**: IDs of the users to register
+    
+    Either every user gets a seat or nobody is registered. Send an
+    Idempotency-Key header to make retries return the original response
+    """
+    async def handler():
+        result = await event_service.register_group_for_event(event_id, group.user_ids, current_user_id)
+        return result.model_dump(by_alias=True)
+    
+    if idempotency_key is None:
+        return await handler()
+    status_code, body = await idempotency_service.run(
+        idempotency_key, current_user_id, f"POST /events/{event_id}/register/group", handler,
+        status.HTTP_201_CREATED, group.user_ids
+    )
+    return JSONResponse(status_code=status_code, content=body)
+
+
+@router.post("/{event_id}/waitlist", response_model=WaitlistPosition, status_code=status.HTTP_201_CREATED)
+async def join_waitlist(
+    event_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    waitlist_service: WaitlistService = Depends(get_waitlist_service)
+):
+    """
+    Join the waitlist of a full event (requires authentication)
+    
+    - **event_id**: The ID of the event
+    
+    Returns the queue position; the user is registered automatically when a seat frees up
+    """
+    return await waitlist_service.join_waitlist(event_id, current_user_id)
+
+
+@router.get("/{event_id}/waitlist", response_model=WaitlistPosition, status_code=status.HTTP_200_OK)
+async def get_waitlist_position(
+    event_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    waitlist_service: WaitlistService = Depends(get_waitlist_service)
+):
+    """
+    Get the logged-in user's position in an event's waitlist (requires authentication)
+    
+    - **event_id**: The ID of the event
+    """
+    return await waitlist_service.get_position(event_id, current_user_id)
+
+
+@router.delete("/{event_id}/waitlist", response_model=MessageResponse, status_code=status.HTTP_200_OK)
+async def leave_waitlist(
+    event_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    waitlist_service: WaitlistService = Depends(get_waitlist_service)
+):
+    """
+    Leave an event's waitlist (requires authentication)
+    
+    - **event_id**: The ID of the event
+    """
+    result = await waitlist_service.leave_waitlist(event_id, current_user_id)
     return MessageResponse(message=result["message"])
+
+
+@router.websocket("/{event_id}/seats")
+async def watch_event_seats(
+    websocket: WebSocket,
+    event_id: str,
+    event_service: EventService = Depends(get_event_service)
+):
+    """
+    Push remaining seats and status changes of an event over a WebSocket
+    
+    - **event_id**: The ID of the event to watch
+    
+    Sends the current state on connect, then at most one update per
+    SEAT_PUSH_MIN_INTERVAL_SECONDS (bursts are coalesced into the latest state)
+    """
+    try:
+        snapshot = await event_service.get_seat_snapshot(event_id)
+    except EventNotFoundException:
+        await websocket.close(code=4404)
+        return
+    
+    await websocket.accept()
+    subscription = seat_broadcaster.subscribe(event_id, settings.SEAT_PUSH_MIN_INTERVAL_SECONDS)
+    
+    async def send_updates():
+        await websocket.send_json(jsonable_encoder(snapshot))
+        while True:
+            update = await subscription.next_update()
+            await websocket.send_json(update)
+    
+    async def wait_for_disconnect():
+        # Clients do not send anything; this only notices when they go away
+        while True:
+            await websocket.receive_text()
+    
+    tasks = [asyncio.create_task(send_updates()), asyncio.create_task(wait_for_disconnect())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            # A disconnect (or a failed send to a closed socket) just ends the subscription
+            if not isinstance(task.exception(), (WebSocketDisconnect, RuntimeError, type(None))):
+                raise task.exception()
+    finally:
+        seat_broadcaster.unsubscribe(subscription)
+        for task in tasks:
+            task.cancel()
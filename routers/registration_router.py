@@ -5,9 +5,10 @@ from repositories.user_repository import UserRepository
 from repositories.event_repository import EventRepository
 from repositories.registration_repository import RegistrationRepository
 from services.registration_service import RegistrationService
+from services.ticket_service import TicketService
 from schemas.common_schema import MessageResponse
-from schemas.registration_schema import RegistrationStatus, RegistrationWithUser
-from pydantic import BaseModel
+from schemas.registration_schema import RegistrationStatus, RegistrationWithUser, BulkOperationResponse, TicketResponse, OfflineTicketBundle, CheckInRequest
+from pydantic import BaseModel, Field
 from middlewares.auth_middleware import get_current_user_id
 from utils.debug import debug_print
 
@@ -18,6 +19,14 @@ class RegistrationStatusUpdate(BaseModel):
     status: RegistrationStatus
 
 
+class RegistrationBulkStatusUpdate(BaseModel):
+    registration_ids: List[str] = Field(alias="registrationIds", min_length=1)
+    status: RegistrationStatus
+    
+    class Config:
+        populate_by_name = True
+
+
 def get_registration_service(db=Depends(get_database)) -> RegistrationService:
     """Dependency to get RegistrationService instance"""
     user_repo = UserRepository(db)
@@ -26,6 +35,13 @@ def get_registration_service(db=Depends(get_database)) -> RegistrationService:
     return RegistrationService(user_repo, event_repo, registration_repo)
 
 
+def get_ticket_service(db=Depends(get_database)) -> TicketService:
+    """Dependency to get TicketService instance"""
+    event_repo = EventRepository(db)
+    registration_repo = RegistrationRepository(db)
+    return TicketService(event_repo, registration_repo)
+
+
 @router.get("/organizer", response_model=List[RegistrationWithUser], status_code=status.HTTP_200_OK)
 async def get_organizer_registrations(
     current_user_id: str = Depends(get_current_user_id),
@@ -61,6 +77,61 @@ async def get_event_registrations(
     return registrations
 
 
+@router.get("/event/{event_id}/tickets", response_model=OfflineTicketBundle, status_code=status.HTTP_200_OK)
+async def get_offline_ticket_bundle(
+    event_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    ticket_service: TicketService = Depends(get_ticket_service)
+):
+    """
+    Get the data door scanners need to check tickets offline (only organizer can access)
+    
+    - **event_id**: The ID of the event
+    
+    Returns the event's ticket verification key (a raw Ed25519 public key, hex), the revoked
+    registration IDs and the ones already checked in. A decoded ticket is 36 payload bytes
+    followed by a 64-byte Ed25519 signature of the payload
+    """
+    debug_print("registration_router.py", "get_offline_ticket_bundle", "variables", event_id=event_id, current_user_id=current_user_id)
+    bundle = await ticket_service.get_offline_bundle(event_id, current_user_id)
+    debug_print("registration_router.py", "get_offline_ticket_bundle", "returning", revoked_count=len(bundle.revoked))
+    return bundle
+
+
+@router.post("/event/{event_id}/check-in", response_model=BulkOperationResponse, status_code=status.HTTP_200_OK)
+async def check_in_tickets(
+    event_id: str,
+    check_in: CheckInRequest,
+    current_user_id: str = Depends(get_current_user_id),
+    ticket_service: TicketService = Depends(get_ticket_service)
+):
+    """
+    Check in many scanned tickets at once (only organizer can check in)
+    
+    - **event_id**: The ID of the event
+    - **tickets**: Scanned ticket tokens
+    
+    Returns one result per ticket; valid ones are marked finalizada
+    """
+    return await ticket_service.check_in(event_id, check_in.tickets, current_user_id)
+
+
+@router.get("/{registration_id}/ticket", response_model=TicketResponse, status_code=status.HTTP_200_OK)
+async def get_ticket(
+    registration_id: str,
+    current_user_id: str = Depends(get_current_user_id),
+    ticket_service: TicketService = Depends(get_ticket_service)
+):
+    """
+    Get the signed ticket of an approved registration (requires authentication)
+    
+    - **registration_id**: The ID of the registration
+    
+    Returns a compact token to render as a QR code
+    """
+    return await ticket_service.get_ticket(registration_id, current_user_id)
+
+
 @router.post("/{registration_id}/cancel", response_model=MessageResponse, status_code=status.HTTP_200_OK)
 async def cancel_registration(
     registration_id: str,
@@ -78,6 +149,24 @@ async def cancel_registration(
     return MessageResponse(message=result["message"])
 
 
+@router.patch("/status", response_model=BulkOperationResponse, status_code=status.HTTP_200_OK)
+async def bulk_update_registration_status(
+    status_update: RegistrationBulkStatusUpdate,
+    current_user_id: str = Depends(get_current_user_id),
+    registration_service: RegistrationService = Depends(get_registration_service)
+):
+    """
+    Update the status of many registrations at once (only event organizer can update)
+    
+    - **registrationIds**: IDs of the registrations to update
+    - **status**: New registration status for all of them
+    
+    Returns one result per registration; the ones for events the user does not organize, or that are
+    not holding a seat (cancelada/recusada), are skipped
+    """
+    return await registration_service.bulk_update_registration_status(status_update.registration_ids, status_update.status, current_user_id)
+
+
 @router.patch("/{registration_id}/status", response_model=MessageResponse, status_code=status.HTTP_200_OK)
 async def update_registration_status(
     registration_id: str,
@@ -91,7 +180,8 @@ async def update_registration_status(
     - **registration_id**: The ID of the registration to update
     - **status**: New registration status (aguardando_pagamento, aprovada, recusada, cancelada, finalizada)
     
-    Returns confirmation of status update
+    Returns confirmation of status update. Moving out of an active status frees the seat; reactivating a
+    cancelada/recusada registration needs a free seat, and fails with 409 if the user registered again since
     """
     result = await registration_service.update_registration_status(registration_id, status_update.status, current_user_id)
     return MessageResponse(message=result["message"])
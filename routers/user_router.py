@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Query, status
+from typing import List, Optional
 from config.database import get_database
 from repositories.user_repository import UserRepository
 from repositories.event_repository import EventRepository
 from repositories.registration_repository import RegistrationRepository
 from repositories.friendship_repository import FriendshipRepository
+from repositories.notification_repository import NotificationRepository
+from repositories.friend_suggestion_repository import FriendSuggestionRepository
 from services.user_service import UserService
+from services.event_service import EventService
+from services.notification_service import NotificationService
+from services.friend_suggestion_service import FriendSuggestionService
 from schemas.common_schema import MessageResponse
-from schemas.user_schema import UserInfo
+from schemas.user_schema import UserInfo, FriendSuggestion, FriendPage, FriendRequestPage, FriendRequestAccept
+from schemas.registration_schema import BulkOperationResponse
+from schemas.notification_schema import NotificationPage
+from schemas.event_schema import FriendFeedItem
 from middlewares.auth_middleware import get_current_user_id
 from utils.debug import debug_print
 
@@ -22,6 +31,31 @@ def get_user_service(db=Depends(get_database)) -> UserService:
     return UserService(user_repo, event_repo, registration_repo, friendship_repo)
 
 
+def get_event_service(db=Depends(get_database)) -> EventService:
+    """Dependency to get EventService instance"""
+    user_repo = UserRepository(db)
+    event_repo = EventRepository(db)
+    registration_repo = RegistrationRepository(db)
+    friendship_repo = FriendshipRepository(db)
+    return EventService(user_repo, event_repo, registration_repo, friendship_repo)
+
+
+def get_friend_suggestion_service(db=Depends(get_database)) -> FriendSuggestionService:
+    """Dependency to get FriendSuggestionService instance"""
+    user_repo = UserRepository(db)
+    registration_repo = RegistrationRepository(db)
+    friendship_repo = FriendshipRepository(db)
+    suggestion_repo = FriendSuggestionRepository(db)
+    return FriendSuggestionService(user_repo, registration_repo, friendship_repo, suggestion_repo)
+
+
+def get_notification_service(db=Depends(get_database)) -> NotificationService:
+    """Dependency to get NotificationService instance"""
+    notification_repo = NotificationRepository(db)
+    registration_repo = RegistrationRepository(db)
+    return NotificationService(notification_repo, registration_repo)
+
+
 @router.get("/me", response_model=UserInfo, status_code=status.HTTP_200_OK)
 async def get_current_user_info(
     current_user_id: str = Depends(get_current_user_id),
@@ -38,6 +72,102 @@ async def get_current_user_info(
     return UserInfo(**user_info)
 
 
+@router.get("/me/feed", response_model=List[FriendFeedItem], status_code=status.HTTP_200_OK)
+async def get_friends_feed(
+    current_user_id: str = Depends(get_current_user_id),
+    event_service: EventService = Depends(get_event_service)
+):
+    """
+    Get upcoming events the logged-in user's friends are attending (requires authentication)
+    
+    Returns events ranked by number of friends attending, then by date
+    """
+    return await event_service.get_friends_feed(current_user_id)
+
+
+@router.get("/me/friends", response_model=FriendPage, status_code=status.HTTP_200_OK)
+async def get_friends(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user_id: str = Depends(get_current_user_id),
+    user_service: UserService = Depends(get_user_service)
+):
+    """
+    Get the logged-in user's friends, most recent first (requires authentication)
+    
+    - **cursor**: nextCursor of the previous page; omit for the first page
+    - **limit**: Maximum number of friends (1-100)
+    
+    Returns a page of friends and the cursor of the next page (null on the last one)
+    """
+    return await user_service.get_friends(current_user_id, cursor, limit)
+
+
+@router.get("/me/friend-requests", response_model=FriendRequestPage, status_code=status.HTTP_200_OK)
+async def get_friend_requests(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user_id: str = Depends(get_current_user_id),
+    user_service: UserService = Depends(get_user_service)
+):
+    """
+    Get the pending friend requests the logged-in user received, newest first (requires authentication)
+    
+    - **cursor**: nextCursor of the previous page; omit for the first page
+    - **limit**: Maximum number of requests (1-100)
+    
+    Returns a page of requests with their senders and the cursor of the next page (null on the last one)
+    """
+    return await user_service.get_friend_requests(current_user_id, cursor, limit)
+
+
+@router.post("/me/friend-requests/accept", response_model=BulkOperationResponse, status_code=status.HTTP_200_OK)
+async def accept_friend_requests(
+    accept: FriendRequestAccept,
+    current_user_id: str = Depends(get_current_user_id),
+    user_service: UserService = Depends(get_user_service)
+):
+    """
+    Accept many pending friend requests at once (requires authentication)
+    
+    - **requestIds**: IDs of friend requests received by the logged-in user
+    
+    Returns one result per request; requests that are not pending for this user are rejected
+    """
+    return await user_service.accept_friend_requests(current_user_id, accept.request_ids)
+
+
+@router.get("/me/friend-suggestions", response_model=List[FriendSuggestion], status_code=status.HTTP_200_OK)
+async def get_friend_suggestions(
+    current_user_id: str = Depends(get_current_user_id),
+    friend_suggestion_service: FriendSuggestionService = Depends(get_friend_suggestion_service)
+):
+    """
+    Get people the logged-in user may know (requires authentication)
+    
+    Returns friends of friends ranked by mutual friends, shared events and city
+    """
+    return await friend_suggestion_service.get_suggestions(current_user_id)
+
+
+@router.get("/me/notifications", response_model=NotificationPage, status_code=status.HTTP_200_OK)
+async def get_notifications(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user_id: str = Depends(get_current_user_id),
+    notification_service: NotificationService = Depends(get_notification_service)
+):
+    """
+    Get the logged-in user's notifications, newest first (requires authentication)
+    
+    - **cursor**: nextCursor of the previous page; omit for the first page
+    - **limit**: Maximum number of notifications (1-100)
+    
+    Returns a page of notifications and the cursor of the next page (null on the last one)
+    """
+    return await notification_service.get_notifications(current_user_id, cursor, limit)
+
+
 @router.post("/{user_id}/friend-request", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def send_friend_request(
     user_id: str,
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from enum import Enum
 
@@ -62,17 +62,50 @@ class EventStatusUpdate(BaseModel):
     status: EventStatus
 
 
+class EventPeriod(str, Enum):
+    UPCOMING = "upcoming"
+    PAST = "past"
+
+
 class Event(BaseModel):
     id: str
     title: str
     banner: str
     date: str
+    starts_at: Optional[datetime] = None
     price: Optional[float]
     remaining_seats: int
     organizer: OrganizerInfo
     category: str
 
 
+class EventSearchResult(Event):
+    score: float
+
+
+class EventBatchResponse(BaseModel):
+    events: List[Event]
+    missing: List[str]
+
+
+class EventChanges(BaseModel):
+    events: List[Event]
+    deleted: List[str]
+    token: str
+    has_more: bool
+
+
+class EventSuggestion(BaseModel):
+    id: str
+    title: str
+    location: str
+
+
+class EventFacets(BaseModel):
+    categories: Dict[str, int]
+    statuses: Dict[str, int]
+
+
 class ParticipantInfo(BaseModel):
     id: str
     name: str
@@ -89,6 +122,7 @@ class EventDetail(BaseModel):
     banner: str
     date: str
     time: str
+    starts_at: Optional[datetime] = None
     price: Optional[float]
     remaining_seats: int
     capacity: int
@@ -101,12 +135,22 @@ class EventDetail(BaseModel):
     participants: List[ParticipantInfo] = []
 
 
+class FriendFeedItem(BaseModel):
+    event: Event
+    friends: List[ParticipantInfo]
+    friend_count: int = Field(alias="friendCount")
+    
+    class Config:
+        populate_by_name = True
+
+
 class EventInDB(EventBase):
     id: str
     organizer_id: str
     organizer_name: str
     organizer_rating: float
     capacity: int
-    registered_users: List[str] = []
+    registered_count: int = 0
     status: EventStatus
+    starts_at: Optional[datetime] = None
     created_at: datetime
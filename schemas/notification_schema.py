@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+
+class Notification(BaseModel):
+    id: str
+    event_id: str = Field(alias="eventId")
+    type: str
+    message: str
+    changes: Dict[str, Any] = {}
+    created_at: datetime = Field(alias="createdAt")
+    read: bool = False
+    
+    class Config:
+        populate_by_name = True
+
+
+class NotificationPage(BaseModel):
+    notifications: List[Notification]
+    next_cursor: Optional[str] = Field(None, alias="nextCursor")
+    
+    class Config:
+        populate_by_name = True
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Optional, List
 
 
 class RegistrationStatus(str, Enum):
@@ -20,6 +20,21 @@ class RegistrationCreate(BaseModel):
         populate_by_name = True
 
 
+class GroupRegistrationCreate(BaseModel):
+    user_ids: List[str] = Field(alias="userIds", min_length=1)
+    
+    class Config:
+        populate_by_name = True
+
+
+class GroupRegistrationResponse(BaseModel):
+    message: str
+    registration_ids: List[str] = Field(alias="registrationIds")
+    
+    class Config:
+        populate_by_name = True
+
+
 class Registration(BaseModel):
     id: str
     evento_id: str = Field(alias="eventoId")
@@ -69,3 +84,37 @@ class RegistrationInDB(BaseModel):
     status: RegistrationStatus
     timestamp_inscricao: datetime
     timestamp_pagamento: Optional[datetime] = None
+
+
+class BulkItemResult(BaseModel):
+    id: str
+    success: bool
+    detail: Optional[str] = None
+
+
+class BulkOperationResponse(BaseModel):
+    results: List[BulkItemResult]
+
+
+class TicketResponse(BaseModel):
+    registration_id: str = Field(alias="registrationId")
+    event_id: str = Field(alias="eventId")
+    token: str
+    
+    class Config:
+        populate_by_name = True
+
+
+class OfflineTicketBundle(BaseModel):
+    event_id: str = Field(alias="eventId")
+    verification_key: str = Field(alias="verificationKey")
+    revoked: List[str]
+    checked_in: List[str] = Field(alias="checkedIn")
+    generated_at: datetime = Field(alias="generatedAt")
+    
+    class Config:
+        populate_by_name = True
+
+
+class CheckInRequest(BaseModel):
+    tickets: List[str] = Field(min_length=1)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 
 
@@ -41,6 +41,49 @@ class UserInfo(BaseModel):
     city: str
 
 
+class FriendPage(BaseModel):
+    friends: List[UserPublic]
+    next_cursor: Optional[str] = Field(None, alias="nextCursor")
+    
+    class Config:
+        populate_by_name = True
+
+
+class FriendRequest(BaseModel):
+    id: str
+    from_user: UserPublic = Field(alias="fromUser")
+    created_at: datetime = Field(alias="createdAt")
+    
+    class Config:
+        populate_by_name = True
+
+
+class FriendRequestPage(BaseModel):
+    requests: List[FriendRequest]
+    next_cursor: Optional[str] = Field(None, alias="nextCursor")
+    
+    class Config:
+        populate_by_name = True
+
+
+class FriendRequestAccept(BaseModel):
+    request_ids: List[str] = Field(alias="requestIds", min_length=1)
+    
+    class Config:
+        populate_by_name = True
+
+
+class FriendSuggestion(BaseModel):
+    id: str
+    name: str
+    city: str
+    mutual_friends: int = Field(alias="mutualFriends")
+    shared_events: int = Field(alias="sharedEvents")
+    
+    class Config:
+        populate_by_name = True
+
+
 class Token(BaseModel):
     token: str
 
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+
+
+class WaitlistPosition(BaseModel):
+    event_id: str = Field(alias="eventId")
+    position: int
+    
+    class Config:
+        populate_by_name = True
@@ -0,0 +1,45 @@
+import time
+from datetime import datetime, timedelta
+from repositories.archive_repository import ArchiveRepository
+from utils.debug import debug_print
+
+# Outcome of the most recent archival run on this worker, reported by /metrics
+last_archive_metrics: dict = {}
+
+
+class ArchiveService:
+    def __init__(self, archive_repo: ArchiveRepository):
+        self.archive_repo = archive_repo
+    
+    async def archive_old_data(self, retention_days: int, batch_size: int) -> dict:
+        """Move finished events, and cancelled or refused registrations, older than the retention to the archive"""
+        debug_print("archive_service.py", "archive_old_data", "variables", retention_days=retention_days, batch_size=batch_size)
+        
+        started = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        
+        events = 0
+        while True:
+            moved = await self.archive_repo.archive_finished_events(cutoff, batch_size)
+            events += moved
+            if moved < batch_size:
+                break
+        
+        registrations = 0
+        while True:
+            moved = await self.archive_repo.archive_closed_registrations(cutoff, batch_size)
+            registrations += moved
+            if moved < batch_size:
+                break
+        
+        metrics = {
+            "finished_at": datetime.utcnow(),
+            "events": events,
+            "closed_registrations": registrations,
+            "seconds": round(time.monotonic() - started, 3)
+        }
+        last_archive_metrics.clear()
+        last_archive_metrics.update(metrics)
+        
+        debug_print("archive_service.py", "archive_old_data", "returning", metrics=metrics)
+        return metrics
@@ -0,0 +1,36 @@
+from repositories.event_repository import EventRepository, PROMOTE_WAITLIST
+from repositories.notification_repository import NotificationRepository
+from repositories.registration_repository import RegistrationRepository
+from repositories.waitlist_repository import WaitlistRepository
+from services.notification_service import NotificationService
+from utils.job_queue import job_queue
+
+# Job names
+REFRESH_SEAT_STATUS = "event.refresh_seat_status"
+NOTIFY_EVENT_UPDATE = "event.notify_update"
+
+
+def register_job_handlers(db):
+    """Register the handlers of the post-write side effects run by the job queue"""
+    # Imported here: the waitlist service imports event_service, which imports this module
+    from services.waitlist_service import WaitlistService
+    
+    event_repo = EventRepository(db)
+    registration_repo = RegistrationRepository(db)
+    notification_service = NotificationService(NotificationRepository(db), registration_repo)
+    waitlist_service = WaitlistService(event_repo, registration_repo, WaitlistRepository(db))
+    
+    async def refresh_seat_status(payload: dict):
+        await event_repo.refresh_seat_status(payload["event_id"])
+    
+    async def notify_event_update(payload: dict):
+        await notification_service.fan_out_event_update(
+            payload["event_id"], payload["event_title"], payload["changes"], payload["fanout_id"]
+        )
+    
+    async def promote_waitlist(payload: dict):
+        await waitlist_service.promote(payload["event_id"], payload["seats"])
+    
+    job_queue.register(REFRESH_SEAT_STATUS, refresh_seat_status)
+    job_queue.register(NOTIFY_EVENT_UPDATE, notify_event_update)
+    job_queue.register(PROMOTE_WAITLIST, promote_waitlist)
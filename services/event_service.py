@@ -1,18 +1,57 @@
-from typing import List
+import uuid
+from typing import List, Optional, Union
+from datetime import datetime, timedelta
+from bson import ObjectId
 from repositories.user_repository import UserRepository
-from repositories.event_repository import EventRepository
+from repositories.event_repository import EventRepository, EVENT_LIST_PROJECTION, build_event_projection
 from repositories.registration_repository import RegistrationRepository
 from repositories.friendship_repository import FriendshipRepository
-from schemas.event_schema import Event, EventDetail, OrganizerInfo, ParticipantInfo, EventStatus
-from schemas.registration_schema import RegistrationResponse, RegistrationStatus
+from schemas.event_schema import Event, EventDetail, OrganizerInfo, ParticipantInfo, FriendFeedItem, EventStatus, EventPeriod, EventSearchResult, EventSuggestion, EventFacets, EventCategory, EventBatchResponse, EventChanges
+from schemas.registration_schema import RegistrationResponse, RegistrationStatus, GroupRegistrationResponse
+from config.settings import settings
 from utils.exceptions import (
     EventNotFoundException,
+    TooManyIdsException,
+    InvalidSyncTokenException,
     EventFullException,
     AlreadyRegisteredException,
-    NotEventOrganizerException
+    NotEventOrganizerException,
+    UserNotFoundException,
+    InvalidEventDateException
 )
+from utils.dates import parse_event_datetime, to_naive_utc, to_epoch_millis, from_epoch_millis
+from utils.text import normalize_text, build_search_keys
+from utils.single_flight import SingleFlight
+from utils.cache import TTLCache, on_document_change
+from utils.job_queue import job_queue
+from services.background_jobs import REFRESH_SEAT_STATUS, NOTIFY_EVENT_UPDATE
+from services.notification_service import NOTIFIED_EVENT_FIELDS
 from utils.debug import debug_print
 
+# Concurrent requests for the same event share one Mongo query
+_event_reads = SingleFlight("event_detail")
+_participant_reads = SingleFlight("event_participants")
+
+# "Friends attending" feed per user, along with the friend IDs it was built from. Writes on
+# other workers clear it through the change streams; only status changes matter for updates
+_friend_feed_cache = TTLCache(
+    "friend_feed",
+    ttl_seconds=settings.FRIEND_FEED_CACHE_TTL_SECONDS,
+    max_size=settings.FRIEND_FEED_CACHE_SIZE,
+    collections=("friendships",),
+    fields=("status",)
+)
+
+
+def invalidate_friend_feeds(user_ids: List[str]):
+    """Drop the cached feeds of the friends of these users (the feeds showing them), after they register or cancel"""
+    user_ids = set(user_ids)
+    _friend_feed_cache.invalidate_where(lambda entry: not entry["friend_ids"].isdisjoint(user_ids))
+
+
+# Registrations made or changed on other workers only drop the feeds showing their user
+on_document_change("registrations", lambda registration: invalidate_friend_feeds([registration["usuario_id"]]), fields=("status",))
+
 
 class EventService:
     def __init__(
@@ -27,34 +66,179 @@ class EventService:
         self.registration_repo = registration_repo
         self.friendship_repo = friendship_repo
     
-    async def get_all_events(self) -> List[Event]:
-        """Get all events"""
-        debug_print("event_service.py", "get_all_events", "variables")
+    def _event_values(self, event_data: dict) -> dict:
+        """Map each response field to a getter over a (possibly projected) event document"""
+        def remaining_seats():
+            return event_data["capacity"] - event_data.get("registered_count", 0)
+        
+        return {
+            "id": lambda: event_data["id"],
+            "title": lambda: event_data["title"],
+            "banner": lambda: event_data["banner"],
+            "date": lambda: event_data["date"],
+            "time": lambda: event_data["time"],
+            "starts_at": lambda: event_data.get("starts_at"),
+            "price": lambda: event_data.get("price"),
+            "remaining_seats": remaining_seats,
+            "capacity": lambda: event_data["capacity"],
+            "organizer": lambda: OrganizerInfo(
+                id=event_data["organizer_id"],
+                name=event_data["organizer_name"],
+                rating=event_data["organizer_rating"]
+            ),
+            "category": lambda: event_data["category"],
+            "description": lambda: event_data["description"],
+            "location": lambda: event_data["location"],
+            "rules": lambda: event_data.get("rules", []),
+            "status": lambda: event_data["status"]
+        }
+    
+    def _build_event(self, event_data: dict, fields: Optional[List[str]] = None) -> Union[Event, dict]:
+        """Build the list representation of an event document, or only the requested fields"""
+        values = self._event_values(event_data)
+        if fields is not None:
+            return {field: values[field]() for field in fields}
+        return Event(**{field: values[field]() for field in Event.model_fields})
+    
+    async def get_all_events(
+        self,
+        period: Optional[EventPeriod] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        fields: Optional[List[str]] = None
+    ) -> List[Union[Event, dict]]:
+        """Get all events, optionally restricted to a date window"""
+        debug_print("event_service.py", "get_all_events", "variables", period=period, date_from=date_from, date_to=date_to, fields=fields)
+        
+        projection = build_event_projection(fields) if fields else None
+        if period is None and date_from is None and date_to is None:
+            events_data = await self.event_repo.get_all_events(projection)
+        else:
+            now = datetime.utcnow()
+            date_from = to_naive_utc(date_from)
+            date_to = to_naive_utc(date_to)
+            descending = False
+            if period == EventPeriod.UPCOMING:
+                date_from = max(date_from, now) if date_from else now
+            elif period == EventPeriod.PAST:
+                date_to = min(date_to, now) if date_to else now
+                descending = True
+            events_data = await self.event_repo.get_events_by_date_range(date_from, date_to, descending, projection)
+        
+        events = [self._build_event(event_data, fields) for event_data in events_data]
         
-        events_data = await self.event_repo.get_all_events()
+        debug_print("event_service.py", "get_all_events", "returning", events_count=len(events))
+        return events
+    
+    async def get_events_batch(self, event_ids: List[str], fields: Optional[List[str]] = None) -> Union[EventBatchResponse, dict]:
+        """Get several events in one query, in the requested order"""
+        debug_print("event_service.py", "get_events_batch", "variables", event_ids=event_ids, fields=fields)
+        
+        # Drop duplicates but keep the order the client asked for
+        event_ids = list(dict.fromkeys(event_ids))
+        if len(event_ids) > settings.EVENT_BATCH_MAX_IDS:
+            debug_print("event_service.py", "get_events_batch", "error", error="TooManyIdsException", reason=f"{len(event_ids)} IDs requested (max: {settings.EVENT_BATCH_MAX_IDS})")
+            raise TooManyIdsException(settings.EVENT_BATCH_MAX_IDS)
+        
+        projection = build_event_projection(fields) if fields else EVENT_LIST_PROJECTION
+        events_data = await self.event_repo.get_events_by_ids(event_ids, projection)
+        event_map = {event_data["id"]: event_data for event_data in events_data}
+        
+        events = [self._build_event(event_map[event_id], fields) for event_id in event_ids if event_id in event_map]
+        missing = [event_id for event_id in event_ids if event_id not in event_map]
+        if fields is not None:
+            result = {"events": events, "missing": missing}
+        else:
+            result = EventBatchResponse(events=events, missing=missing)
         
-        events = []
+        debug_print("event_service.py", "get_events_batch", "returning", events_count=len(events), missing=missing)
+        return result
+    
+    async def get_changes(self, since_token: Optional[str] = None) -> EventChanges:
+        """Get events changed since a sync token, plus the token to use next time"""
+        debug_print("event_service.py", "get_changes", "variables", since_token=since_token)
+        
+        # Tokens are "<updated_at in ms>_<event id>"; the old numeric sync versions start over
+        since_updated_at, since_id = None, None
+        if since_token and not since_token.isdigit():
+            try:
+                millis, since_id = since_token.split("_")
+                since_updated_at = from_epoch_millis(int(millis))
+            except (ValueError, OverflowError):
+                since_id = None
+            if since_id is None or not ObjectId.is_valid(since_id):
+                debug_print("event_service.py", "get_changes", "error", error="InvalidSyncTokenException", reason=f"Token {since_token} is not a sync position")
+                raise InvalidSyncTokenException()
+        
+        events_data = await self.event_repo.get_changes_since(since_updated_at, since_id, settings.SYNC_PAGE_SIZE)
+        
+        # Timestamps come from the write itself, so a slightly older one can commit after a newer
+        # one. The token only advances past settled writes; newer ones are sent again
+        settle_cutoff = datetime.utcnow() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+        token = since_token or ""
+        advanced = False
         for event_data in events_data:
-            remaining_seats = event_data["capacity"] - len(event_data.get("registered_users", []))
-            
-            event = Event(
-                id=event_data["id"],
-                title=event_data["title"],
-                banner=event_data["banner"],
-                date=event_data["date"],
-                price=event_data.get("price"),
-                remaining_seats=remaining_seats,
-                organizer=OrganizerInfo(
-                    id=event_data["organizer_id"],
-                    name=event_data["organizer_name"],
-                    rating=event_data["organizer_rating"]
-                ),
-                category=event_data["category"]
-            )
-            events.append(event)
+            if event_data.get("updated_at") is None or event_data["updated_at"] > settle_cutoff:
+                break
+            token = f"{to_epoch_millis(event_data['updated_at'])}_{event_data['id']}"
+            advanced = True
+        
+        events = [self._build_event(event_data) for event_data in events_data if not event_data.get("deleted_at")]
+        deleted = [event_data["id"] for event_data in events_data if event_data.get("deleted_at")]
+        has_more = len(events_data) == settings.SYNC_PAGE_SIZE and advanced
+        changes = EventChanges(events=events, deleted=deleted, token=token, has_more=has_more)
+        
+        debug_print("event_service.py", "get_changes", "returning", events_count=len(events), deleted=deleted, token=changes.token)
+        return changes
+    
+    async def search_events(self, query: str, skip: int = 0, limit: int = 20) -> List[EventSearchResult]:
+        """Search events by relevance"""
+        debug_print("event_service.py", "search_events", "variables", query=query, skip=skip, limit=limit)
         
-        debug_print("event_service.py", "get_all_events", "returning", events_count=len(events))
-        return events
+        events_data = await self.event_repo.search_events(query, skip, limit)
+        
+        results = [
+            EventSearchResult(**self._build_event(event_data).model_dump(), score=event_data["score"])
+            for event_data in events_data
+        ]
+        
+        debug_print("event_service.py", "search_events", "returning", events_count=len(results))
+        return results
+    
+    async def suggest_events(self, prefix: str, limit: int = 8) -> List[EventSuggestion]:
+        """Autocomplete event titles and locations from a typed prefix"""
+        debug_print("event_service.py", "suggest_events", "variables", prefix=prefix, limit=limit)
+        
+        normalized_prefix = normalize_text(prefix)
+        if not normalized_prefix:
+            debug_print("event_service.py", "suggest_events", "returning", result=[])
+            return []
+        
+        events_data = await self.event_repo.suggest_events(normalized_prefix, limit)
+        
+        suggestions = [
+            EventSuggestion(id=event_data["id"], title=event_data["title"], location=event_data["location"])
+            for event_data in events_data
+        ]
+        
+        debug_print("event_service.py", "suggest_events", "returning", suggestions_count=len(suggestions))
+        return suggestions
+    
+    async def get_facets(self) -> EventFacets:
+        """Get event counts per category and per status"""
+        debug_print("event_service.py", "get_facets", "variables")
+        
+        counts = await self.event_repo.get_facet_counts()
+        
+        # Every known category and status is listed, even with no events
+        categories = {category.value: 0 for category in EventCategory}
+        categories.update(counts.get("categories", {}))
+        statuses = {event_status.value: 0 for event_status in EventStatus}
+        statuses.update(counts.get("statuses", {}))
+        facets = EventFacets(categories=categories, statuses=statuses)
+        
+        debug_print("event_service.py", "get_facets", "returning", facets=facets)
+        return facets
     
     async def get_organized_events(self, organizer_id: str) -> List[Event]:
         """Get all events organized by a specific user"""
@@ -62,44 +246,34 @@ class EventService:
         
         events_data = await self.event_repo.get_events_by_organizer(organizer_id)
         
-        events = []
-        for event_data in events_data:
-            remaining_seats = event_data["capacity"] - len(event_data.get("registered_users", []))
-            
-            event = Event(
-                id=event_data["id"],
-                title=event_data["title"],
-                banner=event_data["banner"],
-                date=event_data["date"],
-                price=event_data.get("price"),
-                remaining_seats=remaining_seats,
-                organizer=OrganizerInfo(
-                    id=event_data["organizer_id"],
-                    name=event_data["organizer_name"],
-                    rating=event_data["organizer_rating"]
-                ),
-                category=event_data["category"]
-            )
-            events.append(event)
+        events = [self._build_event(event_data) for event_data in events_data]
         
         debug_print("event_service.py", "get_organized_events", "returning", events_count=len(events))
         return events
     
-    async def get_event_detail(self, event_id: str, current_user_id: str = None) -> EventDetail:
-        """Get event details"""
-        debug_print("event_service.py", "get_event_detail", "variables", event_id=event_id, current_user_id=current_user_id)
-        
-        event_data = await self.event_repo.get_event_by_id(event_id)
+    async def get_event_detail(
+        self,
+        event_id: str,
+        current_user_id: str = None,
+        fields: Optional[List[str]] = None
+    ) -> Union[EventDetail, dict]:
+        """Get event details, or only the requested fields"""
+        debug_print("event_service.py", "get_event_detail", "variables", event_id=event_id, current_user_id=current_user_id, fields=fields)
+        
+        projection = build_event_projection(fields) if fields else None
+        event_data = await _event_reads.do(
+            (event_id, tuple(fields) if fields else None),
+            lambda: self.event_repo.get_event_by_id(event_id, projection)
+        )
         if not event_data:
             debug_print("event_service.py", "get_event_detail", "error", error="EventNotFoundException", reason=f"Event with id {event_id} not found")
             raise EventNotFoundException()
         
-        # Get participants info
+        # Get participants info from the registrations (skipped, with its joins, when not requested)
         participants = []
-        registered_user_ids = event_data.get("registered_users", [])
         
-        if registered_user_ids:
-            users = await self.user_repo.get_users_by_ids(registered_user_ids)
+        if fields is None or "participants" in fields:
+            users = await _participant_reads.do(event_id, lambda: self._get_participant_users(event_id))
             
             for user in users:
                 is_friend = False
@@ -114,55 +288,106 @@ class EventService:
                 )
                 participants.append(participant)
         
-        remaining_seats = event_data["capacity"] - len(registered_user_ids)
-        
-        event_detail = EventDetail(
-            id=event_data["id"],
-            title=event_data["title"],
-            banner=event_data["banner"],
-            date=event_data["date"],
-            time=event_data["time"],
-            price=event_data.get("price"),
-            remaining_seats=remaining_seats,
-            capacity=event_data["capacity"],
-            organizer=OrganizerInfo(
-                id=event_data["organizer_id"],
-                name=event_data["organizer_name"],
-                rating=event_data["organizer_rating"]
-            ),
-            category=event_data["category"],
-            description=event_data["description"],
-            location=event_data["location"],
-            rules=event_data.get("rules", []),
-            status=event_data["status"],
-            participants=participants
-        )
+        values = self._event_values(event_data)
+        values["participants"] = lambda: participants
+        
+        if fields is not None:
+            partial = {field: values[field]() for field in fields}
+            debug_print("event_service.py", "get_event_detail", "returning", event_id=partial["id"], fields=fields)
+            return partial
+        
+        event_detail = EventDetail(**{field: values[field]() for field in EventDetail.model_fields})
         
         debug_print("event_service.py", "get_event_detail", "returning", event_id=event_detail.id, participants_count=len(participants))
         return event_detail
     
-    async def get_user_events(self, user_id: str) -> List[RegistrationResponse]:
-        """Get user's event registrations"""
-        debug_print("event_service.py", "get_user_events", "variables", user_id=user_id)
-        
-        registrations = await self.registration_repo.get_user_registrations(user_id)
-        
-        if not registrations:
-            debug_print("event_service.py", "get_user_events", "returning", result=[])
+    async def _get_participant_users(self, event_id: str) -> List[dict]:
+        """Get the users holding a seat at an event"""
+        user_ids = await self.registration_repo.get_event_participant_ids(event_id)
+        if not user_ids:
             return []
+        return await self.user_repo.get_users_by_ids(user_ids)
+    
+    async def get_seat_snapshot(self, event_id: str) -> dict:
+        """Get the current seat count and status of an event"""
+        debug_print("event_service.py", "get_seat_snapshot", "variables", event_id=event_id)
+        
+        event_data = await self.event_repo.get_event_by_id(event_id, build_event_projection(["remaining_seats", "status"]))
+        if not event_data:
+            debug_print("event_service.py", "get_seat_snapshot", "error", error="EventNotFoundException", reason=f"Event with id {event_id} not found")
+            raise EventNotFoundException()
         
-        # Get event IDs
-        event_ids = [reg["evento_id"] for reg in registrations]
-        events = await self.event_repo.get_events_by_ids(event_ids)
+        values = self._event_values(event_data)
+        snapshot = {
+            "event_id": event_id,
+            "remaining_seats": max(values["remaining_seats"](), 0),
+            "status": values["status"]()
+        }
         
-        # Create a map of event_id -> event
-        event_map = {event["id"]: event for event in events}
+        debug_print("event_service.py", "get_seat_snapshot", "returning", snapshot=snapshot)
+        return snapshot
+    
+    async def get_friends_feed(self, user_id: str) -> List[FriendFeedItem]:
+        """Get the upcoming events the user's friends registered for, most friends first"""
+        debug_print("event_service.py", "get_friends_feed", "variables", user_id=user_id)
+        
+        cached = _friend_feed_cache.get(user_id)
+        if cached is not None:
+            debug_print("event_service.py", "get_friends_feed", "returning", items_count=len(cached["items"]), cached=True)
+            return cached["items"]
+        
+        friend_ids = await self.friendship_repo.get_all_friends(user_id)
+        items = []
+        if friend_ids:
+            # One query over the usuario_id index, grouped by event on the server
+            attended = await self.registration_repo.get_events_attended_by(friend_ids)
+            friends_by_event = {group["event_id"]: group["user_ids"] for group in attended}
+            
+            now = datetime.utcnow()
+            events = [
+                event for event in await self.event_repo.get_events_by_ids(list(friends_by_event), EVENT_LIST_PROJECTION)
+                if event.get("starts_at") and event["starts_at"] >= now
+            ]
+            events.sort(key=lambda event: (-len(friends_by_event[event["id"]]), event["starts_at"]))
+            events = events[:settings.FRIEND_FEED_SIZE]
+            
+            # Every friend shown in the feed is loaded in one query
+            shown_ids = list({friend_id for event in events for friend_id in friends_by_event[event["id"]]})
+            users = {user["id"]: user for user in await self.user_repo.get_users_by_ids(shown_ids)} if shown_ids else {}
+            for event in events:
+                friends = [
+                    ParticipantInfo(id=friend_id, name=users[friend_id]["name"], city=users[friend_id]["city"], isFriend=True)
+                    for friend_id in friends_by_event[event["id"]]
+                    if friend_id in users
+                ]
+                items.append(FriendFeedItem(event=self._build_event(event), friends=friends, friendCount=len(friends)))
+        
+        _friend_feed_cache.set(user_id, {"friend_ids": set(friend_ids), "items": items})
+        
+        debug_print("event_service.py", "get_friends_feed", "returning", items_count=len(items), cached=False)
+        return items
+    
+    async def get_user_events(
+        self,
+        user_id: str,
+        period: Optional[EventPeriod] = None,
+        skip: int = 0,
+        limit: int = 20,
+        history: bool = False
+    ) -> List[RegistrationResponse]:
+        """Get a page of the user's event registrations, upcoming events first"""
+        debug_print("event_service.py", "get_user_events", "variables", user_id=user_id, period=period, skip=skip, limit=limit, history=history)
+        
+        # Registrations and their events come joined, sorted and paginated from one query;
+        # the archive is only read when history is asked for
+        upcoming = None if period is None else period == EventPeriod.UPCOMING
+        registrations = await self.registration_repo.get_user_registrations_with_events(
+            user_id, datetime.utcnow(), upcoming, skip, limit, include_archive=history
+        )
         
         result = []
         for reg in registrations:
-            event = event_map.get(reg["evento_id"])
-            if not event:
-                continue
+            event = reg["event"]
             
             # Can cancel if status is aguardando_pagamento or aprovada
             can_cancel = reg["status"] in [RegistrationStatus.AGUARDANDO_PAGAMENTO, RegistrationStatus.APROVADA]
@@ -198,9 +423,9 @@ class EventService:
             debug_print("event_service.py", "register_for_event", "error", error="EventFullException", reason=f"Event {event_id} has status FULL")
             raise EventFullException()
         
-        remaining_seats = event["capacity"] - len(event.get("registered_users", []))
+        remaining_seats = event["capacity"] - event.get("registered_count", 0)
         if remaining_seats <= 0:
-            debug_print("event_service.py", "register_for_event", "error", error="EventFullException", reason=f"Event {event_id} has no remaining seats (capacity: {event['capacity']}, registered: {len(event.get('registered_users', []))})")
+            debug_print("event_service.py", "register_for_event", "error", error="EventFullException", reason=f"Event {event_id} has no remaining seats (capacity: {event['capacity']}, registered: {event.get('registered_count', 0)})")
             raise EventFullException()
         
         # Check if user is already registered
@@ -217,15 +442,26 @@ class EventService:
         else:
             initial_status = RegistrationStatus.AGUARDANDO_PAGAMENTO
         
-        # Create registration with determined status
-        registration_id = await self.registration_repo.create_registration(user_id, event_id, initial_status)
+        # Take the seat; capacity is checked in the same write, so concurrent requests cannot overbook
+        if not await self.event_repo.reserve_seat(event_id, user_id, refresh_status=False, sharded=bool(event.get("seat_shards"))):
+            debug_print("event_service.py", "register_for_event", "error", error="EventFullException", reason=f"Event {event_id} filled up before the seat was taken")
+            raise EventFullException()
         
-        # Add user to event participants
-        await self.event_repo.add_participant(event_id, user_id)
+        # Create registration with determined status (free events are paid on creation);
+        # the unique index catches a concurrent duplicate that passed the check above
+        try:
+            registration_id = await self.registration_repo.create_registration(user_id, event_id, initial_status)
+        except Exception:
+            await self.event_repo.release_seats({event_id: [user_id]})
+            raise
+        if registration_id is None:
+            await self.event_repo.release_seats({event_id: [user_id]})
+            debug_print("event_service.py", "register_for_event", "error", error="AlreadyRegisteredException", reason=f"User {user_id} registered concurrently for event {event_id}")
+            raise AlreadyRegisteredException()
         
-        # Update payment timestamp if free event
-        if initial_status == RegistrationStatus.APROVADA:
-            await self.registration_repo.update_payment_timestamp(registration_id)
+        # Marking the event full can happen after the response
+        await job_queue.enqueue(REFRESH_SEAT_STATUS, {"event_id": event_id})
+        invalidate_friend_feeds([user_id])
         
         result = {
             "message": "Registration successful",
@@ -234,6 +470,65 @@ class EventService:
         debug_print("event_service.py", "register_for_event", "returning", result=result)
         return result
     
+    async def register_group_for_event(self, event_id: str, user_ids: List[str], requester_id: str) -> GroupRegistrationResponse:
+        """Register several users for an event, taking all their seats or none"""
+        debug_print("event_service.py", "register_group_for_event", "variables", event_id=event_id, user_ids=user_ids, requester_id=requester_id)
+        
+        user_ids = list(dict.fromkeys(user_ids))
+        if len(user_ids) > settings.GROUP_REGISTRATION_MAX_SIZE:
+            debug_print("event_service.py", "register_group_for_event", "error", error="TooManyIdsException", reason=f"{len(user_ids)} users in group (max: {settings.GROUP_REGISTRATION_MAX_SIZE})")
+            raise TooManyIdsException(settings.GROUP_REGISTRATION_MAX_SIZE)
+        
+        # Check if event exists
+        event = await self.event_repo.get_event_by_id(event_id, {"status": 1, "price": 1, "seat_shards": 1})
+        if not event:
+            debug_print("event_service.py", "register_group_for_event", "error", error="EventNotFoundException", reason=f"Event with id {event_id} not found")
+            raise EventNotFoundException()
+        
+        if event["status"] == EventStatus.FULL:
+            debug_print("event_service.py", "register_group_for_event", "error", error="EventFullException", reason=f"Event {event_id} has status FULL")
+            raise EventFullException()
+        
+        # Check every user exists, in one query
+        users = await self.user_repo.get_users_by_ids(user_ids)
+        if len(users) != len(user_ids):
+            missing = set(user_ids) - {user["id"] for user in users}
+            debug_print("event_service.py", "register_group_for_event", "error", error="UserNotFoundException", reason=f"Users {missing} not found")
+            raise UserNotFoundException()
+        
+        # Check nobody in the group is already registered, in one query
+        existing = await self.registration_repo.get_active_registrations_for_users(user_ids, event_id)
+        if existing:
+            debug_print("event_service.py", "register_group_for_event", "error", error="AlreadyRegisteredException", reason=f"Users {[reg['usuario_id'] for reg in existing]} are already registered for event {event_id}")
+            raise AlreadyRegisteredException()
+        
+        # Take every seat in one conditional write; fails as a whole if they do not all fit
+        if not await self.event_repo.reserve_seats(event_id, user_ids, sharded=bool(event.get("seat_shards"))):
+            debug_print("event_service.py", "register_group_for_event", "error", error="EventFullException", reason=f"Event {event_id} has fewer than {len(user_ids)} remaining seats")
+            raise EventFullException()
+        
+        # Determine initial status based on event price
+        if event.get("price") is None or event.get("price") == 0:
+            initial_status = RegistrationStatus.APROVADA
+        else:
+            initial_status = RegistrationStatus.AGUARDANDO_PAGAMENTO
+        
+        try:
+            registration_ids = await self.registration_repo.create_registrations(user_ids, event_id, initial_status, requester_id)
+        except Exception:
+            # Give the seats back so a failed insert does not leave them held
+            await self.event_repo.release_seats({event_id: user_ids})
+            raise
+        if registration_ids is None:
+            await self.event_repo.release_seats({event_id: user_ids})
+            debug_print("event_service.py", "register_group_for_event", "error", error="AlreadyRegisteredException", reason=f"A user in the group registered concurrently for event {event_id}")
+            raise AlreadyRegisteredException()
+        invalidate_friend_feeds(user_ids)
+        
+        result = GroupRegistrationResponse(message="Group registration successful", registrationIds=registration_ids)
+        debug_print("event_service.py", "register_group_for_event", "returning", result=result)
+        return result
+    
     async def create_event(self, event_data: dict, organizer_id: str) -> dict:
         """Create a new event"""
         debug_print("event_service.py", "create_event", "variables", event_data=event_data, organizer_id=organizer_id)
@@ -270,9 +565,40 @@ class EventService:
         if "price" in update_data and (update_data["price"] == 0 or update_data["price"] == "" or update_data["price"] is None):
             update_data["price"] = None
         
+        # Keep the parsed start datetime in sync with the date/time strings
+        if "date" in update_data or "time" in update_data:
+            update_data["starts_at"] = parse_event_datetime(
+                update_data.get("date") or event.get("date"),
+                update_data.get("time") or event.get("time")
+            )
+            # Storing the new date without a start time would leave the old starts_at in place
+            if update_data["starts_at"] is None:
+                debug_print("event_service.py", "update_event", "error", error="InvalidEventDateException", reason=f"Date {update_data.get('date') or event.get('date')!r} of event {event_id} cannot be parsed")
+                raise InvalidEventDateException()
+        
+        # Keep the autocomplete keys in sync with the title and location
+        if "title" in update_data or "location" in update_data:
+            update_data["search_keys"] = build_search_keys(
+                update_data.get("title", event.get("title")),
+                update_data.get("location", event.get("location"))
+            )
+        
         # Update event
         success = await self.event_repo.update_event(event_id, update_data)
         
+        # Attendees are told about schedule/venue/rules changes by a background fan-out
+        changes = {
+            field: update_data[field] for field in NOTIFIED_EVENT_FIELDS
+            if update_data.get(field) is not None and update_data[field] != event.get(field)
+        }
+        if success and changes:
+            await job_queue.enqueue(NOTIFY_EVENT_UPDATE, {
+                "event_id": event_id,
+                "event_title": update_data.get("title") or event["title"],
+                "changes": changes,
+                "fanout_id": uuid.uuid4().hex
+            })
+        
         if success:
             result = {"message": "Event updated successfully"}
         else:
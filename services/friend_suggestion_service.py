@@ -0,0 +1,132 @@
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List
+from config.settings import settings
+from repositories.user_repository import UserRepository
+from repositories.registration_repository import RegistrationRepository, ACTIVE_STATUSES
+from repositories.friendship_repository import FriendshipRepository
+from repositories.friend_suggestion_repository import FriendSuggestionRepository
+from schemas.user_schema import FriendSuggestion
+from utils.debug import debug_print
+
+# Outcome of the most recent precomputation on this worker, reported by /metrics
+last_suggestion_metrics: dict = {}
+
+
+class FriendSuggestionService:
+    def __init__(
+        self,
+        user_repo: UserRepository,
+        registration_repo: RegistrationRepository,
+        friendship_repo: FriendshipRepository,
+        suggestion_repo: FriendSuggestionRepository
+    ):
+        self.user_repo = user_repo
+        self.registration_repo = registration_repo
+        self.friendship_repo = friendship_repo
+        self.suggestion_repo = suggestion_repo
+    
+    async def compute_suggestions(self, user_id: str) -> List[dict]:
+        """Rank friends of friends by mutual friends, shared events and city"""
+        debug_print("friend_suggestion_service.py", "compute_suggestions", "variables", user_id=user_id)
+        
+        # First hop, capped so very connected users stay cheap
+        friend_ids = await self.friendship_repo.get_all_friends(user_id, settings.FRIEND_SUGGESTION_MAX_FRIENDS)
+        if not friend_ids:
+            debug_print("friend_suggestion_service.py", "compute_suggestions", "returning", suggestions=[])
+            return []
+        
+        # Second hop, bounded by the FRIEND_SUGGESTION_MAX_EDGES most recent friendships
+        friends = set(friend_ids)
+        excluded = set(await self.friendship_repo.get_connected_user_ids(user_id)) | {user_id}
+        mutual = Counter()
+        for first, second in await self.friendship_repo.get_friend_edges(friend_ids, settings.FRIEND_SUGGESTION_MAX_EDGES):
+            for friend, candidate in ((first, second), (second, first)):
+                if friend in friends and candidate not in excluded:
+                    mutual[candidate] += 1
+        candidates = [candidate for candidate, _ in mutual.most_common(settings.FRIEND_SUGGESTION_MAX_CANDIDATES)]
+        if not candidates:
+            debug_print("friend_suggestion_service.py", "compute_suggestions", "returning", suggestions=[])
+            return []
+        
+        user = await self.user_repo.get_user_by_id(user_id)
+        event_ids = [
+            registration["evento_id"] for registration in await self.registration_repo.get_user_registrations(user_id)
+            if registration["status"] in ACTIVE_STATUSES
+        ]
+        shared = await self.registration_repo.count_shared_events(candidates, event_ids) if event_ids else {}
+        users = {candidate["id"]: candidate for candidate in await self.user_repo.get_users_by_ids(candidates)}
+        
+        suggestions = []
+        for candidate_id in candidates:
+            candidate = users.get(candidate_id)
+            if not candidate:
+                continue
+            same_city = bool(user) and candidate.get("city") == user.get("city")
+            suggestions.append({
+                "id": candidate_id,
+                "name": candidate["name"],
+                "city": candidate["city"],
+                "mutual_friends": mutual[candidate_id],
+                "shared_events": shared.get(candidate_id, 0),
+                "score": 3 * mutual[candidate_id] + 2 * shared.get(candidate_id, 0) + (1 if same_city else 0)
+            })
+        suggestions.sort(key=lambda suggestion: (-suggestion["score"], suggestion["id"]))
+        suggestions = suggestions[:settings.FRIEND_SUGGESTION_LIMIT]
+        
+        debug_print("friend_suggestion_service.py", "compute_suggestions", "returning", suggestions_count=len(suggestions))
+        return suggestions
+    
+    async def get_suggestions(self, user_id: str) -> List[FriendSuggestion]:
+        """Get a user's precomputed suggestions, computing them the first time or when they went stale"""
+        debug_print("friend_suggestion_service.py", "get_suggestions", "variables", user_id=user_id)
+        
+        now = datetime.utcnow()
+        document = await self.suggestion_repo.get_suggestions(user_id)
+        if document is None or document["computed_at"] < now - timedelta(days=settings.FRIEND_SUGGESTION_ACTIVE_DAYS):
+            # Also (re-)enrolls the user in the periodic precomputation
+            suggestions = await self.compute_suggestions(user_id)
+            await self.suggestion_repo.save_suggestions(user_id, suggestions, requested=True)
+        else:
+            suggestions = document["suggestions"]
+            # Keeps a user who only reads suggestions in the precomputation; one write a day at most
+            if document.get("requested_at") is None or document["requested_at"] < now - timedelta(days=1):
+                await self.suggestion_repo.touch_requested(user_id)
+        
+        result = [
+            FriendSuggestion(
+                id=suggestion["id"],
+                name=suggestion["name"],
+                city=suggestion["city"],
+                mutualFriends=suggestion["mutual_friends"],
+                sharedEvents=suggestion["shared_events"]
+            )
+            for suggestion in suggestions
+        ]
+        debug_print("friend_suggestion_service.py", "get_suggestions", "returning", suggestions_count=len(result))
+        return result
+    
+    async def precompute_for_active_users(self, active_days: int) -> dict:
+        """Recompute the suggestions of users who registered for an event or asked for suggestions lately"""
+        debug_print("friend_suggestion_service.py", "precompute_for_active_users", "variables", active_days=active_days)
+        
+        started = time.monotonic()
+        since = datetime.utcnow() - timedelta(days=active_days)
+        user_ids = set(await self.registration_repo.get_recently_active_user_ids(since))
+        user_ids |= set(await self.suggestion_repo.get_recently_requested_user_ids(since))
+        
+        for user_id in user_ids:
+            suggestions = await self.compute_suggestions(user_id)
+            await self.suggestion_repo.save_suggestions(user_id, suggestions)
+        
+        metrics = {
+            "finished_at": datetime.utcnow(),
+            "users": len(user_ids),
+            "seconds": round(time.monotonic() - started, 3)
+        }
+        last_suggestion_metrics.clear()
+        last_suggestion_metrics.update(metrics)
+        
+        debug_print("friend_suggestion_service.py", "precompute_for_active_users", "returning", metrics=metrics)
+        return metrics
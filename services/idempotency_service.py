@@ -0,0 +1,89 @@
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Optional, Tuple
+from fastapi import HTTPException
+from config.settings import settings
+from repositories.idempotency_repository import IdempotencyRepository
+from utils.cache import TTLCache
+from utils.exceptions import IdempotencyKeyInProgressException, IdempotencyKeyReusedException
+from utils.debug import debug_print
+
+# Recently completed keys, so most replays are answered without touching the database
+_response_cache = TTLCache(
+    "idempotency_responses",
+    ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+    max_size=settings.IDEMPOTENCY_CACHE_SIZE
+)
+
+
+class IdempotencyService:
+    def __init__(self, idempotency_repo: IdempotencyRepository):
+        self.idempotency_repo = idempotency_repo
+    
+    def _replay(self, record: dict, fingerprint: Optional[str]) -> Optional[Tuple[int, dict]]:
+        """Get the stored response of a claimed key, or None while it is still running"""
+        if record.get("fingerprint") != fingerprint:
+            raise IdempotencyKeyReusedException()
+        if record.get("status_code") is None:
+            return None
+        return record["status_code"], record["body"]
+    
+    async def run(
+        self,
+        key: str,
+        user_id: str,
+        scope: str,
+        handler: Callable[[], Awaitable[dict]],
+        success_status: int,
+        request_data: Any = None
+    ) -> Tuple[int, dict]:
+        """Run handler once per key; replays get the stored status code and body"""
+        debug_print("idempotency_service.py", "run", "variables", key=key, user_id=user_id, scope=scope)
+        
+        key_id = f"{user_id}:{scope}:{key}"
+        fingerprint = None
+        if request_data is not None:
+            fingerprint = hashlib.sha256(json.dumps(request_data, sort_keys=True, default=str).encode()).hexdigest()
+        
+        claim_id = uuid.uuid4().hex
+        record = _response_cache.get(key_id)
+        if record is None and not await self.idempotency_repo.reserve_key(key_id, fingerprint, claim_id):
+            record = await self.idempotency_repo.get_key(key_id)
+            # A claim that outlived its lease belongs to a crashed worker: this retry runs the request instead
+            stale_before = datetime.utcnow() - timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+            if (
+                record is not None
+                and record.get("status_code") is None
+                and record.get("fingerprint") == fingerprint
+                and await self.idempotency_repo.take_over_key(key_id, fingerprint, claim_id, stale_before)
+            ):
+                record = None
+        
+        if record is not None:
+            replay = self._replay(record, fingerprint)
+            if replay is None:
+                debug_print("idempotency_service.py", "run", "error", error="IdempotencyKeyInProgressException", reason=f"Key {key_id} is still being processed")
+                raise IdempotencyKeyInProgressException()
+            _response_cache.set(key_id, record)
+            debug_print("idempotency_service.py", "run", "returning", replayed=True, status_code=replay[0])
+            return replay
+        
+        try:
+            status_code, body = success_status, await handler()
+        except HTTPException as error:
+            # Client errors are part of the outcome and are replayed; anything else may succeed on retry
+            if error.status_code >= 500:
+                await self.idempotency_repo.release_key(key_id, claim_id)
+                raise
+            status_code, body = error.status_code, {"detail": error.detail}
+        except Exception:
+            await self.idempotency_repo.release_key(key_id, claim_id)
+            raise
+        
+        await self.idempotency_repo.save_response(key_id, claim_id, status_code, body)
+        _response_cache.set(key_id, {"fingerprint": fingerprint, "status_code": status_code, "body": body})
+        
+        debug_print("idempotency_service.py", "run", "returning", replayed=False, status_code=status_code)
+        return status_code, body
@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from config.settings import settings
+from repositories.notification_repository import NotificationRepository
+from repositories.registration_repository import RegistrationRepository
+from schemas.notification_schema import Notification, NotificationPage
+from utils.exceptions import InvalidCursorException
+from utils.debug import debug_print
+
+# Event fields whose changes attendees are told about
+NOTIFIED_EVENT_FIELDS = ("date", "time", "location", "rules")
+
+
+class NotificationService:
+    def __init__(self, notification_repo: NotificationRepository, registration_repo: RegistrationRepository):
+        self.notification_repo = notification_repo
+        self.registration_repo = registration_repo
+    
+    async def fan_out_event_update(self, event_id: str, event_title: str, changes: dict, fanout_id: str) -> int:
+        """Write an "event updated" notification for every attendee, one insert per chunk"""
+        debug_print("notification_service.py", "fan_out_event_update", "variables", event_id=event_id, changes=changes, fanout_id=fanout_id)
+        
+        message = f'"{event_title}" was updated: {", ".join(changes)}'
+        created_at = datetime.utcnow()
+        inserted = 0
+        async for user_ids in self.registration_repo.iter_event_participant_ids(event_id, settings.NOTIFICATION_CHUNK_SIZE):
+            inserted += await self.notification_repo.insert_notifications([
+                {
+                    "usuario_id": user_id,
+                    "evento_id": event_id,
+                    "type": "event_updated",
+                    "message": message,
+                    "changes": changes,
+                    "fanout_id": fanout_id,
+                    "created_at": created_at,
+                    "read": False
+                }
+                for user_id in user_ids
+            ])
+        
+        debug_print("notification_service.py", "fan_out_event_update", "returning", inserted=inserted)
+        return inserted
+    
+    async def get_notifications(self, user_id: str, cursor: Optional[str] = None, limit: int = 20) -> NotificationPage:
+        """Get a page of the user's notifications, newest first"""
+        debug_print("notification_service.py", "get_notifications", "variables", user_id=user_id, cursor=cursor, limit=limit)
+        
+        if cursor is not None and not ObjectId.is_valid(cursor):
+            debug_print("notification_service.py", "get_notifications", "error", error="InvalidCursorException", reason=f"Cursor {cursor} is not a notification ID")
+            raise InvalidCursorException()
+        
+        notifications = await self.notification_repo.get_user_notifications(user_id, cursor, limit)
+        page = NotificationPage(
+            notifications=[
+                Notification(
+                    id=notification["id"],
+                    eventId=notification["evento_id"],
+                    type=notification["type"],
+                    message=notification["message"],
+                    changes=notification.get("changes", {}),
+                    createdAt=notification["created_at"],
+                    read=notification.get("read", False)
+                )
+                for notification in notifications
+            ],
+            # A full page may have more behind it; the last ID is where the next one starts
+            nextCursor=notifications[-1]["id"] if len(notifications) == limit else None
+        )
+        
+        debug_print("notification_service.py", "get_notifications", "returning", notifications_count=len(page.notifications), next_cursor=page.next_cursor)
+        return page
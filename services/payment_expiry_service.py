@@ -0,0 +1,64 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+from repositories.event_repository import EventRepository
+from repositories.registration_repository import RegistrationRepository
+from services.event_service import invalidate_friend_feeds
+from utils.debug import debug_print
+
+# Outcome of the most recent sweep on this worker, reported by /metrics
+last_sweep_metrics: dict = {}
+
+
+class PaymentExpiryService:
+    def __init__(
+        self,
+        event_repo: EventRepository,
+        registration_repo: RegistrationRepository
+    ):
+        self.event_repo = event_repo
+        self.registration_repo = registration_repo
+    
+    async def expire_unpaid_registrations(self, timeout_minutes: int, batch_size: int) -> dict:
+        """Cancel registrations left awaiting payment past the timeout and free their seats"""
+        debug_print("payment_expiry_service.py", "expire_unpaid_registrations", "variables", timeout_minutes=timeout_minutes, batch_size=batch_size)
+        
+        started = time.monotonic()
+        cutoff = datetime.utcnow() - timedelta(minutes=timeout_minutes)
+        sweep_id = uuid.uuid4().hex
+        expired_total = 0
+        batches = 0
+        
+        while True:
+            pending = await self.registration_repo.get_expired_pending_registrations(cutoff, batch_size)
+            if not pending:
+                break
+            
+            expired = await self.registration_repo.expire_registrations([reg["id"] for reg in pending], sweep_id)
+            
+            # Freed seats go to the waitlists first
+            seats_by_event = {}
+            for reg in expired:
+                seats_by_event.setdefault(reg["evento_id"], []).append(reg["usuario_id"])
+            await self.event_repo.release_seats(seats_by_event)
+            invalidate_friend_feeds([reg["usuario_id"] for reg in expired])
+            
+            expired_total += len(expired)
+            batches += 1
+            if len(pending) < batch_size:
+                break
+        
+        elapsed = time.monotonic() - started
+        metrics = {
+            "finished_at": datetime.utcnow(),
+            "expired": expired_total,
+            "batches": batches,
+            "batch_size": batch_size,
+            "seconds": round(elapsed, 3),
+            "per_second": round(expired_total / elapsed, 1) if elapsed > 0 else 0.0
+        }
+        last_sweep_metrics.clear()
+        last_sweep_metrics.update(metrics)
+        
+        debug_print("payment_expiry_service.py", "expire_unpaid_registrations", "returning", metrics=metrics)
+        return metrics
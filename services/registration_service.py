@@ -1,12 +1,20 @@
 from repositories.user_repository import UserRepository
 from repositories.event_repository import EventRepository
-from repositories.registration_repository import RegistrationRepository
-from schemas.registration_schema import RegistrationStatus
+from repositories.registration_repository import RegistrationRepository, ACTIVE_STATUSES
+from services.event_service import invalidate_friend_feeds
+from typing import List
+from datetime import datetime
+from config.settings import settings
+from schemas.registration_schema import RegistrationStatus, BulkItemResult, BulkOperationResponse
 from utils.exceptions import (
     RegistrationNotFoundException,
     ForbiddenException,
     CannotCancelException,
-    EventNotFoundException
+    EventNotFoundException,
+    EventFullException,
+    TooManyIdsException,
+    InvalidStatusTransitionException,
+    ActiveRegistrationExistsException
 )
 from utils.debug import debug_print
 
@@ -42,11 +50,11 @@ class RegistrationService:
             debug_print("registration_service.py", "cancel_registration", "error", error="CannotCancelException", reason=f"Registration {registration_id} has status {registration['status']}, cannot be cancelled")
             raise CannotCancelException()
         
-        # Cancel registration
-        await self.registration_repo.cancel_registration(registration_id)
-        
-        # Remove user from event participants
-        await self.event_repo.remove_participant(registration["evento_id"], user_id)
+        # Cancel registration; only the request that actually cancels it frees the seat
+        # (which goes to the head of the waitlist, if any)
+        if await self.registration_repo.cancel_registration(registration_id):
+            await self.event_repo.remove_participant(registration["evento_id"], user_id)
+            invalidate_friend_feeds([user_id])
         
         result = {"message": "Registration cancelled successfully"}
         debug_print("registration_service.py", "cancel_registration", "returning", result=result)
@@ -73,17 +81,103 @@ class RegistrationService:
             debug_print("registration_service.py", "update_registration_status", "error", error="ForbiddenException", reason=f"User {user_id} is not the organizer of event {event['_id']} (organizer: {event['organizer_id']})")
             raise ForbiddenException()
         
-        # Update registration status
-        await self.registration_repo.update_registration_status(registration_id, new_status)
-        
-        # If status is APROVADA and it's a paid event, update payment timestamp
-        if new_status == RegistrationStatus.APROVADA and event.get("price", 0) > 0:
-            await self.registration_repo.update_payment_timestamp(registration_id)
+        event_id = registration["evento_id"]
+        registration_user_id = registration["usuario_id"]
+        
+        # Same rules as the bulk update: registrations holding a seat can move to any other
+        # status; reactivating a cancelled or refused one takes a seat again first
+        reactivating = new_status in ACTIVE_STATUSES and registration["status"] not in ACTIVE_STATUSES
+        if reactivating:
+            if not await self.event_repo.reserve_seat(event_id, registration_user_id, sharded=bool(event.get("seat_shards"))):
+                debug_print("registration_service.py", "update_registration_status", "error", error="EventFullException", reason=f"No seat left in event {event_id} to reactivate registration {registration_id}")
+                raise EventFullException()
+            from_statuses = [registration["status"]]
+        else:
+            from_statuses = [status for status in ACTIVE_STATUSES if status != new_status]
+        
+        # Update registration status; if status is APROVADA and it's a paid event, the payment
+        # timestamp is the approval time and goes in the same write
+        paid_at = None
+        if new_status == RegistrationStatus.APROVADA and (event.get("price") or 0) > 0:
+            paid_at = datetime.utcnow()
+        changed = await self.registration_repo.update_registration_status(registration_id, new_status, paid_at, from_statuses)
+        
+        if reactivating and not changed:
+            await self.event_repo.release_seats({event_id: [registration_user_id]})
+        if changed is None:
+            debug_print("registration_service.py", "update_registration_status", "error", error="ActiveRegistrationExistsException", reason=f"User {registration_user_id} already has an active registration for event {event_id}")
+            raise ActiveRegistrationExistsException()
+        if not changed:
+            debug_print("registration_service.py", "update_registration_status", "error", error="InvalidStatusTransitionException", reason=f"Registration {registration_id} cannot change from {registration['status']} to {new_status}")
+            raise InvalidStatusTransitionException(new_status.value)
+        
+        # A registration that stopped holding a seat gives it back, and the waitlist takes it
+        if new_status not in ACTIVE_STATUSES:
+            await self.event_repo.release_seats({event_id: [registration_user_id]})
+        if reactivating or new_status not in ACTIVE_STATUSES:
+            invalidate_friend_feeds([registration_user_id])
         
         result = {"message": f"Registration status updated to {new_status} successfully"}
         debug_print("registration_service.py", "update_registration_status", "returning", result=result)
         return result
     
+    async def bulk_update_registration_status(self, registration_ids: List[str], new_status: RegistrationStatus, user_id: str) -> BulkOperationResponse:
+        """Update the status of many registrations at once (only for events the user organizes)"""
+        debug_print("registration_service.py", "bulk_update_registration_status", "variables", registrations_count=len(registration_ids), new_status=new_status, user_id=user_id)
+        
+        registration_ids = list(dict.fromkeys(registration_ids))
+        if len(registration_ids) > settings.REGISTRATION_BULK_MAX_IDS:
+            debug_print("registration_service.py", "bulk_update_registration_status", "error", error="TooManyIdsException", reason=f"{len(registration_ids)} IDs requested (max: {settings.REGISTRATION_BULK_MAX_IDS})")
+            raise TooManyIdsException(settings.REGISTRATION_BULK_MAX_IDS)
+        
+        # One query checks every registration and the organizer of its event
+        registrations = await self.registration_repo.get_registrations_with_events(registration_ids)
+        registration_map = {reg["id"]: reg for reg in registrations}
+        
+        results = {}
+        allowed_ids = []
+        paid_ids = []
+        for registration_id in registration_ids:
+            reg = registration_map.get(registration_id)
+            if not reg:
+                results[registration_id] = BulkItemResult(id=registration_id, success=False, detail="Registration not found")
+                continue
+            event = reg.get("event")
+            if not event:
+                results[registration_id] = BulkItemResult(id=registration_id, success=False, detail="Event not found")
+                continue
+            if event["organizer_id"] != user_id:
+                results[registration_id] = BulkItemResult(id=registration_id, success=False, detail="You are not the organizer of this event")
+                continue
+            
+            allowed_ids.append(registration_id)
+            # If status is APROVADA and it's a paid event, update payment timestamp
+            if new_status == RegistrationStatus.APROVADA and (event.get("price") or 0) > 0:
+                paid_ids.append(registration_id)
+        
+        # Only registrations holding a seat can change status here: reactivating a cancelled or
+        # refused one would need a new seat, so the user registers again instead
+        from_statuses = [status for status in ACTIVE_STATUSES if status != new_status]
+        changed = await self.registration_repo.bulk_update_status(allowed_ids, new_status, paid_ids, from_statuses)
+        changed_ids = {registration["id"] for registration in changed}
+        for registration_id in allowed_ids:
+            if registration_id in changed_ids:
+                results[registration_id] = BulkItemResult(id=registration_id, success=True)
+            else:
+                results[registration_id] = BulkItemResult(id=registration_id, success=False, detail=f"Registration cannot change from its current status to {new_status.value}")
+        
+        # Registrations that stopped holding a seat give it back, and the waitlist takes it
+        if new_status not in ACTIVE_STATUSES and changed:
+            seats_by_event = {}
+            for registration in changed:
+                seats_by_event.setdefault(registration["evento_id"], []).append(registration["usuario_id"])
+            await self.event_repo.release_seats(seats_by_event)
+            invalidate_friend_feeds([registration["usuario_id"] for registration in changed])
+        
+        response = BulkOperationResponse(results=[results[registration_id] for registration_id in registration_ids])
+        debug_print("registration_service.py", "bulk_update_registration_status", "returning", updated_count=len(changed_ids), rejected_count=len(registration_ids) - len(changed_ids))
+        return response
+    
     async def get_event_registrations(self, event_id: str, user_id: str):
         """Get all registrations for an event (only organizer can access)"""
         debug_print("registration_service.py", "get_event_registrations", "variables", event_id=event_id, user_id=user_id)
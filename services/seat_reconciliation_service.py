@@ -0,0 +1,57 @@
+import time
+from datetime import datetime, timedelta
+from repositories.event_repository import EventRepository
+from repositories.registration_repository import RegistrationRepository
+from utils.debug import debug_print
+
+# Outcome of the most recent reconciliation on this worker, reported by /metrics
+last_reconcile_metrics: dict = {}
+
+
+class SeatReconciliationService:
+    def __init__(self, event_repo: EventRepository, registration_repo: RegistrationRepository):
+        self.event_repo = event_repo
+        self.registration_repo = registration_repo
+    
+    async def reconcile_seat_counters(self, settle_seconds: int, batch_size: int) -> dict:
+        """Recount the seats of every event from its registrations and repair drifted counters"""
+        debug_print("seat_reconciliation_service.py", "reconcile_seat_counters", "variables", settle_seconds=settle_seconds, batch_size=batch_size)
+        
+        started = time.monotonic()
+        # A reservation increments the counter just before its registration is inserted;
+        # events written in the last few seconds are skipped so that gap is never "repaired"
+        updated_before = datetime.utcnow() - timedelta(seconds=settle_seconds)
+        checked = 0
+        repaired = 0
+        after_id = None
+        
+        while True:
+            events = await self.event_repo.get_seat_counters(updated_before, after_id, batch_size)
+            if not events:
+                break
+            
+            counts = await self.registration_repo.count_active_by_event([event["id"] for event in events])
+            repairs = [
+                {"id": event["id"], "updated_at": event["updated_at"], "registered_count": counts.get(event["id"], 0)}
+                for event in events
+                if event.get("registered_count") != counts.get(event["id"], 0) or event.get("has_participants_array")
+            ]
+            repaired += await self.event_repo.repair_seat_counters(repairs)
+            
+            checked += len(events)
+            after_id = events[-1]["id"]
+            if len(events) < batch_size:
+                break
+        
+        elapsed = time.monotonic() - started
+        metrics = {
+            "finished_at": datetime.utcnow(),
+            "checked": checked,
+            "repaired": repaired,
+            "seconds": round(elapsed, 3)
+        }
+        last_reconcile_metrics.clear()
+        last_reconcile_metrics.update(metrics)
+        
+        debug_print("seat_reconciliation_service.py", "reconcile_seat_counters", "returning", metrics=metrics)
+        return metrics
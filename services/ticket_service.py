@@ -0,0 +1,121 @@
+from datetime import datetime
+from typing import List
+from config.settings import settings
+from repositories.event_repository import EventRepository
+from repositories.registration_repository import RegistrationRepository
+from schemas.registration_schema import RegistrationStatus, TicketResponse, OfflineTicketBundle, BulkItemResult, BulkOperationResponse
+from utils.exceptions import (
+    RegistrationNotFoundException,
+    EventNotFoundException,
+    ForbiddenException,
+    TicketNotAvailableException,
+    TooManyIdsException
+)
+from utils.tickets import create_ticket, verify_ticket, event_verification_key
+from utils.debug import debug_print
+
+
+class TicketService:
+    def __init__(self, event_repo: EventRepository, registration_repo: RegistrationRepository):
+        self.event_repo = event_repo
+        self.registration_repo = registration_repo
+    
+    async def _check_organizer(self, event_id: str, user_id: str, method: str):
+        """Raise unless the user organizes the event"""
+        event = await self.event_repo.get_event_by_id(event_id, {"organizer_id": 1})
+        if not event:
+            debug_print("ticket_service.py", method, "error", error="EventNotFoundException", reason=f"Event with id {event_id} not found")
+            raise EventNotFoundException()
+        if event["organizer_id"] != user_id:
+            debug_print("ticket_service.py", method, "error", error="ForbiddenException", reason=f"User {user_id} is not the organizer of event {event_id}")
+            raise ForbiddenException()
+    
+    async def get_ticket(self, registration_id: str, user_id: str) -> TicketResponse:
+        """Get the signed ticket of one of the user's approved registrations"""
+        debug_print("ticket_service.py", "get_ticket", "variables", registration_id=registration_id, user_id=user_id)
+        
+        registration = await self.registration_repo.get_registration_by_id(registration_id)
+        if not registration:
+            debug_print("ticket_service.py", "get_ticket", "error", error="RegistrationNotFoundException", reason=f"Registration with id {registration_id} not found")
+            raise RegistrationNotFoundException()
+        
+        if registration["usuario_id"] != user_id:
+            debug_print("ticket_service.py", "get_ticket", "error", error="ForbiddenException", reason=f"User {user_id} does not own registration {registration_id}")
+            raise ForbiddenException()
+        
+        if registration["status"] != RegistrationStatus.APROVADA:
+            debug_print("ticket_service.py", "get_ticket", "error", error="TicketNotAvailableException", reason=f"Registration {registration_id} has status {registration['status']}")
+            raise TicketNotAvailableException()
+        
+        ticket = TicketResponse(
+            registrationId=registration_id,
+            eventId=registration["evento_id"],
+            token=create_ticket(registration_id, registration["evento_id"], user_id)
+        )
+        debug_print("ticket_service.py", "get_ticket", "returning", registration_id=registration_id)
+        return ticket
+    
+    async def get_offline_bundle(self, event_id: str, user_id: str) -> OfflineTicketBundle:
+        """Get what a door scanner needs to validate an event's tickets without the API"""
+        debug_print("ticket_service.py", "get_offline_bundle", "variables", event_id=event_id, user_id=user_id)
+        
+        await self._check_organizer(event_id, user_id, "get_offline_bundle")
+        
+        revoked = await self.registration_repo.get_event_revoked_registration_ids(event_id)
+        checked_in = await self.registration_repo.get_event_registration_ids_by_status(
+            event_id, [RegistrationStatus.FINALIZADA]
+        )
+        bundle = OfflineTicketBundle(
+            eventId=event_id,
+            verificationKey=event_verification_key(event_id).hex(),
+            revoked=revoked,
+            checkedIn=checked_in,
+            generatedAt=datetime.utcnow()
+        )
+        
+        debug_print("ticket_service.py", "get_offline_bundle", "returning", revoked_count=len(revoked), checked_in_count=len(checked_in))
+        return bundle
+    
+    async def check_in(self, event_id: str, tokens: List[str], user_id: str) -> BulkOperationResponse:
+        """Validate scanned tickets and mark their registrations finalizada in one write"""
+        debug_print("ticket_service.py", "check_in", "variables", event_id=event_id, tickets_count=len(tokens), user_id=user_id)
+        
+        tokens = list(dict.fromkeys(tokens))
+        if len(tokens) > settings.CHECK_IN_MAX_TICKETS:
+            debug_print("ticket_service.py", "check_in", "error", error="TooManyIdsException", reason=f"{len(tokens)} tickets sent (max: {settings.CHECK_IN_MAX_TICKETS})")
+            raise TooManyIdsException(settings.CHECK_IN_MAX_TICKETS)
+        
+        await self._check_organizer(event_id, user_id, "check_in")
+        
+        tickets = {token: verify_ticket(token) for token in tokens}
+        registrations = await self.registration_repo.get_registrations_by_ids(
+            [ticket["registration_id"] for ticket in tickets.values() if ticket]
+        )
+        registration_map = {reg["id"]: reg for reg in registrations}
+        
+        results = []
+        accepted_ids = []
+        for token, ticket in tickets.items():
+            if not ticket:
+                results.append(BulkItemResult(id=token, success=False, detail="Invalid ticket"))
+                continue
+            registration_id = ticket["registration_id"]
+            reg = registration_map.get(registration_id)
+            if ticket["event_id"] != event_id or not reg or reg["evento_id"] != event_id or reg["usuario_id"] != ticket["user_id"]:
+                results.append(BulkItemResult(id=registration_id, success=False, detail="Ticket is not for this event"))
+                continue
+            if reg["status"] == RegistrationStatus.FINALIZADA:
+                results.append(BulkItemResult(id=registration_id, success=False, detail="Already checked in"))
+                continue
+            if reg["status"] != RegistrationStatus.APROVADA:
+                results.append(BulkItemResult(id=registration_id, success=False, detail="Ticket revoked"))
+                continue
+            
+            accepted_ids.append(registration_id)
+            results.append(BulkItemResult(id=registration_id, success=True))
+        
+        await self.registration_repo.check_in_registrations(accepted_ids)
+        
+        response = BulkOperationResponse(results=results)
+        debug_print("ticket_service.py", "check_in", "returning", checked_in_count=len(accepted_ids), rejected_count=len(results) - len(accepted_ids))
+        return response
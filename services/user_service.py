@@ -1,8 +1,13 @@
+from typing import List, Optional
+from bson import ObjectId
 from repositories.user_repository import UserRepository
 from repositories.event_repository import EventRepository
 from repositories.registration_repository import RegistrationRepository
 from repositories.friendship_repository import FriendshipRepository
-from utils.exceptions import UserNotFoundException
+from schemas.user_schema import UserPublic, FriendPage, FriendRequest, FriendRequestPage
+from schemas.registration_schema import BulkItemResult, BulkOperationResponse
+from config.settings import settings
+from utils.exceptions import UserNotFoundException, InvalidCursorException, TooManyIdsException
 from utils.debug import debug_print
 
 
@@ -68,3 +73,83 @@ class UserService:
         
         debug_print("user_service.py", "get_user_info", "returning", user_info=user_info)
         return user_info
+    
+    async def _get_users_map(self, user_ids: List[str]) -> dict:
+        """Load the given users with one query, keyed by ID"""
+        users = await self.user_repo.get_users_by_ids(list(dict.fromkeys(user_ids))) if user_ids else []
+        return {user["id"]: user for user in users}
+    
+    async def get_friends(self, user_id: str, cursor: Optional[str] = None, limit: int = 20) -> FriendPage:
+        """Get a page of the user's friends, most recent friendships first"""
+        debug_print("user_service.py", "get_friends", "variables", user_id=user_id, cursor=cursor, limit=limit)
+        
+        if cursor is not None and not ObjectId.is_valid(cursor):
+            debug_print("user_service.py", "get_friends", "error", error="InvalidCursorException", reason=f"Cursor {cursor} is not a friendship ID")
+            raise InvalidCursorException()
+        
+        friendships = await self.friendship_repo.get_friendships_page(user_id, cursor, limit)
+        users = await self._get_users_map([friendship["friend_id"] for friendship in friendships])
+        
+        page = FriendPage(
+            friends=[
+                UserPublic(id=user["id"], name=user["name"], city=user["city"], is_friend=True)
+                for user in (users.get(friendship["friend_id"]) for friendship in friendships)
+                if user
+            ],
+            # A full page may have more behind it; the last ID is where the next one starts
+            nextCursor=friendships[-1]["id"] if len(friendships) == limit else None
+        )
+        
+        debug_print("user_service.py", "get_friends", "returning", friends_count=len(page.friends), next_cursor=page.next_cursor)
+        return page
+    
+    async def get_friend_requests(self, user_id: str, cursor: Optional[str] = None, limit: int = 20) -> FriendRequestPage:
+        """Get a page of the pending friend requests the user received, newest first"""
+        debug_print("user_service.py", "get_friend_requests", "variables", user_id=user_id, cursor=cursor, limit=limit)
+        
+        if cursor is not None and not ObjectId.is_valid(cursor):
+            debug_print("user_service.py", "get_friend_requests", "error", error="InvalidCursorException", reason=f"Cursor {cursor} is not a friend request ID")
+            raise InvalidCursorException()
+        
+        requests = await self.friendship_repo.get_pending_requests_page(user_id, cursor, limit)
+        users = await self._get_users_map([request["solicitante_id"] for request in requests])
+        
+        friend_requests = []
+        for request in requests:
+            sender = users.get(request["solicitante_id"])
+            if not sender:
+                continue
+            friend_requests.append(FriendRequest(
+                id=request["id"],
+                fromUser=UserPublic(id=sender["id"], name=sender["name"], city=sender["city"]),
+                createdAt=request["timestamp"]
+            ))
+        page = FriendRequestPage(
+            requests=friend_requests,
+            nextCursor=requests[-1]["id"] if len(requests) == limit else None
+        )
+        
+        debug_print("user_service.py", "get_friend_requests", "returning", requests_count=len(page.requests), next_cursor=page.next_cursor)
+        return page
+    
+    async def accept_friend_requests(self, user_id: str, request_ids: List[str]) -> BulkOperationResponse:
+        """Accept many pending friend requests received by the user at once"""
+        debug_print("user_service.py", "accept_friend_requests", "variables", user_id=user_id, requests_count=len(request_ids))
+        
+        request_ids = list(dict.fromkeys(request_ids))
+        if len(request_ids) > settings.FRIEND_ACCEPT_MAX_IDS:
+            debug_print("user_service.py", "accept_friend_requests", "error", error="TooManyIdsException", reason=f"{len(request_ids)} IDs requested (max: {settings.FRIEND_ACCEPT_MAX_IDS})")
+            raise TooManyIdsException(settings.FRIEND_ACCEPT_MAX_IDS)
+        
+        # One query finds which IDs are pending requests to this user, one update accepts them all
+        pending_ids = set(await self.friendship_repo.get_pending_request_ids(user_id, request_ids))
+        await self.friendship_repo.accept_friendship_requests(user_id, list(pending_ids))
+        
+        response = BulkOperationResponse(results=[
+            BulkItemResult(id=request_id, success=True) if request_id in pending_ids
+            else BulkItemResult(id=request_id, success=False, detail="Pending friend request not found")
+            for request_id in request_ids
+        ])
+        
+        debug_print("user_service.py", "accept_friend_requests", "returning", accepted_count=len(pending_ids), rejected_count=len(request_ids) - len(pending_ids))
+        return response
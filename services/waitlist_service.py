@@ -0,0 +1,137 @@
+from typing import List
+from repositories.event_repository import EventRepository
+from repositories.registration_repository import RegistrationRepository
+from repositories.waitlist_repository import WaitlistRepository
+from schemas.event_schema import EventStatus
+from schemas.registration_schema import RegistrationStatus
+from schemas.waitlist_schema import WaitlistPosition
+from utils.exceptions import (
+    EventNotFoundException,
+    EventNotFullException,
+    AlreadyRegisteredException,
+    NotOnWaitlistException
+)
+from services.event_service import invalidate_friend_feeds
+from utils.debug import debug_print
+
+
+class WaitlistService:
+    def __init__(
+        self,
+        event_repo: EventRepository,
+        registration_repo: RegistrationRepository,
+        waitlist_repo: WaitlistRepository
+    ):
+        self.event_repo = event_repo
+        self.registration_repo = registration_repo
+        self.waitlist_repo = waitlist_repo
+    
+    async def join_waitlist(self, event_id: str, user_id: str) -> WaitlistPosition:
+        """Queue a user for a full event"""
+        debug_print("waitlist_service.py", "join_waitlist", "variables", event_id=event_id, user_id=user_id)
+        
+        event = await self.event_repo.get_event_by_id(event_id)
+        if not event:
+            debug_print("waitlist_service.py", "join_waitlist", "error", error="EventNotFoundException", reason=f"Event with id {event_id} not found")
+            raise EventNotFoundException()
+        
+        remaining_seats = event["capacity"] - event.get("registered_count", 0)
+        if event["status"] != EventStatus.FULL and remaining_seats > 0:
+            debug_print("waitlist_service.py", "join_waitlist", "error", error="EventNotFullException", reason=f"Event {event_id} has {remaining_seats} remaining seats")
+            raise EventNotFullException()
+        
+        existing_registration = await self.registration_repo.get_registration_by_user_and_event(user_id, event_id)
+        if existing_registration:
+            debug_print("waitlist_service.py", "join_waitlist", "error", error="AlreadyRegisteredException", reason=f"User {user_id} is already registered for event {event_id}")
+            raise AlreadyRegisteredException()
+        
+        entry = await self.waitlist_repo.add_to_waitlist(event_id, user_id)
+        ahead = await self.waitlist_repo.count_ahead(event_id, entry["position"])
+        position = WaitlistPosition(eventId=event_id, position=ahead + 1)
+        
+        debug_print("waitlist_service.py", "join_waitlist", "returning", position=position)
+        return position
+    
+    async def get_position(self, event_id: str, user_id: str) -> WaitlistPosition:
+        """Get a user's current place in an event's waitlist"""
+        debug_print("waitlist_service.py", "get_position", "variables", event_id=event_id, user_id=user_id)
+        
+        entry = await self.waitlist_repo.get_waitlist_entry(event_id, user_id)
+        if not entry:
+            debug_print("waitlist_service.py", "get_position", "error", error="NotOnWaitlistException", reason=f"User {user_id} is not on the waitlist of event {event_id}")
+            raise NotOnWaitlistException()
+        
+        ahead = await self.waitlist_repo.count_ahead(event_id, entry["position"])
+        position = WaitlistPosition(eventId=event_id, position=ahead + 1)
+        
+        debug_print("waitlist_service.py", "get_position", "returning", position=position)
+        return position
+    
+    async def leave_waitlist(self, event_id: str, user_id: str) -> dict:
+        """Remove a user from an event's waitlist"""
+        debug_print("waitlist_service.py", "leave_waitlist", "variables", event_id=event_id, user_id=user_id)
+        
+        removed = await self.waitlist_repo.remove_from_waitlist(event_id, user_id)
+        if not removed:
+            debug_print("waitlist_service.py", "leave_waitlist", "error", error="NotOnWaitlistException", reason=f"User {user_id} is not on the waitlist of event {event_id}")
+            raise NotOnWaitlistException()
+        
+        # The last person leaving the queue of a full event with free seats reopens it
+        await self.event_repo.refresh_seat_status(event_id)
+        
+        result = {"message": "Removed from the waitlist"}
+        debug_print("waitlist_service.py", "leave_waitlist", "returning", result=result)
+        return result
+    
+    async def promote(self, event_id: str, seats: int = 1) -> List[str]:
+        """Register the head of the waitlist into freed seats; returns the new registration IDs"""
+        debug_print("waitlist_service.py", "promote", "variables", event_id=event_id, seats=seats)
+        
+        event = await self.event_repo.get_event_by_id(event_id, {"price": 1, "seat_shards": 1})
+        if not event:
+            debug_print("waitlist_service.py", "promote", "returning", registration_ids=[])
+            return []
+        
+        # Determine initial status based on event price
+        if event.get("price") is None or event.get("price") == 0:
+            initial_status = RegistrationStatus.APROVADA
+        else:
+            initial_status = RegistrationStatus.AGUARDANDO_PAGAMENTO
+        
+        registration_ids = []
+        while len(registration_ids) < seats:
+            # Taking the head is atomic, so concurrent promoters never pick the same user
+            entry = await self.waitlist_repo.pop_head(event_id)
+            if not entry:
+                break
+            
+            user_id = entry["usuario_id"]
+            if await self.registration_repo.get_registration_by_user_and_event(user_id, event_id):
+                # Registered on their own since joining the queue
+                continue
+            
+            if not await self.event_repo.reserve_seat(event_id, user_id, refresh_status=False, sharded=bool(event.get("seat_shards"))):
+                # The seat was taken in the meantime; keep their place for the next one
+                await self.waitlist_repo.restore_entry(entry)
+                break
+            
+            try:
+                registration_id = await self.registration_repo.create_registration(user_id, event_id, initial_status)
+            except Exception:
+                # Give the seat back and the user their place in line
+                await self.event_repo.release_seats({event_id: [user_id]})
+                await self.waitlist_repo.restore_entry(entry)
+                raise
+            if registration_id is None:
+                # Registered on their own in the meantime: the seat goes to the next in line
+                await self.event_repo.release_seats({event_id: [user_id]})
+                continue
+            registration_ids.append(registration_id)
+            invalidate_friend_feeds([user_id])
+        
+        # Marks the event full, reopens it once the queue is empty, or queues another
+        # promotion for seats freed while this one ran
+        await self.event_repo.refresh_seat_status(event_id)
+        
+        debug_print("waitlist_service.py", "promote", "returning", registration_ids=registration_ids)
+        return registration_ids
@@ -0,0 +1,21 @@
+import asyncio
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from migrations.indexes import ensure_indexes
+from repositories.registration_repository import RegistrationRepository
+from services.background_jobs import register_job_handlers
+
+
+@pytest.fixture
+def db():
+    """An empty in-memory database per test, with the production indexes; jobs run inline against it"""
+    database = AsyncMongoMockClient()["eventsync_test"]
+    
+    async def create_indexes():
+        await ensure_indexes(database)
+        # Built by a migration in production
+        await RegistrationRepository(database).ensure_active_unique_index()
+    
+    asyncio.run(create_indexes())
+    register_job_handlers(database)
+    return database
@@ -0,0 +1,52 @@
+import asyncio
+from datetime import datetime, timedelta
+from bson import ObjectId
+from repositories.archive_repository import ArchiveRepository
+from services.archive_service import ArchiveService
+
+
+def test_closed_registrations_of_live_events_are_archived(db):
+    async def scenario():
+        event_id = ObjectId()
+        await db.events.insert_one({"_id": event_id, "title": "Live", "starts_at": datetime.utcnow() + timedelta(days=30)})
+        old = datetime.utcnow() - timedelta(days=200)
+        await db.registrations.insert_many([
+            {"usuario_id": "u1", "evento_id": str(event_id), "status": "cancelada", "timestamp_inscricao": old},
+            {"usuario_id": "u2", "evento_id": str(event_id), "status": "recusada", "timestamp_inscricao": old},
+            {"usuario_id": "u3", "evento_id": str(event_id), "status": "finalizada", "timestamp_inscricao": old},
+            {"usuario_id": "u4", "evento_id": str(event_id), "status": "cancelada", "timestamp_inscricao": datetime.utcnow()},
+        ])
+        
+        metrics = await ArchiveService(ArchiveRepository(db)).archive_old_data(retention_days=180, batch_size=1)
+        
+        hot = {reg["usuario_id"] async for reg in db.registrations.find()}
+        archived = {reg["usuario_id"] async for reg in db.registrations_archive.find()}
+        return metrics, hot, archived, await db.events.count_documents({})
+    
+    metrics, hot, archived, events = asyncio.run(scenario())
+    
+    assert metrics["closed_registrations"] == 2
+    assert archived == {"u1", "u2"}
+    # Seat holders and recent cancellations stay, and so does the live event
+    assert hot == {"u3", "u4"}
+    assert events == 1
+
+
+def test_finished_events_move_with_their_registrations(db):
+    async def scenario():
+        event_id = ObjectId()
+        await db.events.insert_one({"_id": event_id, "title": "Past", "starts_at": datetime.utcnow() - timedelta(days=200)})
+        await db.registrations.insert_one(
+            {"usuario_id": "u1", "evento_id": str(event_id), "status": "finalizada", "timestamp_inscricao": datetime.utcnow()}
+        )
+        
+        metrics = await ArchiveService(ArchiveRepository(db)).archive_old_data(retention_days=180, batch_size=500)
+        
+        tombstone = await db.event_tombstones.find_one({"_id": event_id})
+        return metrics, await db.registrations.count_documents({}), await db.registrations_archive.count_documents({}), tombstone
+    
+    metrics, hot, archived, tombstone = asyncio.run(scenario())
+    
+    assert metrics["events"] == 1
+    assert (hot, archived) == (0, 1)
+    assert tombstone is not None
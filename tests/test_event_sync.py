@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from config.settings import settings
+from repositories.event_repository import EventRepository
+from repositories.friendship_repository import FriendshipRepository
+from repositories.registration_repository import RegistrationRepository
+from repositories.user_repository import UserRepository
+from services.event_service import EventService
+from utils.exceptions import InvalidSyncTokenException
+
+
+def _service(db) -> EventService:
+    return EventService(UserRepository(db), EventRepository(db), RegistrationRepository(db), FriendshipRepository(db))
+
+
+async def _create_event(db, title: str, updated_at: datetime) -> str:
+    event_id = await EventRepository(db).create_event({
+        "title": title,
+        "banner": "",
+        "date": "2030-01-01",
+        "time": "10:00",
+        "capacity": 10,
+        "category": "Outros",
+        "organizer_id": "organizer",
+        "organizer_name": "Organizer",
+        "organizer_rating": 5.0
+    })
+    await db.events.update_one({"_id": ObjectId(event_id)}, {"$set": {"updated_at": updated_at}})
+    return event_id
+
+
+def test_create_event_stamps_updated_at(db):
+    async def scenario():
+        event_id = await EventRepository(db).create_event({"title": "New", "capacity": 10, "date": "2030-01-01", "time": "10:00"})
+        return await db.events.find_one({"_id": ObjectId(event_id)})
+    
+    event = asyncio.run(scenario())
+    
+    assert isinstance(event["updated_at"], datetime)
+    assert event["registered_count"] == 0
+
+
+def test_changes_page_in_updated_at_then_id_order(db, monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_PAGE_SIZE", 2)
+    
+    async def scenario():
+        written = datetime.utcnow() - timedelta(minutes=5)
+        first = await _create_event(db, "First", written)
+        # Same timestamp: the _id breaks the tie
+        second = await _create_event(db, "Second", written)
+        archived = ObjectId()
+        await db.event_tombstones.insert_one({"_id": archived, "deleted_at": written, "updated_at": written + timedelta(seconds=1)})
+        # Too recent to be settled: sent, but the token stays before it
+        recent = await _create_event(db, "Recent", datetime.utcnow())
+        
+        service = _service(db)
+        pages = []
+        token = None
+        while True:
+            changes = await service.get_changes(token)
+            pages.append(changes)
+            token = changes.token
+            if not changes.has_more:
+                break
+        again = await service.get_changes(token)
+        return first, second, str(archived), recent, pages, again
+    
+    first, second, archived, recent, pages, again = asyncio.run(scenario())
+    
+    assert [event.id for event in pages[0].events] == [first, second]
+    assert pages[1].deleted == [archived]
+    assert [event.id for event in pages[1].events] == [recent]
+    assert [event.id for event in again.events] == [recent]
+    assert again.deleted == []
+
+
+@pytest.mark.parametrize("token", ["9" * 40 + "_" + "a" * 24, "abc_" + "a" * 24, "123_not-an-id", "no-separator"])
+def test_invalid_sync_tokens_are_rejected(db, token):
+    with pytest.raises(InvalidSyncTokenException):
+        asyncio.run(_service(db).get_changes(token))
@@ -0,0 +1,47 @@
+import asyncio
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from repositories.event_repository import EventRepository
+from repositories.friendship_repository import FriendshipRepository
+from repositories.registration_repository import RegistrationRepository
+from repositories.user_repository import UserRepository
+from services.event_service import EventService
+from utils.exceptions import InvalidEventDateException
+
+
+def _service(db) -> EventService:
+    return EventService(UserRepository(db), EventRepository(db), RegistrationRepository(db), FriendshipRepository(db))
+
+
+async def _create_event(db) -> str:
+    return await EventRepository(db).create_event({
+        "title": "Show",
+        "date": "2030-01-01",
+        "time": "10:00",
+        "capacity": 10,
+        "organizer_id": "organizer"
+    })
+
+
+def test_update_event_moves_starts_at_with_the_date(db):
+    async def scenario():
+        event_id = await _create_event(db)
+        await _service(db).update_event(event_id, {"date": "2030-02-01"}, "organizer")
+        return await db.events.find_one({"_id": ObjectId(event_id)})
+    
+    event = asyncio.run(scenario())
+    
+    assert event["starts_at"] == datetime(2030, 2, 1, 10, 0)
+
+
+def test_update_event_rejects_unparseable_dates(db):
+    async def scenario():
+        event_id = await _create_event(db)
+        with pytest.raises(InvalidEventDateException):
+            await _service(db).update_event(event_id, {"date": "next friday"}, "organizer")
+        return await db.events.find_one({"_id": ObjectId(event_id)})
+    
+    event = asyncio.run(scenario())
+    
+    assert (event["date"], event["starts_at"]) == ("2030-01-01", datetime(2030, 1, 1, 10, 0))
@@ -0,0 +1,56 @@
+import asyncio
+from bson import ObjectId
+from services.event_service import _friend_feed_cache
+from utils.change_stream_listener import ChangeStreamListener
+
+
+def _cache_feeds():
+    _friend_feed_cache.clear()
+    _friend_feed_cache.set("alice", {"friend_ids": {"bob"}, "items": []})
+    _friend_feed_cache.set("carol", {"friend_ids": {"dave"}, "items": []})
+
+
+def _cached_users():
+    return {user_id for user_id in ("alice", "carol") if _friend_feed_cache.get(user_id) is not None}
+
+
+def test_registration_insert_on_another_worker_drops_only_friends_feeds(db):
+    _cache_feeds()
+    change = {
+        "operationType": "insert",
+        "ns": {"db": "eventsync_test", "coll": "registrations"},
+        "documentKey": {"_id": ObjectId()},
+        "fullDocument": {"usuario_id": "bob"}
+    }
+    
+    asyncio.run(ChangeStreamListener(db)._handle(change))
+    
+    assert _cached_users() == {"carol"}
+
+
+def test_registration_status_update_looks_up_the_owner(db):
+    _cache_feeds()
+    
+    async def scenario():
+        result = await db.registrations.insert_one({"usuario_id": "dave", "evento_id": "e", "status": "cancelada"})
+        listener = ChangeStreamListener(db)
+        # Unrelated fields leave every feed alone
+        await listener._handle({
+            "operationType": "update",
+            "ns": {"db": "eventsync_test", "coll": "registrations"},
+            "documentKey": {"_id": result.inserted_id},
+            "updateDescription": {"updatedFields": {"timestamp_pagamento": None}, "removedFields": []}
+        })
+        untouched = _cached_users()
+        await listener._handle({
+            "operationType": "update",
+            "ns": {"db": "eventsync_test", "coll": "registrations"},
+            "documentKey": {"_id": result.inserted_id},
+            "updateDescription": {"updatedFields": {"status": "cancelada"}, "removedFields": []}
+        })
+        return untouched, _cached_users()
+    
+    untouched, after_status_change = asyncio.run(scenario())
+    
+    assert untouched == {"alice", "carol"}
+    assert after_status_change == {"alice"}
@@ -0,0 +1,35 @@
+import asyncio
+from datetime import datetime, timedelta
+from repositories.friend_suggestion_repository import FriendSuggestionRepository
+from repositories.friendship_repository import FriendshipRepository
+from repositories.registration_repository import RegistrationRepository
+from repositories.user_repository import UserRepository
+from services.friend_suggestion_service import FriendSuggestionService
+
+
+def _service(db) -> FriendSuggestionService:
+    return FriendSuggestionService(UserRepository(db), RegistrationRepository(db), FriendshipRepository(db), FriendSuggestionRepository(db))
+
+
+def test_reading_suggestions_keeps_the_user_in_the_precomputation(db):
+    async def scenario():
+        week_ago = datetime.utcnow() - timedelta(days=7)
+        await db.friend_suggestions.insert_one({"_id": "u1", "suggestions": [], "computed_at": datetime.utcnow(), "requested_at": week_ago})
+        await _service(db).get_suggestions("u1")
+        return await FriendSuggestionRepository(db).get_recently_requested_user_ids(datetime.utcnow() - timedelta(days=1))
+    
+    assert asyncio.run(scenario()) == ["u1"]
+
+
+def test_stale_suggestions_are_recomputed_on_read(db):
+    async def scenario():
+        long_ago = datetime.utcnow() - timedelta(days=365)
+        stale = [{"id": "gone", "name": "Gone", "city": "X", "mutual_friends": 1, "shared_events": 0, "score": 3}]
+        await db.friend_suggestions.insert_one({"_id": "u1", "suggestions": stale, "computed_at": long_ago, "requested_at": long_ago})
+        suggestions = await _service(db).get_suggestions("u1")
+        return suggestions, await db.friend_suggestions.find_one({"_id": "u1"})
+    
+    suggestions, document = asyncio.run(scenario())
+    
+    assert suggestions == []
+    assert document["computed_at"] > datetime.utcnow() - timedelta(minutes=1)
@@ -0,0 +1,63 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from repositories.idempotency_repository import IdempotencyRepository
+from services.idempotency_service import IdempotencyService
+from utils.exceptions import IdempotencyKeyInProgressException, IdempotencyKeyReusedException
+
+
+def _key() -> str:
+    # Responses are also cached in process, so every test uses its own key
+    return uuid.uuid4().hex
+
+
+def test_replays_the_stored_response(db):
+    calls = []
+    
+    async def handler():
+        calls.append(1)
+        return {"message": "done"}
+    
+    async def scenario():
+        service = IdempotencyService(IdempotencyRepository(db))
+        key = _key()
+        first = await service.run(key, "u1", "register", handler, 201, {"event": "e1"})
+        second = await service.run(key, "u1", "register", handler, 201, {"event": "e1"})
+        with pytest.raises(IdempotencyKeyReusedException):
+            await service.run(key, "u1", "register", handler, 201, {"event": "e2"})
+        return first, second
+    
+    first, second = asyncio.run(scenario())
+    
+    assert first == second == (201, {"message": "done"})
+    assert len(calls) == 1
+
+
+def test_a_stale_claim_is_taken_over_and_a_live_one_is_not(db):
+    async def handler():
+        return {"message": "done"}
+    
+    async def scenario():
+        repo = IdempotencyRepository(db)
+        service = IdempotencyService(repo)
+        live_key, stale_key = _key(), _key()
+        
+        # Claimed by a worker that is still running the request
+        await repo.reserve_key(f"u1:register:{live_key}", None, "other-worker")
+        with pytest.raises(IdempotencyKeyInProgressException):
+            await service.run(live_key, "u1", "register", handler, 201)
+        
+        # Claimed by a worker that died before storing a response
+        await repo.reserve_key(f"u1:register:{stale_key}", None, "crashed-worker")
+        await db.idempotency_keys.update_one(
+            {"_id": f"u1:register:{stale_key}"}, {"$set": {"claimed_at": datetime.utcnow() - timedelta(hours=1)}}
+        )
+        result = await service.run(stale_key, "u1", "register", handler, 201)
+        return result, await repo.get_key(f"u1:register:{stale_key}")
+    
+    result, record = asyncio.run(scenario())
+    
+    assert result == (201, {"message": "done"})
+    assert record["status_code"] == 201
+    assert record["claim_id"] != "crashed-worker"
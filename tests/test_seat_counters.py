@@ -0,0 +1,191 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from config.settings import settings
+from repositories.event_repository import EventRepository
+from repositories.friendship_repository import FriendshipRepository
+from repositories.registration_repository import RegistrationRepository, ACTIVE_STATUSES
+from repositories.seat_shard_repository import SeatShardRepository
+from repositories.user_repository import UserRepository
+from schemas.event_schema import EventStatus
+from schemas.registration_schema import RegistrationStatus
+from services.event_service import EventService
+from services.payment_expiry_service import PaymentExpiryService
+from services.registration_service import RegistrationService
+from utils.exceptions import EventFullException, AlreadyRegisteredException, ActiveRegistrationExistsException
+
+
+def _services(db):
+    event_repo = EventRepository(db)
+    registration_repo = RegistrationRepository(db)
+    events = EventService(UserRepository(db), event_repo, registration_repo, FriendshipRepository(db))
+    registrations = RegistrationService(UserRepository(db), event_repo, registration_repo)
+    return event_repo, events, registrations
+
+
+async def _seats(db, event_id: str):
+    """(registered_count, active registrations, status) of an event"""
+    event = await db.events.find_one({"_id": ObjectId(event_id)})
+    active = await db.registrations.count_documents({"evento_id": event_id, "status": {"$in": ACTIVE_STATUSES}})
+    return event["registered_count"], active, event["status"]
+
+
+async def _registration_id(db, user_id: str) -> str:
+    return str((await db.registrations.find_one({"usuario_id": user_id}))["_id"])
+
+
+def test_concurrent_registrations_never_overbook(db):
+    async def scenario():
+        event_repo, events, _ = _services(db)
+        event_id = await event_repo.create_event({"title": "Show", "capacity": 3, "organizer_id": "organizer"})
+        results = await asyncio.gather(
+            *(events.register_for_event(event_id, f"user{i}") for i in range(10)),
+            return_exceptions=True
+        )
+        return results, await _seats(db, event_id)
+    
+    results, seats = asyncio.run(scenario())
+    
+    assert sum(not isinstance(result, Exception) for result in results) == 3
+    assert all(isinstance(result, EventFullException) for result in results if isinstance(result, Exception))
+    assert seats == (3, 3, EventStatus.FULL)
+
+
+def test_duplicate_registration_gives_the_seat_back(db):
+    async def scenario():
+        event_repo, events, _ = _services(db)
+        event_id = await event_repo.create_event({"title": "Show", "capacity": 3, "organizer_id": "organizer"})
+        await events.register_for_event(event_id, "alice")
+        with pytest.raises(AlreadyRegisteredException):
+            await events.register_for_event(event_id, "alice")
+        return await _seats(db, event_id)
+    
+    assert asyncio.run(scenario()) == (1, 1, EventStatus.OPEN)
+
+
+def test_status_changes_keep_the_counter_in_step(db):
+    async def scenario():
+        event_repo, events, registrations = _services(db)
+        event_id = await event_repo.create_event({"title": "Show", "capacity": 2, "organizer_id": "organizer"})
+        await events.register_for_event(event_id, "alice")
+        await events.register_for_event(event_id, "bob")
+        steps = [await _seats(db, event_id)]
+        
+        alice = await _registration_id(db, "alice")
+        await registrations.update_registration_status(alice, RegistrationStatus.RECUSADA, "organizer")
+        steps.append(await _seats(db, event_id))
+        
+        await registrations.update_registration_status(alice, RegistrationStatus.APROVADA, "organizer")
+        steps.append(await _seats(db, event_id))
+        
+        await registrations.cancel_registration(await _registration_id(db, "bob"), "bob")
+        steps.append(await _seats(db, event_id))
+        return steps
+    
+    assert asyncio.run(scenario()) == [
+        (2, 2, EventStatus.FULL),
+        (1, 1, EventStatus.OPEN),
+        (2, 2, EventStatus.FULL),
+        (1, 1, EventStatus.OPEN),
+    ]
+
+
+def test_reactivation_needs_a_free_seat_and_no_newer_registration(db):
+    async def scenario():
+        event_repo, events, registrations = _services(db)
+        event_id = await event_repo.create_event({"title": "Show", "capacity": 2, "organizer_id": "organizer"})
+        await events.register_for_event(event_id, "alice")
+        alice = await _registration_id(db, "alice")
+        await registrations.update_registration_status(alice, RegistrationStatus.CANCELADA, "organizer")
+        # alice registers again; reviving the cancelled registration would give her two
+        await events.register_for_event(event_id, "alice")
+        with pytest.raises(ActiveRegistrationExistsException):
+            await registrations.update_registration_status(alice, RegistrationStatus.APROVADA, "organizer")
+        duplicate = await _seats(db, event_id)
+        
+        await events.register_for_event(event_id, "bob")
+        with pytest.raises(EventFullException):
+            await registrations.update_registration_status(alice, RegistrationStatus.APROVADA, "organizer")
+        return duplicate, await _seats(db, event_id)
+    
+    duplicate, full = asyncio.run(scenario())
+    
+    assert duplicate == (1, 1, EventStatus.OPEN)
+    assert full == (2, 2, EventStatus.FULL)
+
+
+def test_expired_payments_free_their_seats(db):
+    async def scenario():
+        event_repo, events, _ = _services(db)
+        event_id = await event_repo.create_event({"title": "Paid", "capacity": 2, "price": 50, "organizer_id": "organizer"})
+        await events.register_for_event(event_id, "alice")
+        await events.register_for_event(event_id, "bob")
+        await db.registrations.update_one(
+            {"usuario_id": "alice"}, {"$set": {"timestamp_inscricao": datetime.utcnow() - timedelta(hours=2)}}
+        )
+        metrics = await PaymentExpiryService(event_repo, RegistrationRepository(db)).expire_unpaid_registrations(30, 100)
+        return metrics["expired"], await _seats(db, event_id)
+    
+    assert asyncio.run(scenario()) == (1, (1, 1, EventStatus.OPEN))
+
+
+def test_group_registration_takes_every_seat_or_none(db):
+    async def scenario():
+        event_repo, events, _ = _services(db)
+        users = [str(user_id) for user_id in (await db.users.insert_many([{"name": f"User {i}"} for i in range(3)])).inserted_ids]
+        event_id = await event_repo.create_event({"title": "Show", "capacity": 4, "organizer_id": "organizer"})
+        await events.register_for_event(event_id, "alice")
+        await events.register_for_event(event_id, "bob")
+        
+        with pytest.raises(EventFullException):
+            await events.register_group_for_event(event_id, users, users[0])
+        too_big = await _seats(db, event_id)
+        
+        response = await events.register_group_for_event(event_id, users[:2], users[0])
+        return too_big, len(response.registration_ids), await _seats(db, event_id)
+    
+    too_big, registered, seats = asyncio.run(scenario())
+    
+    assert too_big == (2, 2, EventStatus.OPEN)
+    assert registered == 2
+    assert seats == (4, 4, EventStatus.FULL)
+
+
+def test_group_insert_rolls_back_when_a_member_is_already_registered(db):
+    async def scenario():
+        registration_repo = RegistrationRepository(db)
+        await registration_repo.create_registration("bob", "event", RegistrationStatus.APROVADA)
+        registration_ids = await registration_repo.create_registrations(["alice", "bob", "carol"], "event", RegistrationStatus.APROVADA, "alice")
+        return registration_ids, {registration["usuario_id"] async for registration in db.registrations.find()}
+    
+    registration_ids, users = asyncio.run(scenario())
+    
+    assert registration_ids is None
+    assert users == {"bob"}
+
+
+def test_sharded_seats_never_exceed_capacity(db, monkeypatch):
+    # Copy the shard totals onto the event on every write instead of at most once a second
+    monkeypatch.setattr(settings, "SEAT_SHARD_SYNC_SECONDS", 0)
+    
+    async def scenario():
+        event_repo, _, _ = _services(db)
+        event_id = await event_repo.create_event({"title": "Big", "capacity": 20, "seat_shards": 4, "organizer_id": "organizer"})
+        results = await asyncio.gather(*(event_repo.reserve_seat(event_id, f"user{i}", sharded=True) for i in range(25)))
+        group_fits = await event_repo.reserve_seats(event_id, ["late1", "late2"], sharded=True)
+        full = await SeatShardRepository(db).get_totals(event_id)
+        
+        await event_repo.release_seats({event_id: ["user0", "user1", "user2"]})
+        group_after_release = await event_repo.reserve_seats(event_id, ["late1", "late2"], sharded=True)
+        event = await db.events.find_one({"_id": ObjectId(event_id)})
+        return sum(results), group_fits, full, group_after_release, await SeatShardRepository(db).get_totals(event_id), event
+    
+    reserved, group_fits, full, group_after_release, totals, event = asyncio.run(scenario())
+    
+    assert reserved == 20
+    assert group_fits is False
+    assert full["taken"] == 20
+    assert group_after_release is True
+    assert totals["taken"] == 19
+    assert event["registered_count"] == 19
@@ -0,0 +1,45 @@
+import asyncio
+import base64
+from bson import ObjectId
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+from repositories.registration_repository import RegistrationRepository
+from utils.tickets import create_ticket, verify_ticket, event_verification_key
+
+
+def test_ticket_round_trip_and_offline_verification():
+    registration_id, event_id, user_id = str(ObjectId()), str(ObjectId()), str(ObjectId())
+    token = create_ticket(registration_id, event_id, user_id)
+    
+    assert verify_ticket(token) == {"registration_id": registration_id, "event_id": event_id, "user_id": user_id}
+    
+    # A scanner holding only the public key can check the signature
+    raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    Ed25519PublicKey.from_public_bytes(event_verification_key(event_id)).verify(raw[36:], raw[:36])
+
+
+def test_tampered_ticket_is_rejected():
+    event_id = str(ObjectId())
+    raw = bytearray(base64.urlsafe_b64decode(create_ticket(str(ObjectId()), event_id, str(ObjectId())) + "=="))
+    # Swap the user ID for another one, keeping the signature
+    raw[24:36] = ObjectId().binary
+    
+    assert verify_ticket(base64.urlsafe_b64encode(bytes(raw)).rstrip(b"=").decode()) is None
+    assert verify_ticket("not-a-ticket") is None
+
+
+def test_revoked_lists_every_registration_not_admitted(db):
+    async def scenario():
+        event_id = str(ObjectId())
+        result = await db.registrations.insert_many([
+            {"usuario_id": "u1", "evento_id": event_id, "status": "aprovada"},
+            {"usuario_id": "u2", "evento_id": event_id, "status": "finalizada"},
+            {"usuario_id": "u3", "evento_id": event_id, "status": "aguardando_pagamento"},
+            {"usuario_id": "u4", "evento_id": event_id, "status": "cancelada"},
+        ])
+        archived = await db.registrations_archive.insert_one({"usuario_id": "u5", "evento_id": event_id, "status": "recusada"})
+        revoked = await RegistrationRepository(db).get_event_revoked_registration_ids(event_id)
+        return set(revoked), {str(oid) for oid in result.inserted_ids[2:]} | {str(archived.inserted_id)}
+    
+    revoked, expected = asyncio.run(scenario())
+    
+    assert revoked == expected
@@ -0,0 +1,141 @@
+import asyncio
+from datetime import datetime
+from bson import ObjectId
+from repositories.event_repository import EventRepository
+from repositories.friendship_repository import FriendshipRepository
+from repositories.registration_repository import RegistrationRepository, ACTIVE_STATUSES
+from repositories.user_repository import UserRepository
+from repositories.waitlist_repository import WaitlistRepository
+from schemas.event_schema import EventStatus
+from services.event_service import EventService
+from services.registration_service import RegistrationService
+from services.waitlist_service import WaitlistService
+
+
+class App:
+    """The services wired to one test database"""
+    
+    def __init__(self, db):
+        self.db = db
+        self.event_repo = EventRepository(db)
+        self.registration_repo = RegistrationRepository(db)
+        self.events = EventService(UserRepository(db), self.event_repo, self.registration_repo, FriendshipRepository(db))
+        self.registrations = RegistrationService(UserRepository(db), self.event_repo, self.registration_repo)
+        self.waitlist = WaitlistService(self.event_repo, self.registration_repo, WaitlistRepository(db))
+    
+    async def full_event_with_waitlist(self, capacity: int, waiting: list) -> str:
+        """A free event filled by holder0..holderN, with the given users queued in order"""
+        event_id = await self.event_repo.create_event({"title": "Show", "capacity": capacity, "organizer_id": "organizer"})
+        for i in range(capacity):
+            await self.events.register_for_event(event_id, f"holder{i}")
+        for user_id in waiting:
+            await self.waitlist.join_waitlist(event_id, user_id)
+        return event_id
+    
+    async def event(self, event_id: str) -> dict:
+        return await self.db.events.find_one({"_id": ObjectId(event_id)})
+    
+    async def active_users(self, event_id: str) -> set:
+        cursor = self.db.registrations.find({"evento_id": event_id, "status": {"$in": ACTIVE_STATUSES}})
+        return {registration["usuario_id"] async for registration in cursor}
+    
+    async def queue(self, event_id: str) -> list:
+        cursor = self.db.waitlist.find({"evento_id": event_id}).sort("position", 1)
+        return [entry["usuario_id"] async for entry in cursor]
+
+
+def test_cancelled_seat_goes_to_the_head_of_the_waitlist(db):
+    async def scenario():
+        app = App(db)
+        event_id = await app.full_event_with_waitlist(1, ["bob", "carol"])
+        registration = await db.registrations.find_one({"usuario_id": "holder0"})
+        await app.registrations.cancel_registration(str(registration["_id"]), "holder0")
+        return await app.event(event_id), await app.active_users(event_id), await app.queue(event_id)
+    
+    event, active, queue = asyncio.run(scenario())
+    
+    assert active == {"bob"}
+    assert queue == ["carol"]
+    assert (event["registered_count"], event["status"]) == (1, EventStatus.FULL)
+
+
+def test_failed_promotion_restores_the_entry_in_place(db):
+    async def scenario():
+        app = App(db)
+        event_id = await app.full_event_with_waitlist(1, ["bob", "carol"])
+        # No free seat: bob is taken off the queue, cannot get a seat, and goes back first in line
+        promoted = await app.waitlist.promote(event_id)
+        position = await app.waitlist.get_position(event_id, "bob")
+        return promoted, position.position, await app.queue(event_id), await app.event(event_id)
+    
+    promoted, position, queue, event = asyncio.run(scenario())
+    
+    assert promoted == []
+    assert position == 1
+    assert queue == ["bob", "carol"]
+    assert event["registered_count"] == 1
+
+
+def test_users_registered_meanwhile_are_skipped(db):
+    async def scenario():
+        app = App(db)
+        event_id = await app.full_event_with_waitlist(1, ["bob", "carol"])
+        # bob got in through another seat; the freed one goes to carol
+        await db.registrations.insert_one({"usuario_id": "bob", "evento_id": event_id, "status": "aprovada"})
+        registration = await db.registrations.find_one({"usuario_id": "holder0"})
+        await app.registrations.cancel_registration(str(registration["_id"]), "holder0")
+        return await app.active_users(event_id), await app.queue(event_id)
+    
+    active, queue = asyncio.run(scenario())
+    
+    assert active == {"bob", "carol"}
+    assert queue == []
+
+
+def test_added_capacity_promotes_then_reopens_when_the_queue_empties(db):
+    async def scenario():
+        app = App(db)
+        event_id = await app.full_event_with_waitlist(1, ["bob", "carol"])
+        await app.events.update_event(event_id, {"capacity": 4}, "organizer")
+        return await app.event(event_id), await app.active_users(event_id), await app.queue(event_id)
+    
+    event, active, queue = asyncio.run(scenario())
+    
+    assert active == {"holder0", "bob", "carol"}
+    assert queue == []
+    assert (event["registered_count"], event["status"]) == (3, EventStatus.OPEN)
+
+
+def test_seat_counter_repair_promotes_the_waitlist(db):
+    async def scenario():
+        app = App(db)
+        event_id = await app.full_event_with_waitlist(2, ["bob"])
+        # A seat freed without going through the services (e.g. a crashed request) is found by the recount
+        await db.registrations.update_one({"usuario_id": "holder1"}, {"$set": {"status": "cancelada"}})
+        # Millisecond precision, like the server's clock (mongomock keeps $currentDate's microseconds)
+        read_at = datetime(2030, 1, 1)
+        await db.events.update_one({"_id": ObjectId(event_id)}, {"$set": {"updated_at": read_at}})
+        await app.event_repo.repair_seat_counters([{"id": event_id, "updated_at": read_at, "registered_count": 1}])
+        return await app.event(event_id), await app.active_users(event_id), await app.queue(event_id)
+    
+    event, active, queue = asyncio.run(scenario())
+    
+    assert active == {"holder0", "bob"}
+    assert queue == []
+    assert (event["registered_count"], event["status"]) == (2, EventStatus.FULL)
+
+
+def test_leaving_the_queue_reopens_an_event_with_free_seats(db):
+    async def scenario():
+        app = App(db)
+        event_id = await app.full_event_with_waitlist(1, ["bob"])
+        # Freed while bob was being promoted elsewhere: the event stays full for him
+        await db.events.update_one({"_id": ObjectId(event_id)}, {"$set": {"registered_count": 0}})
+        held = (await app.event(event_id))["status"]
+        await app.waitlist.leave_waitlist(event_id, "bob")
+        return held, (await app.event(event_id))["status"]
+    
+    held, after = asyncio.run(scenario())
+    
+    assert held == EventStatus.FULL
+    assert after == EventStatus.OPEN
@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Every cache registers itself so writes seen elsewhere can invalidate it by collection
+_registry: List["TTLCache"] = []
+
+# Per collection, handlers dropping just the entries a changed document affects: (fields, handler)
+_document_handlers: Dict[str, List[Tuple[set, Callable[[dict], None]]]] = {}
+
+
+class TTLCache:
+    """In-process LRU cache whose entries expire after a TTL"""
+
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: float,
+        max_size: int = 1024,
+        collections: Iterable[str] = (),
+        fields: Iterable[str] = ()
+    ):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.collections = set(collections)
+        # When set, updates that touch none of these fields leave the cache alone
+        self.fields = set(fields)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        _registry.append(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, or default when missing or expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return default
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Cache a value, evicting the least recently used entry when full"""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]):
+        """Drop every entry whose value matches the predicate"""
+        for key in [key for key, (_, value) in self._entries.items() if predicate(value)]:
+            del self._entries[key]
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+
+
+def invalidate_collection(collection: str, updated_fields: Optional[Iterable[str]] = None):
+    """Clear every cache built from the given collection
+
+    updated_fields lists the top-level fields an update touched; None means the
+    whole document may have changed (insert, replace, delete)
+    """
+    updated_fields = set(updated_fields) if updated_fields is not None else None
+    for cache in _registry:
+        if collection not in cache.collections:
+            continue
+        if cache.fields and updated_fields is not None and not cache.fields & updated_fields:
+            continue
+        cache.clear()
+
+
+def on_document_change(collection: str, handler: Callable[[dict], None], fields: Iterable[str] = ()):
+    """Call handler with the written document when another worker inserts or updates the collection
+
+    For caches that a whole-cache clear on every write would keep empty; as with TTLCache,
+    updates that touch none of the given fields are skipped
+    """
+    _document_handlers.setdefault(collection, []).append((set(fields), handler))
+
+
+def document_handlers(collection: str, updated_fields: Optional[Iterable[str]] = None) -> List[Callable[[dict], None]]:
+    """Get the handlers to call for a write to the given collection"""
+    updated_fields = set(updated_fields) if updated_fields is not None else None
+    return [
+        handler for fields, handler in _document_handlers.get(collection, [])
+        if not fields or updated_fields is None or fields & updated_fields
+    ]
@@ -0,0 +1,125 @@
+import asyncio
+from typing import Callable, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure, PyMongoError
+from utils.cache import invalidate_collection, document_handlers
+from utils.seat_broadcaster import seat_broadcaster
+from utils.debug import debug_print
+
+# Error codes: change streams unsupported (no replica set), resume token no longer usable
+CHANGE_STREAMS_UNSUPPORTED = {40573}
+RESUME_TOKEN_LOST = {260, 280, 286}
+
+
+class ChangeStreamListener:
+    """Invalidates local caches on writes made by any worker, via MongoDB change streams
+
+    Resume tokens only live in memory, to reconnect without missing changes: a restarted
+    worker has empty caches, so it has nothing to catch up on and starts from now.
+    """
+
+    # Only event changes need the full document (for seat pushes), so they get their own stream;
+    # the other collections are watched without the extra lookup per write
+    OTHER_COLLECTIONS = ["users", "friendships", "registrations"]
+    CHANGE_FIELDS = {"operationType": 1, "ns": 1, "documentKey": 1, "updateDescription": 1}
+    # Inserted registrations carry their owner, whose friends' feeds are dropped
+    OTHER_FIELDS = {**CHANGE_FIELDS, "fullDocument.usuario_id": 1}
+    EVENT_FIELDS = {
+        **CHANGE_FIELDS,
+        "fullDocument._id": 1,
+        "fullDocument.capacity": 1,
+        "fullDocument.registered_count": 1,
+        "fullDocument.status": 1
+    }
+
+    def __init__(self, db: AsyncIOMotorDatabase, name: str = "cache_invalidation"):
+        self.db = db
+        self.name = name
+        self._resume_tokens: Dict[str, Optional[dict]] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Start listening in the background"""
+        self._tasks = [
+            asyncio.create_task(self._run(f"{self.name}:events", self._open_events_stream)),
+            asyncio.create_task(self._run(self.name, self._open_other_stream))
+        ]
+
+    async def stop(self):
+        """Stop listening"""
+        for task in self._tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    def _open_events_stream(self, resume_after: Optional[dict]):
+        """Watch the events collection, with the seat fields of the changed event"""
+        return self.db["events"].watch([{"$project": self.EVENT_FIELDS}], full_document="updateLookup", resume_after=resume_after)
+
+    def _open_other_stream(self, resume_after: Optional[dict]):
+        """Watch the other cached collections, without looking their documents up"""
+        pipeline = [
+            {"$match": {"ns.coll": {"$in": self.OTHER_COLLECTIONS}}},
+            {"$project": self.OTHER_FIELDS}
+        ]
+        return self.db.watch(pipeline, resume_after=resume_after)
+
+    async def _run(self, stream_name: str, open_stream: Callable):
+        """Watch one stream, reconnecting from its last resume token on errors"""
+        self._resume_tokens[stream_name] = None
+        retry_delay = 1
+
+        while True:
+            try:
+                await self._watch(stream_name, open_stream)
+            except OperationFailure as error:
+                if error.code in CHANGE_STREAMS_UNSUPPORTED:
+                    print(f"⚠️ Change streams need a replica set; caches fall back to TTL expiry ({stream_name})")
+                    return
+                if error.code in RESUME_TOKEN_LOST:
+                    debug_print("change_stream_listener.py", "_run", "error", error="OperationFailure", reason=f"Resume token of {stream_name} expired, restarting from now")
+                    self._resume_tokens[stream_name] = None
+                    continue
+                debug_print("change_stream_listener.py", "_run", "error", error="OperationFailure", reason=str(error))
+            except PyMongoError as error:
+                debug_print("change_stream_listener.py", "_run", "error", error=type(error).__name__, reason=str(error))
+
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 60)
+
+    async def _watch(self, stream_name: str, open_stream: Callable):
+        """Consume a change stream until it fails"""
+        async with open_stream(self._resume_tokens[stream_name]) as stream:
+            async for change in stream:
+                await self._handle(change)
+                self._resume_tokens[stream_name] = stream.resume_token
+
+    async def _handle(self, change: dict):
+        """Invalidate the caches touched by one change"""
+        collection = change["ns"]["coll"]
+        updated_fields = None
+        if change["operationType"] == "update":
+            description = change.get("updateDescription", {})
+            changed = list(description.get("updatedFields", {})) + description.get("removedFields", [])
+            updated_fields = {field.split(".")[0] for field in changed}
+
+        invalidate_collection(collection, updated_fields)
+
+        handlers = document_handlers(collection, updated_fields)
+        if handlers and change["operationType"] in ("insert", "update", "replace"):
+            document = change.get("fullDocument")
+            if document is None:
+                # Only the updates some handler cares about pay for a lookup
+                document = await self.db[collection].find_one(change["documentKey"])
+            if document is not None:
+                for handler in handlers:
+                    handler(document)
+
+        # Seat pushes for writes performed by other workers
+        event = change.get("fullDocument")
+        if collection == "events" and event and "capacity" in event:
+            remaining = event["capacity"] - event.get("registered_count", 0)
+            seat_broadcaster.publish(str(event["_id"]), remaining, event.get("status"))
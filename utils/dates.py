@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC, like the timestamps stored in the database"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch_millis(value: datetime) -> int:
+    """Convert a naive UTC datetime to whole milliseconds since the epoch, MongoDB's date precision"""
+    return (value - _EPOCH) // timedelta(milliseconds=1)
+
+
+def from_epoch_millis(millis: int) -> datetime:
+    """Convert milliseconds since the epoch back to a naive UTC datetime"""
+    return _EPOCH + timedelta(milliseconds=millis)
+
+
+def parse_event_datetime(date: Optional[str], time: Optional[str] = None) -> Optional[datetime]:
+    """Parse an event's date/time strings into a naive UTC datetime"""
+    if not date:
+        return None
+
+    try:
+        parsed = datetime.fromisoformat(date.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+    parsed = to_naive_utc(parsed)
+
+    # Date-only values take the time of day from the separate "time" field
+    if "T" not in date and " " not in date and time:
+        try:
+            hours, minutes = time.split(":")[:2]
+            parsed = parsed.replace(hour=int(hours), minute=int(minutes))
+        except ValueError:
+            pass
+
+    return parsed
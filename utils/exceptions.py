@@ -88,3 +88,99 @@ class NotEventOrganizerException(HTTPException):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You are not the organizer of this event"
         )
+
+
+class TooManyIdsException(HTTPException):
+    def __init__(self, max_ids: int):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {max_ids} IDs can be requested at once"
+        )
+
+
+class InvalidFieldsException(HTTPException):
+    def __init__(self, fields: list):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(fields)}"
+        )
+
+
+class InvalidSyncTokenException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token"
+        )
+
+
+class IdempotencyKeyInProgressException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed"
+        )
+
+
+class IdempotencyKeyReusedException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="This Idempotency-Key was already used with a different request"
+        )
+
+
+class EventNotFullException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Event still has seats available, register instead"
+        )
+
+
+class NotOnWaitlistException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="You are not on the waitlist for this event"
+        )
+
+
+class TicketNotAvailableException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Tickets are only issued for approved registrations"
+        )
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+class InvalidStatusTransitionException(HTTPException):
+    def __init__(self, new_status: str):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Registration cannot change from its current status to {new_status}"
+        )
+
+
+class ActiveRegistrationExistsException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The user already has an active registration for this event"
+        )
+
+
+class InvalidEventDateException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid event date, expected an ISO 8601 date"
+        )
@@ -0,0 +1,19 @@
+from typing import List, Optional, Type
+from pydantic import BaseModel
+from utils.exceptions import InvalidFieldsException
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[List[str]]:
+    """Parse a comma-separated ?fields= value, validated against the response model"""
+    if fields is None:
+        return None
+
+    requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in requested if field not in model.model_fields]
+    if unknown:
+        raise InvalidFieldsException(unknown)
+
+    # The ID is always returned so clients can key the partial objects
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return requested
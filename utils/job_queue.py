@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from config.settings import settings
+from repositories.job_repository import JobRepository
+from utils.scheduler import WORKER_ID
+from utils.debug import debug_print
+
+JobHandler = Callable[[dict], Awaitable[None]]
+
+
+class JobQueue:
+    """In-process worker pool for side effects that requests should not wait for
+
+    Jobs are written to an outbox collection before they are queued, so a job that has
+    not finished when the process stops is picked up again by a poller on some worker.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, JobHandler] = {}
+        self._repo: Optional[JobRepository] = None
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {"enqueued": 0, "succeeded": 0, "retried": 0, "failed": 0}
+
+    def register(self, name: str, handler: JobHandler):
+        """Register the handler run for jobs with the given name"""
+        self._handlers[name] = handler
+
+    async def enqueue(self, name: str, payload: dict):
+        """Record a job and hand it to a worker; runs it inline when the queue is not started"""
+        if self._repo is None:
+            await self._handlers[name](payload)
+            return
+        job_id = await self._repo.insert_job(name, payload)
+        self._stats["enqueued"] += 1
+        self._queue.put_nowait(job_id)
+
+    def start(self, repo: JobRepository):
+        """Start the workers and the outbox poller"""
+        self._repo = repo
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(settings.JOB_QUEUE_CONCURRENCY)]
+        self._tasks.append(asyncio.create_task(self._poll()))
+
+    async def stop(self):
+        """Let queued jobs finish for up to JOB_DRAIN_TIMEOUT_SECONDS, then stop the workers"""
+        if self._repo is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), settings.JOB_DRAIN_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            debug_print("job_queue.py", "stop", "error", error="TimeoutError", reason=f"{self._queue.qsize()} jobs left in the outbox")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._repo = None
+
+    def stats(self) -> dict:
+        """Counters of this worker's jobs, for /metrics"""
+        return {**self._stats, "queued": self._queue.qsize()}
+
+    async def _worker(self):
+        """Run queued jobs one at a time"""
+        while True:
+            item = await self._queue.get()
+            try:
+                # New jobs are queued by ID; jobs found by the poller are already claimed
+                job = item if isinstance(item, dict) else await self._repo.claim_job(item, WORKER_ID)
+                if job:
+                    await self._run(job)
+            except Exception as error:
+                debug_print("job_queue.py", "_worker", "error", error=type(error).__name__, reason=str(error))
+            finally:
+                self._queue.task_done()
+
+    async def _poll(self):
+        """Pick up retries and jobs left behind by stopped workers"""
+        while True:
+            await asyncio.sleep(settings.JOB_POLL_SECONDS)
+            try:
+                # Only take more when the local workers are idle, and no more than they can run
+                if not self._queue.empty():
+                    continue
+                for _ in range(settings.JOB_QUEUE_CONCURRENCY):
+                    job = await self._repo.claim_due_job(WORKER_ID, settings.JOB_LOCK_TIMEOUT_SECONDS)
+                    if not job:
+                        break
+                    self._queue.put_nowait(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                debug_print("job_queue.py", "_poll", "error", error=type(error).__name__, reason=str(error))
+
+    async def _run(self, job: dict):
+        """Run a claimed job and record the outcome"""
+        try:
+            await self._handlers[job["name"]](job["payload"])
+        except Exception as error:
+            attempts = job.get("attempts", 0) + 1
+            retry_at = None
+            if attempts < settings.JOB_MAX_ATTEMPTS:
+                retry_at = datetime.utcnow() + timedelta(seconds=settings.JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+            self._stats["retried" if retry_at else "failed"] += 1
+            debug_print("job_queue.py", "_run", "error", error=type(error).__name__, reason=str(error), job=job["name"], attempts=attempts)
+            await self._repo.fail_job(job["_id"], str(error), retry_at)
+            return
+        self._stats["succeeded"] += 1
+        await self._repo.complete_job(job["_id"])
+
+
+job_queue = JobQueue()
@@ -0,0 +1,50 @@
+import asyncio
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, Optional
+from repositories.lock_repository import LockRepository
+from utils.debug import debug_print
+
+# Identifies this worker as a lock owner
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class PeriodicJob:
+    """Runs a job every interval on a single worker, elected through a lock document"""
+
+    def __init__(self, name: str, interval_seconds: float, job: Callable[[], Awaitable[None]], lock_repo: LockRepository):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.job = job
+        self.lock_repo = lock_repo
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the schedule in the background"""
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the schedule and hand the lock over"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        await self.lock_repo.release_lock(self.name, WORKER_ID)
+
+    async def _run(self):
+        """Run the job whenever this worker holds the lock"""
+        # The lease outlives a few intervals so a slow run keeps leadership
+        lease_seconds = int(self.interval_seconds * 3) + 1
+        while True:
+            try:
+                if await self.lock_repo.acquire_lock(self.name, WORKER_ID, lease_seconds):
+                    await self.job()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                debug_print("scheduler.py", "_run", "error", error=type(error).__name__, reason=str(error), job=self.name)
+            await asyncio.sleep(self.interval_seconds)
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from enum import Enum
+from typing import Dict, Optional, Set
+
+
+class SeatSubscription:
+    """A connection's subscription to one event; only the latest update is kept"""
+
+    def __init__(self, event_id: str, min_interval: float):
+        self.event_id = event_id
+        self.min_interval = min_interval
+        self._latest: Optional[dict] = None
+        self._ready = asyncio.Event()
+        # The initial snapshot is sent on subscribe, so it counts against the rate limit
+        self._last_sent = time.monotonic()
+
+    def offer(self, update: dict):
+        """Replace the pending update (never blocks the publisher)"""
+        self._latest = update
+        self._ready.set()
+
+    async def next_update(self) -> dict:
+        """Wait for the next update, at most one per min_interval"""
+        await self._ready.wait()
+
+        # Updates published while we wait overwrite each other, so a burst is sent once
+        delay = self._last_sent + self.min_interval - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        self._ready.clear()
+        update, self._latest = self._latest, None
+        self._last_sent = time.monotonic()
+        return update
+
+
+class SeatBroadcaster:
+    """In-process fan-out of seat count and status changes per event"""
+
+    def __init__(self):
+        self._subscriptions: Dict[str, Set[SeatSubscription]] = {}
+
+    def subscribe(self, event_id: str, min_interval: float) -> SeatSubscription:
+        """Start receiving the updates of an event"""
+        subscription = SeatSubscription(event_id, min_interval)
+        self._subscriptions.setdefault(event_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: SeatSubscription):
+        """Stop receiving updates"""
+        subscriptions = self._subscriptions.get(subscription.event_id)
+        if subscriptions is None:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.event_id]
+
+    def publish(self, event_id: str, remaining_seats: int, status):
+        """Push the current seat count and status to the event's subscribers"""
+        subscriptions = self._subscriptions.get(event_id)
+        if not subscriptions:
+            return
+
+        update = {
+            "event_id": event_id,
+            "remaining_seats": max(remaining_seats, 0),
+            "status": status.value if isinstance(status, Enum) else status
+        }
+        for subscription in subscriptions:
+            subscription.offer(update)
+
+    def subscriber_count(self, event_id: Optional[str] = None) -> int:
+        """Number of subscriptions, for one event or in total"""
+        if event_id is not None:
+            return len(self._subscriptions.get(event_id, ()))
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+# Singleton instance
+seat_broadcaster = SeatBroadcaster()
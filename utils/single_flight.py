@@ -0,0 +1,48 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+# Every group registers itself so its metrics can be reported
+_registry: List["SingleFlight"] = []
+
+
+class SingleFlight:
+    """Coalesces concurrent identical reads into one in-flight call
+
+    Results are shared between all the callers of a flight and must be treated as read-only
+    """
+
+    def __init__(self, name: str, max_tracked_keys: int = 1000):
+        self.name = name
+        self.max_tracked_keys = max_tracked_keys
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._stats: "OrderedDict[Hashable, Dict[str, int]]" = OrderedDict()
+        _registry.append(self)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn, or join the call already running for the same key"""
+        stats = self._stats.pop(key, None) or {"calls": 0, "coalesced": 0}
+        self._stats[key] = stats
+        while len(self._stats) > self.max_tracked_keys:
+            self._stats.popitem(last=False)
+        stats["calls"] += 1
+
+        flight = self._in_flight.get(key)
+        if flight is None:
+            # Run as its own task so a cancelled caller does not cancel the others
+            flight = asyncio.ensure_future(fn())
+            self._in_flight[key] = flight
+            flight.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            stats["coalesced"] += 1
+
+        return await asyncio.shield(flight)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Calls and coalesced calls per key, for the most recently used keys"""
+        return {str(key): dict(stats) for key, stats in self._stats.items()}
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Dict[str, int]]]:
+    """Metrics of every single-flight group"""
+    return {group.name: group.stats() for group in _registry}
@@ -0,0 +1,23 @@
+import unicodedata
+from typing import List, Optional
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase and strip accents, so "Música" and "musica" compare equal"""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.lower().split())
+
+
+def build_search_keys(*values: Optional[str]) -> List[str]:
+    """Build the prefix keys of each value, one per word start"""
+    keys = []
+    for value in values:
+        words = normalize_text(value).split()
+        for index in range(len(words)):
+            key = " ".join(words[index:])
+            if key not in keys:
+                keys.append(key)
+    return keys